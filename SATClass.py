@@ -1,81 +1,800 @@
 ﻿'''
     Desc: Defines the classes used by the SAT solver for DPLL algorithm
 '''
-import copy
-import glob
-import os
+import array
+import heapq
 import random
+import sys
+from stats import SolverStats
+try:
+    import numpy as np
+except ImportError:  # only GeneticAlgorithmNumpy needs numpy
+    np = None
 #from sympy import *
+
+WORD_MASK = (1 << 64) - 1
+
 '''
     File Class:
         fileN: Name of the file
         numClauses: Number of clauses in the file
         numVars: Number of variables in the file
-        clausesRaw: Clauses as they are in the file
-        clausesNegation: Negated clauses for DPLL algorithm
-        clausesOriginal: Original clauses for reference (used in DPLL)
+        literals: Every clause's literals back to back in one int array (CSR style, stored once)
+        offsets: Clause i is literals[offsets[i]:offsets[i + 1]]
+        clausesOriginal: Original clauses (read-only view of literals, used in DPLL)
+        clausesRaw: Clauses with every literal as its variable (read-only view, built the first time it is used)
+        clausesNegation: Clauses with 1 for a positive and 0 for a negative literal (read-only view, built the first time it is used)
+        clauseMasks: ClauseMasks of clausesOriginal, built the first time an Assignment is checked
 '''
 class File:
-    def __init__(self, fileN, numClauses, numVars, clausesRaw, clausesNegation, clausesOriginal):
+    __slots__ = ("fileN", "numClauses", "numVars", "literals", "offsets",
+                 "absLiterals", "signs", "occOffsets", "occClauses", "clauseMasks")
+
+    def __init__(self, fileN, numClauses, numVars, literals, offsets):
         self.fileN = fileN
         self.numClauses = numClauses
         self.numVars = numVars
-        self.clausesRaw = clausesRaw
-        self.clausesNegation = clausesNegation
-        self.clausesOriginal = clausesOriginal
+        self.literals = literals
+        self.offsets = offsets
+        self.absLiterals = None
+        self.signs = None
+        self.occOffsets = None
+        self.occClauses = None
+        self.clauseMasks = None
+
+    # Pickle the arrays themselves, literals/offsets can be memoryviews of a cache file (cnfcache) which do not pickle
+    def __reduce__(self):
+        return (File, (self.fileN, self.numClauses, self.numVars,
+                       array.array("i", self.literals), array.array("q", self.offsets)))
+
+    # Build a File from a list of clauses (lists of signed ints)
+    @classmethod
+    def fromClauses(cls, fileN, numVars, clauses):
+        literals = array.array("i")
+        offsets = array.array("q", [0])
+        for clause in clauses:
+            literals.extend(clause)
+            offsets.append(len(literals))
+        return cls(fileN, len(clauses), numVars, literals, offsets)
+
+    @property
+    def clausesOriginal(self):
+        return ClauseView(self.literals, self.offsets)
 
+    @property
+    def clausesRaw(self):
+        if self.absLiterals is None:
+            self.absLiterals = array.array("i", map(abs, self.literals))
+        return ClauseView(self.absLiterals, self.offsets)
+
+    @property
+    def clausesNegation(self):
+        if self.signs is None:
+            self.signs = array.array("b", [1 if lit > 0 else 0 for lit in self.literals])
+        return ClauseView(self.signs, self.offsets)
+
+    # Indices of the clauses lit is in, the index over every literal is built on the first call
+    def occurrences(self, lit):
+        if self.occOffsets is None:
+            self.buildOccurrences()
+        slot = 2 * (abs(lit) - 1) + (lit < 0)
+        return memoryview(self.occClauses)[self.occOffsets[slot]:self.occOffsets[slot + 1]].toreadonly()
+
+    def buildOccurrences(self):
+        numSlots = 2 * self.numVars
+        counts = [0] * (numSlots + 1)
+        for lit in self.literals:
+            counts[2 * (abs(lit) - 1) + (lit < 0) + 1] += 1
+        for slot in range(numSlots):
+            counts[slot + 1] += counts[slot]
+        occOffsets = array.array("q", counts)
+        fill = counts[:-1]
+        occClauses = array.array("i", bytes(4 * len(self.literals)))
+        offsets = self.offsets
+        literals = self.literals
+        for index in range(self.numClauses):
+            for pos in range(offsets[index], offsets[index + 1]):
+                lit = literals[pos]
+                slot = 2 * (abs(lit) - 1) + (lit < 0)
+                occClauses[fill[slot]] = index
+                fill[slot] += 1
+        self.occOffsets = occOffsets
+        self.occClauses = occClauses
 
 '''
-Node Class:
-Parent: Parent node of current
-clauses: the clause set at this node
-assignment: Current assignment of variables
+ClauseView Class:
+    Read-only list-like view over the clauses of a File, clause i is a memoryview of data[offsets[i]:offsets[i + 1]]
 '''
-class Node:
-    def __init__(self, parent, clauses, assignment):
-        self.parent = parent
-        self.clauses = clauses
-        self.assignment = assignment
-
-# dpll Algorithm using a stack instead of recursion, too many resources used when recurring too much
-def dpll(clauses, assignment):
-
-    stack = []
-    root = Node(None, clauses, assignment)
-    stack.append(root)
-
-    while stack:
-        node = stack.pop()
-        # work on fresh copies to avoid shared mutation
-        clauses = node.clauses
-        assignment = node.assignment
-
-        # Unit propagation
-        clauses, assignment, isConflict = unitPropagation(clauses, assignment)
-        if isConflict:
-            continue  # Conflict, backtrack
-
-        # If every clause is satisfied by the current (possibly partial) assignment -> success
-        if not clauses:
-            print("Found Solution!!!")
-            return True, assignment
-
-        # Need to pick a variable to branch on
-        literal = pickMostConstraining(clauses, assignment)
-        if literal is None:
-            # No unassigned variables appear in remaining clauses and formula wasn't fully satisfied -> treat as backtrack
-            continue
+class ClauseView:
+    __slots__ = ("data", "offsets")
+
+    def __init__(self, data, offsets):
+        self.data = memoryview(data).toreadonly()
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("clause index out of range")
+        return self.data[self.offsets[index]:self.offsets[index + 1]]
+
+    def __iter__(self):
+        data = self.data
+        offsets = self.offsets
+        for index in range(len(offsets) - 1):
+            yield data[offsets[index]:offsets[index + 1]]
+
+    def __repr__(self):
+        return repr([list(clause) for clause in self])
+
+'''
+Assignment Class:
+    Bit-packed truth assignment shared by ClausesSatisfied, LocalSearch and GeneticAlgorithm,
+    bit (var - 1) is 1 when var is True, stored 64 variables per word
+    numVars: Number of variables
+    words: array of unsigned 64 bit words, set/flip change it in place
+'''
+class Assignment:
+    __slots__ = ("numVars", "words")
+
+    def __init__(self, numVars, words=None):
+        self.numVars = numVars
+        if words is None:
+            words = array.array("Q", bytes(8 * ((numVars + 63) // 64)))
+        self.words = words
+
+    # From a "0101..." string, character i is variable i + 1
+    @classmethod
+    def fromString(cls, text):
+        assignment = cls(len(text))
+        assignment.setInt(int(text[::-1], 2) if text else 0)
+        return assignment
+
+    # From a {var: bool} dict like dpll returns, variables missing from it are False
+    @classmethod
+    def fromDict(cls, values, numVars):
+        assignment = cls(numVars)
+        for var, val in values.items():
+            if val:
+                assignment.set(var, True)
+        return assignment
+
+    # 50-50 for each variable being True or False
+    @classmethod
+    def random(cls, numVars, rng=None):
+        rng = rng or random
+        assignment = cls(numVars)
+        assignment.setInt(rng.getrandbits(numVars) if numVars else 0)
+        return assignment
+
+    # The whole assignment as one int (bit var - 1 is var)
+    def toInt(self):
+        words = self.words
+        if sys.byteorder == "big":
+            words = array.array("Q", words)
+            words.byteswap()
+        return int.from_bytes(words.tobytes(), "little")
+
+    def setInt(self, value):
+        words = array.array("Q", value.to_bytes(8 * len(self.words), "little"))
+        if sys.byteorder == "big":
+            words.byteswap()
+        self.words[:] = words
+
+    def get(self, var):
+        i = var - 1
+        return (self.words[i >> 6] >> (i & 63)) & 1 == 1
+
+    def set(self, var, value):
+        i = var - 1
+        if value:
+            self.words[i >> 6] |= 1 << (i & 63)
+        else:
+            self.words[i >> 6] &= ~(1 << (i & 63)) & WORD_MASK
+
+    def flip(self, var):
+        i = var - 1
+        self.words[i >> 6] ^= 1 << (i & 63)
+
+    def copy(self):
+        return Assignment(self.numVars, array.array("Q", self.words))
+
+    # Overwrite this assignment with other's bits without allocating
+    def copyFrom(self, other):
+        self.words[:] = other.words
+
+    # Uniform crossover a whole word at a time, each bit comes from self or other with 50% chance
+    def crossover(self, other, rng=None):
+        rng = rng or random
+        child = Assignment(self.numVars)
+        words = child.words
+        for i in range(len(words)):
+            mask = rng.getrandbits(64)
+            words[i] = (self.words[i] & mask) | (other.words[i] & ~mask & WORD_MASK)
+        return child
+
+    def toString(self):
+        if self.numVars == 0:
+            return ""
+        return format(self.toInt(), f"0{self.numVars}b")[::-1]
+
+    def toDict(self):
+        return {var: self.get(var) for var in range(1, self.numVars + 1)}
+
+    def __len__(self):
+        return self.numVars
+
+    def __str__(self):
+        return self.toString()
+
+    def __eq__(self, other):
+        return isinstance(other, Assignment) and self.numVars == other.numVars and self.words == other.words
+
+'''
+ClauseMasks Class:
+    Clauses compiled to word masks so an Assignment can be checked a word at a time
+    masks: For each clause, (word index, positive mask, negative mask) for every word the clause touches,
+           the clause is satisfied if any word has a positive bit set or a negative bit clear
+'''
+class ClauseMasks:
+    def __init__(self, clauses):
+        self.masks = []
+        for clause in clauses:
+            byWord = {}
+            for lit in clause:
+                i = abs(lit) - 1
+                word = byWord.setdefault(i >> 6, [0, 0])
+                word[0 if lit > 0 else 1] |= 1 << (i & 63)
+            self.masks.append(tuple((w, pos, neg) for w, (pos, neg) in byWord.items()))
+
+    def isSatisfied(self, index, assignment):
+        words = assignment.words
+        for w, pos, neg in self.masks[index]:
+            bits = words[w]
+            if bits & pos or ~bits & neg:
+                return True
+        return False
+
+    def countSatisfied(self, assignment):
+        words = assignment.words
+        count = 0
+        for clause in self.masks:
+            for w, pos, neg in clause:
+                bits = words[w]
+                if bits & pos or ~bits & neg:
+                    count += 1
+                    break
+        return count
+
+'''
+WatchedClauses Class:
+    Shared clause database for DPLL using two watched literals per clause
+    clauses: Clause list, the two watched literals of each clause are kept at index 0 and 1
+    units: Unit clauses, assigned once when the database is built
+    watches: Literal -> indices of the clauses currently watching that literal
+    assignment: Current assignment of variables
+    trail: Literals in the order they were made true (used to undo assignments)
+    trailLim: Trail position where each decision level starts
+    head: Position in the trail of the next literal to propagate
+    isConflict: True if the formula has an empty clause or contradicting unit clauses
+    heuristic: BranchingHeuristic told about every assignment and unassignment (None if not used)
+'''
+class WatchedClauses:
+    def __init__(self, clauses, assignment=None):
+        self.clauses = []
+        self.units = []
+        self.watches = {}
+        self.assignment = {}
+        self.trail = []
+        self.trailLim = []
+        self.head = 0
+        self.isConflict = False
+        self.heuristic = None
+
+        for clause in clauses:
+            self.addClause(clause)
+
+        # Starting assignment first, then the unit clauses on top of it
+        if assignment:
+            for var, val in assignment.items():
+                self.enqueue(var if val else -var)
+        for lit in self.units:
+            val = self.assignment.get(abs(lit))
+            if val is None:
+                self.enqueue(lit)
+            elif val != (lit > 0):
+                self.isConflict = True
+
+    def addClause(self, clause):
+        # Duplicate literals and tautologies are dealt with once here instead of on every propagation pass
+        lits = list(dict.fromkeys(clause))
+        s = set(lits)
+        if any(-lit in s for lit in lits):
+            return
+        if len(lits) == 0:
+            self.isConflict = True
+            return
+        if len(lits) == 1:
+            self.units.append(lits[0])
+            return
+        index = len(self.clauses)
+        self.clauses.append(lits)
+        self.watches.setdefault(lits[0], []).append(index)
+        self.watches.setdefault(lits[1], []).append(index)
+
+    # Make a literal true and record it on the trail (reason is the index of the clause that forced it)
+    def enqueue(self, lit, reason=None):
+        self.assignment[abs(lit)] = lit > 0
+        self.trail.append(lit)
+        if self.heuristic is not None:
+            self.heuristic.assigned(lit)
+
+    # Unassign everything made true after the trail was mark long
+    def undo(self, mark):
+        trail = self.trail
+        assignment = self.assignment
+        heuristic = self.heuristic
+        while len(trail) > mark:
+            lit = trail.pop()
+            del assignment[abs(lit)]
+            if heuristic is not None:
+                heuristic.unassigned(lit)
+        if self.head > mark:
+            self.head = mark
+
+    def decisionLevel(self):
+        return len(self.trailLim)
+
+    # Open a new decision level and make the decision literal true in it
+    def decide(self, lit):
+        self.trailLim.append(len(self.trail))
+        self.enqueue(lit)
+
+    # Undo every decision level above level, returns the decision literal of the first level undone
+    # (None if that level is empty, CDCLSolver opens empty levels for assumptions that are already true)
+    def backtrack(self, level):
+        if level >= len(self.trailLim):
+            return None
+        mark = self.trailLim[level]
+        decision = self.trail[mark] if mark < len(self.trail) else None
+        del self.trailLim[level:]
+        self.undo(mark)
+        return decision
+
+    # Propagate every literal on the trail that has not been propagated yet,
+    # returns the index of a falsified clause on conflict, None otherwise
+    def propagate(self):
+        clauses = self.clauses
+        watches = self.watches
+        assignment = self.assignment
+        trail = self.trail
+
+        while self.head < len(trail):
+            falseLit = -trail[self.head]
+            self.head += 1
+            # Only clauses watching the literal that just became false need a look
+            watchList = watches.get(falseLit)
+            if not watchList:
+                continue
+
+            i = 0
+            kept = 0
+            n = len(watchList)
+            while i < n:
+                index = watchList[i]
+                i += 1
+                clause = clauses[index]
+                # Keep the false watched literal at index 1
+                if clause[0] == falseLit:
+                    clause[0] = clause[1]
+                    clause[1] = falseLit
+                other = clause[0]
+                otherVal = assignment.get(abs(other))
+
+                # Clause already satisfied by the other watch, keep watching
+                if otherVal is not None and otherVal == (other > 0):
+                    watchList[kept] = index
+                    kept += 1
+                    continue
+
+                # Look for a literal that is not false to watch instead
+                moved = False
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    val = assignment.get(abs(lit))
+                    if val is None or val == (lit > 0):
+                        clause[1] = lit
+                        clause[k] = falseLit
+                        watches.setdefault(lit, []).append(index)
+                        moved = True
+                        break
+                if moved:
+                    continue
+
+                watchList[kept] = index
+                kept += 1
+                if otherVal is None:
+                    # Unit clause, other watch is forced
+                    self.enqueue(other, index)
+                else:
+                    # Every literal is false -> conflict, keep the rest of the watchers
+                    while i < n:
+                        watchList[kept] = watchList[i]
+                        kept += 1
+                        i += 1
+                    del watchList[kept:]
+                    self.head = len(trail)
+                    return index
+            del watchList[kept:]
+        return None
+
+    # Clauses not yet satisfied, reduced to their unassigned literals (same as what simplify builds)
+    def remainingClauses(self):
+        assignment = self.assignment
+        remaining = []
+        for clause in self.clauses:
+            reduced = []
+            for lit in clause:
+                val = assignment.get(abs(lit))
+                if val is None:
+                    reduced.append(lit)
+                elif val == (lit > 0):
+                    break
+            else:
+                remaining.append(reduced)
+        return remaining
+
+    # Occurrences of each unassigned variable in the clauses not yet satisfied (countLiteral without building the clauses)
+    def countRemaining(self):
+        assignment = self.assignment
+        count = {}
+        for clause in self.clauses:
+            for lit in clause:
+                val = assignment.get(abs(lit))
+                if val is not None and val == (lit > 0):
+                    break
+            else:
+                for lit in clause:
+                    v = abs(lit)
+                    if v not in assignment:
+                        count[v] = count.get(v, 0) + 1
+        return count
+
+'''
+BranchingHeuristic Class:
+    Base for the dpll branching heuristics, scores are kept up to date as the engine assigns and
+    unassigns variables instead of being recounted over the whole formula at every node
+    engine: WatchedClauses database the heuristic is attached to
+    occurrences: Literal -> indices of every clause the literal is in
+    satCount: Number of true literals in each clause
+    freeCount: Number of unassigned literals in each clause
+    weights: weight(size) for every clause size
+    score: Literal -> sum of weight(clause size) over the unsatisfied clauses it is in (unassigned literals only)
+    unsatisfied: Number of clauses with no true literal
+    heap: (key, var) entries, stale ones are skipped when popped
+    dirty: Variables whose key changed since the last pick
+'''
+class BranchingHeuristic:
+    def __init__(self, engine):
+        self.engine = engine
+        clauses = engine.clauses
+        assignment = engine.assignment
+        self.occurrences = {}
+        self.satCount = [0] * len(clauses)
+        self.freeCount = [0] * len(clauses)
+        self.score = {}
+        self.unsatisfied = 0
+        self.setup(clauses)
+        # weight of every clause size up front, the hot path only indexes into it
+        self.weights = [self.weight(size) for size in range(max((len(clause) for clause in clauses), default=0) + 1)]
+
+        for index, clause in enumerate(clauses):
+            for lit in clause:
+                self.occurrences.setdefault(lit, []).append(index)
+                self.score.setdefault(lit, 0)
+                self.score.setdefault(-lit, 0)
+                val = assignment.get(abs(lit))
+                if val is None:
+                    self.freeCount[index] += 1
+                elif val == (lit > 0):
+                    self.satCount[index] += 1
+            if self.satCount[index] == 0:
+                self.unsatisfied += 1
+                w = self.weights[self.freeCount[index]]
+                for lit in clause:
+                    if abs(lit) not in assignment:
+                        self.score[lit] += w
+
+        self.heap = [(self.key(var), var) for var in self.variables() if var not in assignment]
+        heapq.heapify(self.heap)
+        self.dirty = set()
+
+    # Hook for subclasses that need the formula before the scores are built
+    def setup(self, clauses):
+        pass
+
+    # How much an unsatisfied clause with size unassigned literals adds to each of its literals
+    def weight(self, size):
+        return 1
+
+    # Heap key of a variable, smallest is picked first
+    def key(self, var):
+        return -(self.score[var] + self.score[-var])
+
+    # Which literal of the picked variable is tried first
+    def polarity(self, var):
+        return var
+
+    def variables(self):
+        return set(abs(lit) for lit in self.score)
+
+    # Called by the engine after lit was made true
+    def assigned(self, lit):
+        clauses = self.engine.clauses
+        assignment = self.engine.assignment
+        score = self.score
+        dirty = self.dirty
+        weights = self.weights
+        satCount = self.satCount
+        freeCount = self.freeCount
+        for index in self.occurrences.get(lit, ()):
+            satCount[index] += 1
+            freeCount[index] -= 1
+            if satCount[index] == 1:
+                # Clause just became satisfied, its other unassigned literals lose it
+                self.unsatisfied -= 1
+                w = weights[freeCount[index] + 1]
+                for other in clauses[index]:
+                    if abs(other) not in assignment:
+                        score[other] -= w
+                        dirty.add(abs(other))
+        for index in self.occurrences.get(-lit, ()):
+            freeCount[index] -= 1
+            if satCount[index] == 0:
+                # Clause got shorter, its weight changes
+                delta = weights[freeCount[index]] - weights[freeCount[index] + 1]
+                if delta:
+                    for other in clauses[index]:
+                        if abs(other) not in assignment:
+                            score[other] += delta
+                            dirty.add(abs(other))
+
+    # Called by the engine after lit was unassigned, exact reverse of assigned
+    def unassigned(self, lit):
+        var = abs(lit)
+        clauses = self.engine.clauses
+        assignment = self.engine.assignment
+        score = self.score
+        dirty = self.dirty
+        weights = self.weights
+        satCount = self.satCount
+        freeCount = self.freeCount
+        for index in self.occurrences.get(lit, ()):
+            satCount[index] -= 1
+            freeCount[index] += 1
+            if satCount[index] == 0:
+                self.unsatisfied += 1
+                w = weights[freeCount[index]]
+                for other in clauses[index]:
+                    if other != lit and abs(other) not in assignment:
+                        score[other] += w
+                        dirty.add(abs(other))
+        for index in self.occurrences.get(-lit, ()):
+            freeCount[index] += 1
+            if satCount[index] == 0:
+                delta = weights[freeCount[index]] - weights[freeCount[index] - 1]
+                if delta:
+                    for other in clauses[index]:
+                        if other != -lit and abs(other) not in assignment:
+                            score[other] += delta
+                            dirty.add(abs(other))
+        # The variable's own score was left alone while it was assigned, it only has to go back in the heap
+        dirty.add(var)
+
+    # Literal to branch on next, None when there is no unassigned variable left
+    def pick(self):
+        heap = self.heap
+        assignment = self.engine.assignment
+        if len(heap) > 4 * len(self.score) + 100:
+            self.heap = heap = [(self.key(var), var) for var in self.variables() if var not in assignment]
+            heapq.heapify(heap)
+        else:
+            for var in self.dirty:
+                if var not in assignment:
+                    heapq.heappush(heap, (self.key(var), var))
+        self.dirty.clear()
+
+        while heap:
+            key, var = heapq.heappop(heap)
+            if var in assignment or key != self.key(var):
+                continue  # stale entry
+            return self.polarity(var)
+        return None
+
+# Variable that shows up the most in the unsatisfied clauses, same choice pickMostConstraining makes
+class MaxOccurrence(BranchingHeuristic):
+    pass
+
+# Dynamic Largest Individual Sum: literal that satisfies the most unsatisfied clauses
+class DLIS(BranchingHeuristic):
+    def key(self, var):
+        return -max(self.score[var], self.score[-var])
+
+    def polarity(self, var):
+        return var if self.score[var] >= self.score[-var] else -var
+
+# Two sided Jeroslow-Wang: shorter clauses count for more (2^-size)
+class JeroslowWang(BranchingHeuristic):
+    def weight(self, size):
+        return 2.0 ** -size
+
+    def polarity(self, var):
+        return var if self.score[var] >= self.score[-var] else -var
+
+# Maximum Occurrences in clauses of Minimum Size: weights are powers of a base bigger than any count,
+# so the occurrences in the shortest clauses decide first, ties are broken by the more balanced variable
+class MOMs(BranchingHeuristic):
+    def setup(self, clauses):
+        self.base = len(clauses) + 1
+        self.maxSize = max((len(clause) for clause in clauses), default=0)
+
+    def weight(self, size):
+        return self.base ** (self.maxSize - size)
+
+    def key(self, var):
+        pos = self.score[var]
+        neg = self.score[-var]
+        return (-(pos + neg), -min(pos, neg))
+
+    def polarity(self, var):
+        return var if self.score[var] >= self.score[-var] else -var
+
+# Heuristics dpll can be given by name
+HEURISTICS = {"maxocc": MaxOccurrence, "dlis": DLIS, "jw": JeroslowWang, "moms": MOMs}
+
+# Groups of clauses that share no variable, smallest first. Union-find over the variables of each clause
+def splitComponents(clauses):
+    parent = {}
+    def find(var):
+        root = parent.setdefault(var, var)
+        while root != parent[root]:
+            parent[root] = parent[parent[root]]  # Path halving
+            root = parent[root]
+        return root
+    for clause in clauses:
+        root = find(abs(clause[0]))
+        for lit in clause[1:]:
+            other = find(abs(lit))
+            if other != root:
+                parent[other] = root
+    groups = {}
+    for clause in clauses:
+        groups.setdefault(find(abs(clause[0])), []).append(clause)
+    return sorted(groups.values(), key=len)
 
-        # Push False then True so True is popped/explored first
-        new_assignment_false = assignment.copy()
-        new_assignment_false[literal] = False
-        stack.append(Node(node, simplify(clauses, -literal), new_assignment_false))
+# Component detection runs at every COMPONENT_INTERVAL-th decision level (and at the root), checking every node
+# costs a pass over the clauses per decision while splits mostly show up after a few levels of assignments
+COMPONENT_INTERVAL = 4
 
-        new_assignment_true = assignment.copy()
-        new_assignment_true[literal] = True
-        stack.append(Node(node, simplify(clauses, literal), new_assignment_true))
+# dpll Algorithm without recursion or copying: one shared WatchedClauses database and one trail,
+# backtracking undoes the trail to a decision level so memory stays O(vars + clauses) at any depth
+# heuristic: BranchingHeuristic subclass (or its name in HEURISTICS) used to pick branches, MaxOccurrence by default
+# budget: Budget (decisions, time, memory), gives up with (None, None) once it runs out, no limit by default
+# stats: SolverStats to fill in (decisions, propagations, conflicts, backtracks, maxDepth, components), None to skip it
+# components: Split the remaining clauses into independent components at selected nodes and solve each on its own
+def dpll(clauses, assignment, heuristic=None, budget=None, stats=None, components=False):
+    isSat, model = dpllSearch(clauses, assignment, heuristic, budget, stats, components)
+    if isSat:
+        print("Found Solution!!!")
+    return isSat, model
 
-    return False, None  # GLOBAL unsatisfiability
+# The search behind dpll, without the printing so it can call itself on components.
+# base: Decisions already made by the searches above this one, they count against the budget as well
+# connected: The clauses are known to be one component, the check at the root is skipped
+def dpllSearch(clauses, assignment, heuristic=None, budget=None, stats=None, components=False, base=0, connected=False):
+    if stats is not None:
+        stats.start("dpll")
+    if budget is not None:
+        budget.start()
+    engine = WatchedClauses(clauses, assignment)
+    if engine.isConflict:
+        if stats is not None:
+            stats.stop()
+        return False, None
+    if heuristic is None:
+        heuristic = MaxOccurrence
+    elif isinstance(heuristic, str):
+        heuristic = HEURISTICS[heuristic]
+    engine.heuristic = heuristic(engine)
+
+    # flipped[level] is True once the False branch of that level's decision is being explored
+    flipped = []
+    trail = engine.trail
+    # Counted in locals, stats only gets them at the end. The sub counters add up the component searches
+    decisions = conflicts = backtracks = maxDepth = undone = 0
+    subDecisions = subConflicts = subBacktracks = subPropagations = splits = 0
+
+    try:
+        while True:
+            # Unit propagation
+            conflict = engine.propagate() is not None
+
+            if (not conflict and components and engine.heuristic.unsatisfied
+                    and len(flipped) % COMPONENT_INTERVAL == 0 and (flipped or not connected)):
+                parts = splitComponents(engine.remainingClauses())
+                if len(parts) > 1:
+                    # Independent parts: the node is SAT when every part is, and UNSAT as soon as one part is
+                    splits += 1
+                    model = dict(engine.assignment)
+                    for part in parts:
+                        child = SolverStats()
+                        isSat, partModel = dpllSearch(part, {}, heuristic, budget, child, components,
+                                                      base + decisions + subDecisions, True)
+                        subDecisions += child.decisions
+                        subConflicts += child.conflicts
+                        subBacktracks += child.backtracks
+                        subPropagations += child.propagations
+                        splits += child.components
+                        maxDepth = max(maxDepth, len(flipped) + child.maxDepth)
+                        if isSat is None:
+                            return None, None  # Out of budget inside the part
+                        if not isSat:
+                            conflict = True
+                            break
+                        model.update(partModel)
+                    else:
+                        return True, model
+
+            if conflict:
+                conflicts += 1
+                # Conflict, backtrack to the deepest decision that still has its False branch left
+                while flipped and flipped[-1]:
+                    flipped.pop()
+                if not flipped:
+                    return False, None  # GLOBAL unsatisfiability
+                level = len(flipped) - 1
+                undone += len(trail)
+                literal = engine.backtrack(level)
+                undone -= len(trail)
+                backtracks += 1
+                flipped[level] = True
+                engine.decide(-literal)
+                continue
+
+            # If every clause is satisfied by the current (possibly partial) assignment -> success
+            if engine.heuristic.unsatisfied == 0:
+                return True, dict(engine.assignment)
+
+            # Need to pick a variable to branch on, the heuristic's polarity is explored first
+            literal = engine.heuristic.pick()
+            if literal is None:
+                return False, None  # Can't happen after a conflict free propagation, kept as a guard
+            if budget is not None and budget.exceeded(decisions=base + decisions + subDecisions):
+                return None, None  # Out of budget, unknown
+            flipped.append(False)
+            decisions += 1
+            if len(flipped) > maxDepth:
+                maxDepth = len(flipped)
+            engine.decide(literal)
+            if stats is not None:
+                stats.tick(decisions=decisions + subDecisions, conflicts=conflicts + subConflicts,
+                           backtracks=backtracks + subBacktracks, maxDepth=maxDepth)
+    finally:
+        if stats is not None:
+            stats.stop()
+            stats.decisions = decisions + subDecisions
+            stats.conflicts = conflicts + subConflicts
+            stats.backtracks = backtracks + subBacktracks
+            stats.maxDepth = maxDepth
+            stats.components = splits
+            # Everything that was ever put on the trail, minus the decisions and flipped decisions
+            stats.propagations = len(trail) + undone - decisions - backtracks + subPropagations
 
 #Simplify all clauses in formula by removing clauses satisfied by literals
 def simplify(clauses, literal):
@@ -103,8 +822,10 @@ def countLiteral(clauses):
     return count
 #Picks the most constraining unassigned literal that has not been chosen yet
 def pickMostConstraining(clauses, assignment):
-    count = countLiteral(clauses)
+    return pickMostCounted(countLiteral(clauses), assignment)
 
+#Picks the unassigned literal with the highest count
+def pickMostCounted(count, assignment):
     bestLit = None
     bestCount = -1
     for lit, cnt in count.items():
@@ -115,79 +836,25 @@ def pickMostConstraining(clauses, assignment):
             bestLit = lit
     return bestLit # All variables assigned
 
+# Unit propagation through the watched literal engine, returns the simplified clauses like before
 def unitPropagation(clauses, assignment):
-    clauses = [list(clause) for clause in clauses]   # avoid mutating input
-    if assignment is None:
-        assignment = {}
-    else:
-        assignment = assignment.copy()
-
-    while True:
-        unit_clause_literal = None
-
-        # Look for a unit clause or an immediate conflict
-        for clause in clauses:
-            # tautology clause, skip it
-            s = set(clause)
-            if any(-lit in s for lit in s):
-                continue
-
-            # If clause already satisfied by current assignment, skip it
-            clause_satisfied = False
-            for lit in clause:
-                if abs(lit) in assignment:
-                    val = assignment[abs(lit)]
-                    if (lit > 0 and val) or (lit < 0 and not val):
-                        clause_satisfied = True
-                        break
-            if clause_satisfied:
-                continue
-
-            # collect literals with unassigned variables
-            unassigned_literals = [lit for lit in clause if abs(lit) not in assignment]
-            unique_unassigned = set(unassigned_literals)
-
-            # If no unassigned literals and clause not satisfied -> conflict
-            if len(unique_unassigned) == 0:
-                return clauses, assignment, True
-
-            # If exactly one unassigned literal -> unit clause
-            if len(unique_unassigned) == 1:
-                unit_clause_literal = next(iter(unique_unassigned))
-                break
-
-        if unit_clause_literal is None:
-            # no unit clause found -> fixpoint
-            break
-
-        # apply assignment forced by unit clause (preserve sign)
-        var = abs(unit_clause_literal)
-        value = unit_clause_literal > 0
-        # If var already assigned inconsistently -> conflict
-        if var in assignment:
-            if assignment[var] != value:
-                return clauses, assignment, True
-            # else already set to same value -> continue
-        else:
-            assignment[var] = value
-
-        # simplify formula with that literal set true
-        clauses = simplify(clauses, unit_clause_literal)
-
-        # After simplification if any empty clause exists -> conflict
-        for c in clauses:
-            if len(c) == 0:
-                return clauses, assignment, True
-
-    return clauses, assignment, False
+    engine = WatchedClauses(clauses, assignment)   # builds its own copy, input is not mutated
+    isConflict = engine.isConflict or engine.propagate() is not None
+    return engine.remainingClauses(), engine.assignment, isConflict
 
 def ClausesSatisfied(formula, assignment):
     # If assignment length does not match number of variables, error + exit
     if (len(assignment) != formula.numVars):
         print("Error: Assignment length does not match number of variables.")
         return -1
+    # Bit-packed assignments are checked a word at a time
+    if isinstance(assignment, Assignment):
+        if formula.clauseMasks is None:
+            formula.clauseMasks = ClauseMasks(formula.clausesOriginal)
+        return formula.clauseMasks.countSatisfied(assignment)
     clausesatisfied = 0;
     clausenum = -1
+    clausesNegation = formula.clausesNegation
 
     # For each clause in formula, check if satisfied by assignment
     for clause in formula.clausesRaw:
@@ -196,10 +863,11 @@ def ClausesSatisfied(formula, assignment):
         varsatisfied = 0
         # use clauseNegation (same size as clauseRaw), 
         # which replaces values such as [1, -3, 4] with [1, 0, 1] for easier checking]
+        negation = clausesNegation[clausenum]
         for var in clause:
             varnum += 1
             assignmentsign = assignment[var-1]
-            clausesign = formula.clausesNegation[clausenum][varnum]
+            clausesign = negation[varnum]
             assignmentsign = int(assignmentsign)
             if (assignmentsign == clausesign):
                 varsatisfied = 1
@@ -212,129 +880,532 @@ def ClausesSatisfied(formula, assignment):
            
             
 
-def LocalSearch(formula):
+'''
+FlipScorer Class:
+    Clause bookkeeping for local search, built once per formula and reused for every restart
+    numVars: Number of variables in the formula
+    clauses: Signed clauses with duplicate literals removed (tautologies are left out)
+    alwaysSatisfied: Number of tautologies, satisfied whatever the assignment
+    posOcc / negOcc: posOcc[var] / negOcc[var] are the clauses var shows up in positively / negatively
+    values: Current assignment, values[var] is True or False (list for the inner loops)
+    assignment: The same assignment bit-packed, flipped in place alongside values
+    trueCount: Number of true literals in each clause under the current assignment
+    numSatisfied: Clauses satisfied by the current assignment (same number ClausesSatisfied gives)
+'''
+class FlipScorer:
+    def __init__(self, formula):
+        numVars = formula.numVars
+        self.numVars = numVars
+        self.clauses = []
+        self.alwaysSatisfied = 0
+        self.posOcc = [[] for i in range(numVars + 1)]
+        self.negOcc = [[] for i in range(numVars + 1)]
+        for clause in formula.clausesOriginal:
+            lits = list(dict.fromkeys(clause))
+            s = set(lits)
+            if any(-lit in s for lit in lits):
+                self.alwaysSatisfied += 1
+                continue
+            index = len(self.clauses)
+            self.clauses.append(lits)
+            for lit in lits:
+                if lit > 0:
+                    self.posOcc[lit].append(index)
+                else:
+                    self.negOcc[-lit].append(index)
+        self.values = [False] * (numVars + 1)
+        self.assignment = Assignment(numVars)
+        self.trueCount = [0] * len(self.clauses)
+        self.numSatisfied = self.alwaysSatisfied
+
+    # Load an Assignment (or "0101..." string) and count the true literals of every clause
+    def reset(self, assignment):
+        if isinstance(assignment, str):
+            assignment = Assignment.fromString(assignment)
+        self.assignment.copyFrom(assignment)
+        values = self.values
+        for var in range(1, self.numVars + 1):
+            values[var] = assignment.get(var)
+        trueCount = self.trueCount
+        numSatisfied = self.alwaysSatisfied
+        for index, clause in enumerate(self.clauses):
+            count = 0
+            for lit in clause:
+                if values[abs(lit)] == (lit > 0):
+                    count += 1
+            trueCount[index] = count
+            if count:
+                numSatisfied += 1
+        self.numSatisfied = numSatisfied
+
+    # Clauses that would become unsatisfied if var was flipped
+    def breakCount(self, var):
+        trueCount = self.trueCount
+        trueOcc = self.posOcc[var] if self.values[var] else self.negOcc[var]
+        return sum(1 for index in trueOcc if trueCount[index] == 1)
+
+    # Clauses that would become satisfied if var was flipped
+    def makeCount(self, var):
+        trueCount = self.trueCount
+        falseOcc = self.negOcc[var] if self.values[var] else self.posOcc[var]
+        return sum(1 for index in falseOcc if trueCount[index] == 0)
+
+    # Change in the number of satisfied clauses if var was flipped (make - break)
+    def delta(self, var):
+        trueCount = self.trueCount
+        if self.values[var]:
+            trueOcc = self.posOcc[var]
+            falseOcc = self.negOcc[var]
+        else:
+            trueOcc = self.negOcc[var]
+            falseOcc = self.posOcc[var]
+        delta = 0
+        for index in falseOcc:
+            if trueCount[index] == 0:
+                delta += 1
+        for index in trueOcc:
+            if trueCount[index] == 1:
+                delta -= 1
+        return delta
+
+    def flip(self, var):
+        trueCount = self.trueCount
+        if self.values[var]:
+            trueOcc = self.posOcc[var]
+            falseOcc = self.negOcc[var]
+        else:
+            trueOcc = self.negOcc[var]
+            falseOcc = self.posOcc[var]
+        for index in trueOcc:
+            trueCount[index] -= 1
+            if trueCount[index] == 0:
+                self.numSatisfied -= 1
+        for index in falseOcc:
+            trueCount[index] += 1
+            if trueCount[index] == 1:
+                self.numSatisfied += 1
+        self.values[var] = not self.values[var]
+        self.assignment.flip(var)
+
+    # Current assignment as a "0101..." string
+    def assignmentString(self):
+        return self.assignment.toString()
+
+# scorer: FlipScorer for this formula, pass the same one in when running many restarts so it is only built once
+# budget: Budget (flips, time, memory), the assignment reached when it runs out is returned
+def LocalSearch(formula, scorer=None, stats=None, budget=None):
+    if stats is not None:
+        stats.start("greedy")
+    if budget is not None:
+        budget.start()
     # Initialize assignment: 50-50 for each var being a 1 or 0
-    assignment = ""
-    for i in range(formula.numVars):
-        if random.choice([True, False]) == True:
-            assignment += "1"
-        else: 
-            assignment += "0"
-    
-    # set best assignemnt and best satisfied clauses to be initial
-    best_assignment = assignment
-    best_satisfied = ClausesSatisfied(formula, assignment)
+    assignment = Assignment.random(formula.numVars)
+
+    if scorer is None:
+        scorer = FlipScorer(formula)
+    scorer.reset(assignment)
     improved = True
+    flips = 0
 
     # As long as we can improve number of clauses statisfied with only 1 bit flip, keep going
     while (improved == True):
         improved = False
-        for j in range(len(assignment)):
-            # Flip each individual bit and check if better
-            if assignment[j] == "0":
-                flipped = "1" 
-            else:
-                flipped = "0"
-            assignmenttemp = assignment[:j] + flipped + assignment[j+1:]
-            numsatisfied = ClausesSatisfied(formula, assignmenttemp)
-            
-            # if better, update bests and break to restart from beginning (no need to check rest of bitflip possibilities)
-            if numsatisfied > best_satisfied:
+        if budget is not None and budget.exceeded(flips=flips):
+            break
+        for var in range(1, formula.numVars + 1):
+            # Only the clauses var is in are looked at to score its flip
+            # if better, flip it and break to restart from beginning (no need to check rest of bitflip possibilities)
+            if scorer.delta(var) > 0:
                 improved = True
-                best_satisfied = numsatisfied
-                assignment = assignmenttemp
-                best_assignment = assignmenttemp
+                scorer.flip(var)
+                flips += 1
+                if stats is not None:
+                    stats.tick(flips=flips)
                 break
-    return best_assignment
+    if stats is not None:
+        stats.stop()
+        stats.flips = flips
+        stats.tries = 1
+        stats.bestFitness.append(scorer.numSatisfied)
+    return scorer.assignmentString()
 
-def GeneticAlgorithm(formula, population_size, generations, mutation_proportion, crossover_amount):
-    
-    # Initialize empty arrays and first set of assignemnts
-    assignment = ""
+'''
+BreakScorer Class:
+    FlipScorer that also keeps the unsatisfied clauses and the break count of every variable up to date
+    unsat: Indices of the clauses not satisfied by the current assignment (any order)
+    unsatPos: Position of each clause in unsat, -1 when satisfied (O(1) add and remove)
+    breaks: breaks[var] = number of clauses where var has the only true literal
+'''
+class BreakScorer(FlipScorer):
+    def __init__(self, formula):
+        FlipScorer.__init__(self, formula)
+        self.unsat = []
+        self.unsatPos = [-1] * len(self.clauses)
+        self.breaks = [0] * (self.numVars + 1)
+
+    def reset(self, assignment):
+        FlipScorer.reset(self, assignment)
+        values = self.values
+        breaks = self.breaks
+        for var in range(len(breaks)):
+            breaks[var] = 0
+        self.unsat = []
+        for index, clause in enumerate(self.clauses):
+            count = self.trueCount[index]
+            if count == 0:
+                self.unsatPos[index] = len(self.unsat)
+                self.unsat.append(index)
+            else:
+                self.unsatPos[index] = -1
+                if count == 1:
+                    for lit in clause:
+                        if values[abs(lit)] == (lit > 0):
+                            breaks[abs(lit)] += 1
+                            break
+
+    def breakCount(self, var):
+        return self.breaks[var]
+
+    def flip(self, var):
+        clauses = self.clauses
+        values = self.values
+        trueCount = self.trueCount
+        breaks = self.breaks
+        if values[var]:
+            trueOcc = self.posOcc[var]
+            falseOcc = self.negOcc[var]
+        else:
+            trueOcc = self.negOcc[var]
+            falseOcc = self.posOcc[var]
+        values[var] = not values[var]
+        self.assignment.flip(var)
+
+        # Literals of var that were true are now false
+        for index in trueOcc:
+            trueCount[index] -= 1
+            count = trueCount[index]
+            if count == 0:
+                # var was the only true literal, clause is now unsatisfied
+                breaks[var] -= 1
+                self.numSatisfied -= 1
+                self.unsatPos[index] = len(self.unsat)
+                self.unsat.append(index)
+            elif count == 1:
+                # The one true literal left is now critical
+                for lit in clauses[index]:
+                    if values[abs(lit)] == (lit > 0):
+                        breaks[abs(lit)] += 1
+                        break
+
+        # Literals of var that were false are now true
+        for index in falseOcc:
+            trueCount[index] += 1
+            count = trueCount[index]
+            if count == 1:
+                # Clause satisfied again, only by var
+                breaks[var] += 1
+                self.numSatisfied += 1
+                pos = self.unsatPos[index]
+                last = self.unsat.pop()
+                if last != index:
+                    self.unsat[pos] = last
+                    self.unsatPos[last] = pos
+                self.unsatPos[index] = -1
+            elif count == 2:
+                # The literal that was critical no longer is
+                for lit in clauses[index]:
+                    v = abs(lit)
+                    if v != var and values[v] == (lit > 0):
+                        breaks[v] -= 1
+                        break
+
+# Stochastic local search with restarts, returns the best "0101..." assignment found
+# variant: "walksat" (flip a zero break variable if there is one, otherwise a random variable with probability noise
+#          and the lowest break otherwise) or "probsat" (pick with probability (eps + break)^-cb)
+# max_flips: flips per try, max_tries: random restarts, stops early once every clause is satisfied
+# budget: Budget (total flips over every try, time, memory), the best assignment so far is returned when it runs out
+def StochasticLocalSearch(formula, variant="walksat", noise=0.567, cb=2.06, eps=0.9, max_flips=100000, max_tries=10, scorer=None, stats=None, budget=None):
+    if variant not in ("walksat", "probsat"):
+        raise ValueError(f"Unknown local search variant: {variant}")
+    if stats is not None:
+        stats.start(variant)
+    if budget is not None:
+        budget.start()
+    if scorer is None:
+        scorer = BreakScorer(formula)
+    clauses = scorer.clauses
+    breaks = scorer.breaks
+    # ProbSAT weights only depend on the break count, no need to redo the power every flip.
+    # A break count is at most the number of clauses the variable is in
+    occurrences = [0] * (formula.numVars + 1)
+    for clause in clauses:
+        for lit in clause:
+            occurrences[abs(lit)] += 1
+    probWeights = [(eps + b) ** -cb for b in range(max(occurrences) + 1)]
+    # An empty clause is never satisfied and has no literal to flip, the first assignment is kept (LocalSearch stops
+    # the same way once no flip helps)
+    hasEmptyClause = any(len(clause) == 0 for clause in clauses)
+
+    best_assignment = Assignment(formula.numVars)
+    best_satisfied = -1
+    flips = 0
+    for attempt in range(max_tries):
+        # Initialize assignment: 50-50 for each var being a 1 or 0
+        scorer.reset(Assignment.random(formula.numVars))
+
+        for flip in range(max_flips):
+            if scorer.numSatisfied > best_satisfied:
+                best_satisfied = scorer.numSatisfied
+                best_assignment.copyFrom(scorer.assignment)
+            unsat = scorer.unsat
+            if not unsat or hasEmptyClause:
+                break  # every clause satisfied, or one never can be
+            if budget is not None and budget.exceeded(flips=flips):
+                break
+
+            clause = clauses[unsat[random.randrange(len(unsat))]]
+            if variant == "walksat":
+                candidates = []
+                lowest = None
+                for lit in clause:
+                    b = breaks[abs(lit)]
+                    if lowest is None or b < lowest:
+                        lowest = b
+                        candidates = [abs(lit)]
+                    elif b == lowest:
+                        candidates.append(abs(lit))
+                if lowest > 0 and random.random() < noise:
+                    var = abs(random.choice(clause))
+                else:
+                    var = random.choice(candidates)
+            else:
+                weights = [probWeights[breaks[abs(lit)]] for lit in clause]
+                var = abs(random.choices(clause, weights)[0])
+            scorer.flip(var)
+            flips += 1
+            if stats is not None:
+                stats.tick(flips=flips, tries=attempt + 1)
+
+        if scorer.numSatisfied > best_satisfied:
+            best_satisfied = scorer.numSatisfied
+            best_assignment.copyFrom(scorer.assignment)
+        if not scorer.unsat or hasEmptyClause or (budget is not None and budget.reason is not None):
+            break  # every clause satisfied (or out of budget, or an empty clause), no more tries needed
+    if stats is not None:
+        stats.stop()
+        stats.flips = flips
+        stats.tries = attempt + 1
+        stats.bestFitness.append(best_satisfied)
+    return best_assignment.toString()
+
+# Random starting population and the number of clauses each one satisfies
+# budget: Budget checked before every individual after the first, on big formulas the population alone can take longer
+# than the time limit, a population cut short is smaller than population_size
+def GeneticPopulation(formula, population_size, budget=None):
     population_group = []
     clauses_satisfied_group = []
-    inverted_prob_group = []
-
-    # Create initial population
     for i in range(population_size):
-        assignment = ""  # reset each time
-        for i in range(formula.numVars):  # Generates random string assignment that is the size of the # of vars in formula
-            if random.choice([True, False]) == True:
-                assignment += "1"
-            else: 
-                assignment += "0"
+        if i and budget is not None and budget.exceeded():
+            break
+        assignment = Assignment.random(formula.numVars)  # random assignment that is the size of the # of vars in formula
 
         numsatisfied = ClausesSatisfied(formula, assignment) # Also append their # of clauses satisfied + the actual assignment
         # Also append their # of clauses satisfied + the actual assignment
         population_group.append(assignment)
         clauses_satisfied_group.append(numsatisfied)
+    return population_group, clauses_satisfied_group
+
+# One generation of the Genetic Algorithm, breeds, mutates and culls both lists in place.
+# Returns the number of fitness evaluations (ClausesSatisfied calls) it made
+# budget: Budget checked before every offspring, a generation cut short keeps the offspring made so far and skips the
+# mutation and culling, so a time limit holds on formulas where one generation takes a long time
+def GeneticGeneration(formula, population_group, clauses_satisfied_group, mutation_proportion, crossover_amount, budget=None):
+    evaluations = 0
+    # Generate new population from current population (Tournament selection for parents)
+    for x in range(crossover_amount):  
+        if budget is not None and budget.exceeded():
+            return evaluations
+        evaluations += 1
+        tournament_size = 3
+        tournament_selection = []
+        # Pick X num of random assigments, let the best fit once be the Father
+        for t in range(tournament_size):
+            rand_index = random.randint(0, len(population_group) - 1)
+            tournament_selection.append((population_group[rand_index], clauses_satisfied_group[rand_index]))
+        father = max(tournament_selection, key=lambda item: item[1])[0]
+        # Reset and rerun for mom
+        tournament_selection = []
+        for t in range(tournament_size):
+            rand_index = random.randint(0, len(population_group) - 1)
+            tournament_selection.append((population_group[rand_index], clauses_satisfied_group[rand_index]))
+        mother = max(tournament_selection, key=lambda item: item[1])[0]
+
+        # 50% chance for each bit to come from either parent (a 64 bit word at a time)
+        assignment = father.crossover(mother)
+
+        # Adding new assignments to population array
+        numsatisfied = ClausesSatisfied(formula, assignment)
+        population_group.append(assignment)
+        clauses_satisfied_group.append(numsatisfied)
+
+    # Mutate some assignments in population
+    for pos in range(len(population_group)):
+        if random.random() <= mutation_proportion:
+            # Flip bit in place
+            population_group[pos].flip(random.randint(1, formula.numVars))
+            # Update clauses satisfied after mutation
+            clauses_satisfied_group[pos] = ClausesSatisfied(formula, population_group[pos])
+            evaluations += 1
+    
+    # Create inverted probabilities, which is the number of clauses NOT satisfied,
+    # Divides by the total sum of clauses not satisfied from the whole population
+    inverted_prob_group = []
+    for j in range(len(population_group)):
+        inverted_prob = formula.numClauses - clauses_satisfied_group[j]
+        inverted_prob_group.append(inverted_prob)
+
+    # Cull the assignments from population (Weighted to remove assignments that satisfy less clauses)
+    for j in range(crossover_amount):
+        total_satisfied_gen = sum(inverted_prob_group)
+        chosen_assignment = random.randint(1, total_satisfied_gen)
+        i = 0
+        while i < len(inverted_prob_group) - 1 and chosen_assignment > inverted_prob_group[i]:
+            chosen_assignment -= inverted_prob_group[i]
+            i += 1
+        # Remove selected weak individual
+        del population_group[i]
+        del clauses_satisfied_group[i]
+        del inverted_prob_group[i]
+    return evaluations
+
+# Genetic Algorithm parameters of every run, SATSolver.main and the other runners all import these.
+# 2% chance for an assignment to mutate 1 bit, 1/3 of the population is culled each generation
+POPULATION_SIZE = 100
+GENERATIONS = 150
+MUTATION_PROPORTION = .02
+CROSSOVER_AMOUNT = int(POPULATION_SIZE / 3)
+
+# Stops early once an assignment satisfies every clause
+# budget: Budget (generations, time, memory), the best assignment so far is returned when it runs out
+def GeneticAlgorithm(formula, population_size, generations, mutation_proportion, crossover_amount, stats=None, budget=None):
+    if stats is not None:
+        stats.start("genetic")
+    if budget is not None:
+        budget.start()
+    
+    # Initialize first set of assignemnts (bit-packed, see Assignment)
+    population_group, clauses_satisfied_group = GeneticPopulation(formula, population_size, budget)
+    evaluations = len(population_group)
+    gens = 0
     
     # Breed to get pop + cullnum
     for gen in range(generations):
-        # Generate new population from current population (Tournament selection for parents)
-        for x in range(crossover_amount):  
-            tournament_size = 3
-            tournament_selection = []
-            # Pick X num of random assigments, let the best fit once be the Father
-            for t in range(tournament_size):
-                rand_index = random.randint(0, len(population_group) - 1)
-                tournament_selection.append((population_group[rand_index], clauses_satisfied_group[rand_index]))
-            father = max(tournament_selection, key=lambda item: item[1])[0]
-            # Reset and rerun for mom
-            tournament_selection = []
-            for t in range(tournament_size):
-                rand_index = random.randint(0, len(population_group) - 1)
-                tournament_selection.append((population_group[rand_index], clauses_satisfied_group[rand_index]))
-            mother = max(tournament_selection, key=lambda item: item[1])[0]
-
-            assignment = ""
-            # 50% chance for each bit to come from either parent
-            for j in range(len(father)):
-                if random.choice([True, False]) == True:
-                    assignment += father[j]
-                else: 
-                    assignment += mother[j]
-
-            # Adding new assignments to population array
-            numsatisfied = ClausesSatisfied(formula, assignment)
-            population_group.append(assignment)
-            clauses_satisfied_group.append(numsatisfied)
-
-        # Mutate some assignments in population
-        for pos in range(len(population_group)):
-            if random.random() <= mutation_proportion:
-                mutatepos = random.randint(0,formula.numVars-1)
-                # Flip bit
-                if population_group[pos][mutatepos] == "0":
-                    flipped = "1"
-                else:
-                    flipped = "0"
-                population_group[pos] = population_group[pos][:mutatepos] + flipped + population_group[pos][mutatepos+1:]
-            # Update clauses satisfied after mutation
-            clauses_satisfied_group[j] = ClausesSatisfied(formula, population_group[j])
-        
-        # Create inverted probabilities, which is the number of clauses NOT satisfied,
-        # Divides by the total sum of clauses not satisfied from the whole population
-        inverted_prob_group = []
-        for j in range(len(population_group)):
-            inverted_prob = formula.numClauses - clauses_satisfied_group[j]
-            inverted_prob_group.append(inverted_prob)
-
-        # Cull the assignments from population (Weighted to remove assignments that satisfy less clauses)
-        for j in range(crossover_amount):
-            total_satisfied_gen = sum(inverted_prob_group)
-            chosen_assignment = random.randint(1, total_satisfied_gen)
-            i = 0
-            while i < len(inverted_prob_group) - 1 and chosen_assignment > inverted_prob_group[i]:
-                chosen_assignment -= inverted_prob_group[i]
-                i += 1
-            # Remove selected weak individual
-            del population_group[i]
-            del clauses_satisfied_group[i]
-            del inverted_prob_group[i]
-        
-        # return the best assignment after all generations complete
-        max_satisfied_index = clauses_satisfied_group.index(max(clauses_satisfied_group))
+        if max(clauses_satisfied_group) == formula.numClauses:
+            break  # every clause satisfied, nothing left to improve
+        if budget is not None and budget.exceeded(generations=gens):
+            break
+        gens += 1
+        evaluations += GeneticGeneration(formula, population_group, clauses_satisfied_group, mutation_proportion, crossover_amount,
+                                         budget)
+        if stats is not None:
+            stats.bestFitness.append(max(clauses_satisfied_group))
+            stats.tick(evaluations=evaluations, generations=gens)
+
+    if stats is not None:
+        stats.stop()
+        stats.evaluations = evaluations
+        stats.generations = gens
+
+    # return the best assignment after all generations complete
+    max_satisfied_index = clauses_satisfied_group.index(max(clauses_satisfied_group))
+    return population_group[max_satisfied_index].toString()
+
+# Clause variable indices (0 based), signs (1 for a positive literal) and a mask for the padding of shorter clauses,
+# each shaped (clauses x longest clause) so a whole population can be scored with one comparison
+def clauseArrays(formula):
+    width = max((len(clause) for clause in formula.clausesOriginal), default=0)
+    numClauses = len(formula.clausesOriginal)
+    variables = np.zeros((numClauses, width), dtype=np.intp)
+    signs = np.zeros((numClauses, width), dtype=np.uint8)
+    valid = np.zeros((numClauses, width), dtype=bool)
+    for index, clause in enumerate(formula.clausesOriginal):
+        for pos, lit in enumerate(clause):
+            variables[index, pos] = abs(lit) - 1
+            signs[index, pos] = 1 if lit > 0 else 0
+            valid[index, pos] = True
+    return variables, signs, valid
+
+# Number of clauses each row (assignment) of a (population x vars) uint8 array satisfies
+def populationFitness(population, variables, signs, valid):
+    literalTrue = (population[:, variables] == signs) & valid
+    return literalTrue.any(axis=2).sum(axis=1)
+
+# Same algorithm as GeneticAlgorithm with the population kept as a (population x vars) uint8 array,
+# every step (tournaments, crossover, mutation, fitness and culling) runs on the whole population at once.
+# Needs numpy, the random stream is seeded from the random module unless a seed is given.
+# budget: Budget (generations, time, memory), the best assignment so far is returned when it runs out
+def GeneticAlgorithmNumpy(formula, population_size, generations, mutation_proportion, crossover_amount, seed=None, stats=None, budget=None):
+    if np is None:
+        raise ImportError("GeneticAlgorithmNumpy needs numpy (pip install numpy)")
+    if stats is not None:
+        stats.start("genetic-numpy")
+    if budget is not None:
+        budget.start()
+    rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+    variables, signs, valid = clauseArrays(formula)
+    numClauses = len(formula.clausesOriginal)
+    numVars = formula.numVars
+    tournament_size = 3
+
+    # Create initial population, 50-50 for each bit
+    population = rng.integers(0, 2, size=(population_size, numVars), dtype=np.uint8)
+    fitness = populationFitness(population, variables, signs, valid)
+    evaluations = len(population)
+    gens = 0
+
+    for gen in range(generations):
+        if fitness.max() == numClauses:
+            break  # every clause satisfied, nothing left to improve
+        if budget is not None and budget.exceeded(generations=gens):
+            break
+        gens += 1
+
+        # Tournament selection for every father and mother at once, best of tournament_size random picks
+        size = len(population)
+        fathers = rng.integers(0, size, size=(crossover_amount, tournament_size))
+        mothers = rng.integers(0, size, size=(crossover_amount, tournament_size))
+        rows = np.arange(crossover_amount)
+        fathers = fathers[rows, fitness[fathers].argmax(axis=1)]
+        mothers = mothers[rows, fitness[mothers].argmax(axis=1)]
+
+        # Uniform crossover, 50% chance for each bit to come from either parent
+        fromFather = rng.random((crossover_amount, numVars)) < 0.5
+        children = np.where(fromFather, population[fathers], population[mothers])
+        population = np.concatenate((population, children))
+
+        # Mutate some assignments in population (flip one random bit each)
+        mutated = np.flatnonzero(rng.random(len(population)) <= mutation_proportion)
+        population[mutated, rng.integers(0, numVars, size=len(mutated))] ^= 1
+        fitness = populationFitness(population, variables, signs, valid)
+        evaluations += len(population)
+        if stats is not None:
+            stats.bestFitness.append(int(fitness.max()))
+            stats.tick(evaluations=evaluations, generations=gens)
 
-    return population_group[max_satisfied_index]
+        # Cull crossover_amount assignments, weighted by the number of clauses they do NOT satisfy
+        unsatisfied = (numClauses - fitness).astype(float)
+        if np.count_nonzero(unsatisfied) < crossover_amount:
+            break  # more than the survivors satisfy every clause
+        culled = rng.choice(len(population), size=crossover_amount, replace=False, p=unsatisfied / unsatisfied.sum())
+        keep = np.ones(len(population), dtype=bool)
+        keep[culled] = False
+        population = population[keep]
+        fitness = fitness[keep]
 
+    if stats is not None:
+        stats.stop()
+        stats.evaluations = evaluations
+        stats.generations = gens
+    # return the best assignment as the usual "0101..." string
+    best = population[fitness.argmax()]
+    return "".join("1" if bit else "0" for bit in best)
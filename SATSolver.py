@@ -1,87 +1,238 @@
 """
 Description: A simple SAT solver using the DPLL algorithm, and more
 """
-import copy
+import argparse
 import glob
 import os
 import time
-import pandas as pd
+import random
 from SATClass import *
 import SATClass
-
-def load_cnf_files(folder_path, file_list):
-    # Search for all .cnf files in the specified folder and its subfolders (in github repo)
-    for file_path in glob.glob(os.path.join(folder_path, '**', '*.cnf'), recursive=True):
-        file_list.append(file_path)
+from dpll import cdcl
+from dimacs import iter_cnf_files
+from preprocess import Preprocessor
+from stats import SolverStats, Instrument, STATS_COLUMNS
+from budget import Budget
+from results import ResultSink, RESULT_COLUMNS, print_summary
+from solvecache import SolveCache
+from modelcount import count_models
+from cnfcache import FormulaCache
+from parallel import run_parallel, portfolio_solve, cube_and_conquer, island_genetic_algorithm, job_seed, PORTFOLIO_ENGINES
+
+# Complete solvers that can fill the DPLL column
+COMPLETE_SOLVERS = {"dpll": dpll, "cdcl": cdcl, "cube": cube_and_conquer}
+
+def load_cnf_files(folder_path, file_list, patterns=('*.cnf',)):
+    # Search for all .cnf files (or any other patterns, e.g. '*.rcnf') in the specified folder and its subfolders (in github repo)
+    for pattern in patterns:
+        for file_path in glob.glob(os.path.join(folder_path, '**', pattern), recursive=True):
+            file_list.append(file_path)
     return file_list
 
 
-def read_cnf_files(file_list):
-    #Read CNF files into File class objects and return a list of those objects.
+def stream_cnf_files(file_list, cache=None):
+    # Yield File objects one at a time, each file is read in one go and parsed by dimacs.parse_dimacs
+    # or mapped from the FormulaCache when one is given
+    files = cache.iterFiles(file_list) if cache is not None else iter_cnf_files(file_list)
+    for file_info in files:
+        print(f"Loaded File: {file_info.fileN:40} | Contains: {file_info.numClauses:3} clauses.")
+        yield file_info
+
 
-    file_objects = []
-
-    for file_path in file_list:
-        clauses = []  # Reset clause list for each file
-        with open(file_path, "r") as f:
-            for line in f:
-                line = line.strip()
-                # Skip comments and empty lines
-                if not line or line.startswith('c'):
-                    continue
-                # Grab the p line data
-                if line.startswith('p'):
-                    parts = line.split()
-                    num_vars = int(parts[2])
-                    num_clauses = int(parts[3])
-                    continue
-                # Grab a clause line (formatted as space-separated integers ending with 0)
-                clause = list(map(int, line.split()))
-                if clause[-1] == 0:
-                    clause = clause[:-1]  # Remove the trailing 0
-                clauses.append(clause)
-                # Stop after reading all clauses listed in the header
-                if len(clauses) >= num_clauses:
-                    break
-
-        # Just adding a dummy values until negation function is called later
-        negated_clauses = copy.deepcopy(clauses)
-
-        # creating original clauses copy for DPLL use
-        original_clauses = copy.deepcopy(clauses)
-
-        # Build File object and add to list (This is our meat and taters) and append to array
-        file_info = File(file_path, len(clauses), num_vars, clauses, negated_clauses, original_clauses)
-        file_objects.append(file_info)
-
-        print(f"Loaded File: {file_path:40} | Contains: {len(clauses):3} clauses.")
-
-    return file_objects
+def read_cnf_files(file_list, cache=None):
+    #Read CNF files into File class objects and return a list of those objects.
+    return list(stream_cnf_files(file_list, cache))
 
 def create_negation(formula):
-    # Create the negation of the formula by flipping the literals in each clause ([1,-2,3] becomes [1,2,3] and [1,0,1])])
-    # Will also convert all literals to their absolute values for easier processing later (makes it easier to grab variable)
-    formula.clausesNegation = copy.deepcopy(formula.clausesRaw)
-    for clause in formula.clausesNegation:
-            for i in range(len(clause)):
-                if clause[i] > 0:
-                    clause[i] = 1
-                else:
-                    clause[i] = 0
-    for clause in formula.clausesRaw:
-        for i in range(len(clause)):
-            clause[i] = abs(clause[i])
-
-def update_running_avg(run, avg, run_index):
-    # run_index: number of previous runs already included (0-based)
-    for i, v in enumerate(run):
-        if i >= len(avg):
-            avg.append(v)
-        else:
-            avg[i] = (avg[i] * run_index + v) / (run_index + 1)
-def main():
+    # clausesNegation ([1,-2,3] becomes [1,0,1]) and clausesRaw ([1,-2,3] becomes [1,2,3]) are views File
+    # builds from its literal array the first time they are used, this just builds them up front
+    formula.clausesNegation
+    formula.clausesRaw
+
+def preprocess_formula(formula):
+    # Reduced copy of formula and the Preprocessor that turns its models back into models of formula
+    preprocessor = Preprocessor(formula)
+    reduced = preprocessor.run()
+    print(preprocessor.report())
+    return reduced, preprocessor
+
+def proved_unsat(preprocessor):
+    # True when preprocessing derived the empty clause, Local Search and GA then have nothing to search
+    return preprocessor is not None and preprocessor.isUnsat
+
+def print_progress(stats):
+    print(f"  ... {stats}")
+
+def new_stats(args):
+    # SolverStats for one engine run when any of the stats options is on, None otherwise (engines then skip all of it)
+    if not (args.stats or args.profile or args.trace_memory or args.progress):
+        return None
+    return SolverStats(progress=print_progress if args.progress else None, interval=args.progress or 1.0)
+
+def budget_limits(args):
+    # Budget arguments (time, decisions, flips, generations, memory in bytes) when any limit is given, None otherwise.
+    # A tuple so it can go to the worker processes, which make their own Budget of it
+    limits = (args.time_limit, args.max_decisions, args.max_flips, args.max_generations, args.memory_limit)
+    if all(limit is None for limit in limits):
+        return None
+    return (args.time_limit, args.max_decisions, args.max_flips, args.max_generations,
+            None if args.memory_limit is None else args.memory_limit * 1024 * 1024)
+
+def new_budget(args):
+    # Budget for one engine run when any limit is given, None otherwise
+    limits = budget_limits(args)
+    return None if limits is None else Budget(*limits)
+
+def remember_assignment(solve_cache, formula, best, engine, seconds):
+    # Store a "0101..." assignment in the solve cache when it satisfies every clause
+    if solve_cache is not None and ClausesSatisfied(formula, best) == formula.numClauses:
+        solve_cache.store(formula, True, Assignment.fromString(best).toDict(), engine, seconds)
+
+def report_budget(budget):
+    if budget is not None and budget.reason is not None:
+        print(f"Stopped early, out of {budget.reason} after {budget.elapsed():.3f} seconds")
+
+def report_stats(stats):
+    if stats is None:
+        return
+    print(f"Stats: {stats}")
+    if stats.profile:
+        print(stats.profile)
+
+def stats_row(stats):
+    # Extra CSV columns of one row, empty when no stats were collected for it
+    return stats.row() if stats is not None else {}
+
+def job_row(index, path, algorithm, repetition, seed):
+    # Identifying columns of one job's results row, the seed is the one the job runs with
+    return {"Formula": index, "Algorithm": algorithm, "File": path, "Repetition": repetition,
+            "Seed": job_seed(seed, index, algorithm, repetition)}
+
+def compare_heuristics(formulas, names):
+    # Time dpll with each branching heuristic over the same formulas, nothing else is run
+    print(f"{'Heuristic':10} {'Formulas':>8} {'SAT':>5} {'Total (s)':>10} {'Mean (s)':>9} {'Max (s)':>8}")
+    for name in names:
+        times = []
+        satisfiable = 0
+        for formula in formulas:
+            startTime = time.time()
+            isSat, assignment = dpll(formula.clausesOriginal, {}, HEURISTICS[name])
+            times.append(time.time() - startTime)
+            satisfiable += isSat
+        print(f"{name:10} {len(times):8} {satisfiable:5} {sum(times):10.3f} {sum(times) / len(times):9.4f} {max(times):8.3f}")
+
+def count_formulas(formulas, cacheSize):
+    # Count the models of every formula (#SAT) and print the component cache figures, nothing else is run
+    totalTime = 0
+    for formula in formulas:
+        startTime = time.time()
+        count, counter = count_models(formula, cacheSize * 1024 * 1024)
+        elapsed = time.time() - startTime
+        totalTime += elapsed
+        print(f"{formula.fileN}: {count} models in {elapsed:.3f} seconds\n {counter.report()}\n")
+    print(f"Model counting total: {totalTime:.3f} seconds")
+
+def run_portfolio(formulas, engines, timeout, seed, heuristic, limits=None):
+    # Race the engines on every formula, print who answered first and how often each engine won
+    wins = {engine: 0 for engine in engines}
+    totalTime = 0
+    for formula in formulas:
+        isSat, assignments, winner, elapsed = portfolio_solve(formula, engines, timeout, seed, heuristic, limits)
+        totalTime += elapsed
+        verdict = "UNKNOWN" if isSat is None else ("SAT" if isSat else "UNSAT")
+        print(f"Portfolio on {formula.fileN}: {verdict} by {winner} in {elapsed:.3f} seconds\n")
+        if winner is not None:
+            wins[winner] += 1
+    print(f"Portfolio total: {totalTime:.3f} seconds, wins: " + ", ".join(f"{engine} {count}" for engine, count in wins.items()))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run DPLL, Local Search and Genetic Algorithm over the HARD CNF formulas")
+    parser.add_argument("--complete", choices=sorted(COMPLETE_SOLVERS), default="dpll",
+                        help="complete solver used for the DPLL column (default: dpll)")
+    parser.add_argument("--local", choices=["greedy", "walksat", "probsat"], default="greedy",
+                        help="local search used for the Local Search column: greedy hill climbing, WalkSAT or ProbSAT (default: greedy)")
+    parser.add_argument("--genetic", choices=["python", "numpy"], default="python",
+                        help="genetic algorithm population engine: python strings or numpy arrays (needs numpy, default: python)")
+    parser.add_argument("--preprocess", action="store_true",
+                        help="simplify each formula once (units, pure literals, subsumption, variable elimination, probing) before every engine")
+    parser.add_argument("--stats", action="store_true",
+                        help="collect solver statistics (decisions, conflicts, flips, fitness evaluations...) and add them to the CSV")
+    parser.add_argument("--progress", type=float, metavar="SECONDS",
+                        help="print the statistics of the running engine every SECONDS seconds (implies --stats)")
+    parser.add_argument("--profile", action="store_true",
+                        help="run every engine under cProfile and print the top functions (implies --stats)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="track the peak memory of every engine with tracemalloc (implies --stats)")
+    parser.add_argument("--time-limit", type=float, metavar="SECONDS",
+                        help="wall clock budget of every engine run, the best answer so far is kept when it runs out")
+    parser.add_argument("--max-decisions", type=int,
+                        help="decision budget of dpll and cdcl, a formula they do not finish in it is reported UNKNOWN")
+    parser.add_argument("--max-flips", type=int, help="flip budget of the local searches")
+    parser.add_argument("--max-generations", type=int, help="generation budget of the genetic algorithms")
+    parser.add_argument("--memory-limit", type=int, metavar="MB",
+                        help="stop an engine once the process uses this much resident memory")
+    parser.add_argument("--islands", type=int,
+                        help="run the python Genetic Algorithm as this many islands (one process and population each, not with --genetic numpy)")
+    parser.add_argument("--migration-interval", type=int, default=10,
+                        help="with --islands, generations between migrations (default: 10)")
+    parser.add_argument("--topology", choices=["ring", "full"], default="ring",
+                        help="with --islands, where migrants go: the next island or every other island (default: ring)")
+    parser.add_argument("--heuristic", choices=sorted(HEURISTICS), default="maxocc",
+                        help="branching heuristic for dpll and the cubes of --complete cube (default: maxocc)")
+    parser.add_argument("--components", action="store_true",
+                        help="let dpll split the clauses left into independent components and solve each on its own")
+    parser.add_argument("--compare-heuristics", nargs="+", choices=sorted(HEURISTICS), metavar="HEURISTIC",
+                        help="only time dpll with each of these heuristics over the hard formulas and print a table")
+    parser.add_argument("--count", nargs="?", const="hard", choices=["easy", "hard"],
+                        help="only count the models of the hard (or easy) formulas exactly and print them")
+    parser.add_argument("--count-cache", type=int, default=64, metavar="MB",
+                        help="with --count, memory bound of the component cache (default: 64)")
+    parser.add_argument("--include-rcnf", action="store_true",
+                        help="also load the headerless .rcnf copies of the formulas")
+    parser.add_argument("--cache-dir", default=".cnfcache",
+                        help="where parsed formulas are cached between runs (default: .cnfcache)")
+    parser.add_argument("--cache-size", type=int, default=256,
+                        help="size bound of the formula cache in MB, least recently used formulas are dropped (default: 256)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="parse every file instead of using the formula cache")
+    parser.add_argument("--workers", type=int,
+                        help="run every (formula, algorithm, repetition) as a job on this many processes and only write the CSV")
+    parser.add_argument("--portfolio", nargs="+", choices=PORTFOLIO_ENGINES, metavar="ENGINE",
+                        help="race these engines on each hard formula in their own processes, the first answer wins")
+    parser.add_argument("--timeout", type=float,
+                        help="with --workers, wall clock limit of each job in seconds, with --portfolio of each formula")
+    parser.add_argument("--repetitions", type=int, default=1,
+                        help="runs of each Local Search and Genetic Algorithm job, one row each (default: 1)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="base seed, every job derives its own seed from it (default: 0)")
+    parser.add_argument("--solve-cache", nargs="?", const=".solvecache.sqlite", metavar="PATH",
+                        help="answer formulas solved before (also renamed or reordered copies) from a SQLite cache "
+                             "and store new answers in it (default path: .solvecache.sqlite)")
+    parser.add_argument("--solve-cache-size", type=int, default=10000,
+                        help="entries kept in the solve cache, least recently used ones are dropped (default: 10000)")
+    parser.add_argument("--output", default="results_by_formula.csv",
+                        help="CSV (or .jsonl) file every finished job is appended to (default: results_by_formula.csv)")
+    parser.add_argument("--resume", action="store_true",
+                        help="keep the rows already in --output and skip the (formula, algorithm, seed) jobs they cover")
+    parser.add_argument("--summary", action="store_true",
+                        help="print the mean of every (formula, algorithm) from --output at the end (needs pandas)")
+    args = parser.parse_args(argv)
+    if (args.portfolio and args.timeout is None and args.time_limit is None
+            and not set(args.portfolio) & {"dpll", "cdcl"}):
+        parser.error("--portfolio without dpll or cdcl never ends on an UNSAT formula, give a --timeout or --time-limit")
+    if args.migration_interval < 1:
+        parser.error("--migration-interval has to be at least 1")
+    if args.islands and args.genetic == "numpy":
+        parser.error("--islands runs the python Genetic Algorithm, it cannot be used with --genetic numpy")
+    if (args.workers or args.portfolio) and (args.progress or args.profile):
+        parser.error("--progress and --profile print from the engine's own process, they cannot be used with "
+                     "--workers or --portfolio (--stats and --trace-memory work with --workers)")
+    if args.portfolio and (args.stats or args.trace_memory):
+        parser.error("--portfolio stops the engines that lose the race, it has no statistics to collect")
+    if args.workers and args.complete == "cube":
+        parser.error("--complete cube runs its own process pool and cannot be used with --workers")
+
     # initialize variables
-    assignments = {}
     easy_files = []
     hard_files = []
 
@@ -90,119 +241,179 @@ def main():
     hard_folder_path = r'HARD CNF Formulas'
 
     # Load file paths
-    easy_files = load_cnf_files(easy_folder_path, easy_files)
-    hard_files = load_cnf_files(hard_folder_path, hard_files)
+    patterns = ('*.cnf', '*.rcnf') if args.include_rcnf else ('*.cnf',)
+    easy_files = load_cnf_files(easy_folder_path, easy_files, patterns)
+    hard_files = load_cnf_files(hard_folder_path, hard_files, patterns)
 
-    # Read and parse CNF files into File class objects
-    easy_formulas = read_cnf_files(easy_files)
-    hard_formulas = read_cnf_files(hard_files)
-
-
-    # Create negations of the formulas
+    # Read and parse CNF files into File class objects, the hard ones are streamed into the DPLL loop below
+    cache = None if args.no_cache else FormulaCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    easy_formulas = read_cnf_files(easy_files, cache)
     for formula in easy_formulas:
         create_negation(formula)
-    for formula in hard_formulas:
-        create_negation(formula)
 
-
-    dpllTimes = []
-    for formula in hard_formulas:
+    if args.compare_heuristics:
+        compare_heuristics(read_cnf_files(hard_files, cache), args.compare_heuristics)
+        return
+
+    if args.count:
+        count_formulas(easy_formulas if args.count == "easy" else stream_cnf_files(hard_files, cache), args.count_cache)
+        return
+
+    if args.portfolio:
+        run_portfolio(stream_cnf_files(hard_files, cache), args.portfolio, args.timeout, args.seed, args.heuristic,
+                      budget_limits(args))
+        return
+
+    if args.workers:
+        run_parallel(hard_files, args.workers, args.timeout, args.repetitions, args.seed, args.complete, args.local,
+                     args.genetic, args.heuristic, None if args.no_cache else args.cache_dir, args.output,
+                     args.preprocess, args.resume, stats=args.stats, trace_memory=args.trace_memory,
+                     limits=budget_limits(args))
+        if args.summary:
+            print_summary(args.output)
+        return
+
+    # Every row goes to the output as soon as its job is done, with --resume the jobs already there are skipped
+    columns = RESULT_COLUMNS + (STATS_COLUMNS if new_stats(args) is not None else [])
+    sink = ResultSink(args.output, columns, resume=args.resume)
+    completeName = args.complete.upper()
+    solve_cache = SolveCache(args.solve_cache, args.solve_cache_size) if args.solve_cache else None
+
+    hard_formulas = []
+    # What the engines actually run on, the formula itself or its preprocessed copy
+    reduced_formulas = []
+    preprocessors = []
+    for index, formula in enumerate(stream_cnf_files(hard_files, cache)):
+        # Solving starts as soon as the first file is parsed, the list is kept for Local Search and GA
+        hard_formulas.append(formula)
+        create_negation(formula)
         startTime = time.time()
         print(f"Hard Formula: {formula.fileN}\n {formula.clausesOriginal}\n")
 
-        formula.clausesOriginal, assignments = dpll(formula.clausesOriginal, assignments)
-
-        print(f"Assignments: {assignments}")
+        # Preprocessing is done once here and counted in this time, Local Search and GA reuse it
+        reduced, preprocessor = preprocess_formula(formula) if args.preprocess else (formula, None)
+        reduced_formulas.append(reduced)
+        preprocessors.append(preprocessor)
+
+        # The complete solvers are deterministic, they run once per formula
+        row = job_row(index, formula.fileN, completeName, 0, args.seed)
+        if sink.isDone(row):
+            print(f"Skipping {completeName} on {formula.fileN}, already in {args.output}\n")
+            continue
+
+        # Every formula starts from an empty assignment, carrying the last one over made satisfiable formulas fail
+        stats = budget = None
+        cached = solve_cache.lookup(formula) if solve_cache is not None else None
+        if cached is not None:
+            isSat, assignments, engine, seconds = cached
+            print(f"Answer from the solve cache, found by {engine} in {seconds:.3f} seconds")
+        else:
+            stats = new_stats(args)
+            budget = new_budget(args)
+            with Instrument(stats, args.profile, args.trace_memory):
+                if args.complete == "dpll":
+                    isSat, assignments = dpll(reduced.clausesOriginal, {}, HEURISTICS[args.heuristic], budget, stats,
+                                                  args.components)
+                elif args.complete == "cdcl":
+                    isSat, assignments = cdcl(reduced.clausesOriginal, {}, stats, budget)
+                else:
+                    isSat, assignments = cube_and_conquer(reduced.clausesOriginal, {}, HEURISTICS[args.heuristic],
+                                                          budget, stats, args.components)
+            if isSat and preprocessor is not None:
+                assignments = preprocessor.extend(assignments)
+            if solve_cache is not None and isSat is not None:
+                solve_cache.store(formula, isSat, assignments, args.complete, time.time() - startTime)
+
+        print(f"Assignments: {'UNKNOWN' if isSat is None else assignments}")
         endTime = time.time()
-        print(f"Time to solve {formula.fileN} using DPLL: {endTime - startTime} seconds\n")
-        dpllTimes.append(endTime-startTime)
-    # Genetic alg initializers
-    population_size = 100
-    generations = 150
-    # 1% chance for an assignement to mutate 1 bit, 1/3 of population will be culled each generation
-    mutation_proportion = .02
-    crossover_amount = int(population_size / 3)
-
-    # Creates lists to hold average results + times
-    FormulasCompleted = []
-    ClausesSatisfiedLocalSearchList = []
-    ClausesSatisfiedGeneticAlgList = []
-    AverageClausesLocal = []
-    AverageTimeLocal = []
-    AverageClausesGenetic = []
-    AverageTimeGenetic = []
-    for i in range(0,1):
-        ProportionClausesLocal = []
-        ProportionClausesGenetic = []
-        TotalTimesLocal = []
-        TotalTimesGenetic = []
-        for formula in hard_formulas:
+        print(f"Time to solve {formula.fileN} using {completeName}: {endTime - startTime} seconds\n")
+        report_budget(budget)
+        report_stats(stats)
+        sink.write({**row, "Clauses Prop": None, "Time": round(endTime - startTime, 4), "Cached": cached is not None,
+                    **stats_row(stats)})
+
+    # Each repetition is its own row, --summary averages them
+    for repetition in range(args.repetitions):
+        for index, (formula, reduced, preprocessor) in enumerate(zip(hard_formulas, reduced_formulas, preprocessors)):
+            row = job_row(index, formula.fileN, "Local Search", repetition, args.seed)
+            if sink.isDone(row):
+                print(f"Skipping Local Search on {formula.fileN}, already in {args.output}")
+            elif proved_unsat(preprocessor):
+                print(f"Skipping Local Search on {formula.fileN}, preprocessing proved it UNSAT")
+                sink.write({**row, "Clauses Prop": None, "Time": 0.0, "Cached": False})
+            else:
+                random.seed(row["Seed"])
+                startTime = time.time()
+                # Always run, a model from the solve cache (usually found by the complete solver) says nothing
+                # about how Local Search does. Its own models still go into the cache
+                stats = new_stats(args)
+                budget = new_budget(args)
+                with Instrument(stats, args.profile, args.trace_memory):
+                    if args.local == "greedy":
+                        LocalSearchBest = SATClass.LocalSearch(reduced, stats=stats, budget=budget)
+                    else:
+                        LocalSearchBest = SATClass.StochasticLocalSearch(reduced, args.local, stats=stats, budget=budget)
+                if preprocessor is not None:
+                    LocalSearchBest = preprocessor.extendString(LocalSearchBest)
+                remember_assignment(solve_cache, formula, LocalSearchBest, args.local, time.time() - startTime)
+                endTime = time.time()
+                LocalSearchTime = endTime - startTime
+                print(f"Time taken for Local Search on {formula.fileN}: {LocalSearchTime:.3f} seconds")
+                report_budget(budget)
+                report_stats(stats)
+
+                localBestCount = ClausesSatisfied(formula, LocalSearchBest)
+                print(f"Proportion of clauses satisfied by Local Search on {formula.fileN}: {localBestCount/formula.numClauses:.2f}")
+                print(f"Local Search Best Assignment for {formula.fileN}: {localBestCount}/{formula.numClauses}\n")
+                sink.write({**row, "Clauses Prop": round(localBestCount / formula.numClauses, 4),
+                            "Time": round(LocalSearchTime, 4), "Cached": False, **stats_row(stats)})
+
+            row = job_row(index, formula.fileN, "Genetic", repetition, args.seed)
+            if sink.isDone(row):
+                print(f"Skipping Genetic Algorithm on {formula.fileN}, already in {args.output}\n")
+                continue
+            if proved_unsat(preprocessor):
+                print(f"Skipping Genetic Algorithm on {formula.fileN}, preprocessing proved it UNSAT\n")
+                sink.write({**row, "Clauses Prop": None, "Time": 0.0, "Cached": False})
+                continue
+            random.seed(row["Seed"])
             startTime = time.time()
-            LocalSearchBest = SATClass.LocalSearch(formula)
-            endTime = time.time()
-            LocalSearchTime = endTime - startTime
-            print(f"Time taken for Local Search on {formula.fileN}: {LocalSearchTime:.3f} seconds")
-            TotalTimesLocal.append(LocalSearchTime)
-
-            localBestCount = ClausesSatisfied(formula, LocalSearchBest)
-            print(f"Proportion of clauses satisfied by Local Search on {formula.fileN}: {localBestCount/formula.numClauses:.2f}")
-            ProportionClausesLocal.append(localBestCount/formula.numClauses)
-
-            print(f"Local Search Best Assignment for {formula.fileN}: {SATClass.ClausesSatisfied(formula, LocalSearchBest)}/{formula.numClauses}\n")
-
-            startTime = time.time()
-            GeneticAlgBest = SATClass.GeneticAlgorithm(formula, population_size, generations, mutation_proportion, crossover_amount)
+            # Always run as well, same as Local Search
+            # Islands run in other processes, their stats are not collected
+            stats = None if args.islands else new_stats(args)
+            budget = new_budget(args)
+            with Instrument(stats, args.profile, args.trace_memory):
+                if args.genetic == "numpy":
+                    GeneticAlgBest = SATClass.GeneticAlgorithmNumpy(reduced, POPULATION_SIZE, GENERATIONS, MUTATION_PROPORTION, CROSSOVER_AMOUNT,
+                                                                    stats=stats, budget=budget)
+                elif args.islands:
+                    GeneticAlgBest = island_genetic_algorithm(reduced, POPULATION_SIZE, GENERATIONS, MUTATION_PROPORTION, CROSSOVER_AMOUNT,
+                                                              args.islands, args.migration_interval, topology=args.topology, seed=row["Seed"],
+                                                              budget=budget)
+                else:
+                    GeneticAlgBest = SATClass.GeneticAlgorithm(reduced, POPULATION_SIZE, GENERATIONS, MUTATION_PROPORTION, CROSSOVER_AMOUNT, stats, budget)
+            if preprocessor is not None:
+                GeneticAlgBest = preprocessor.extendString(GeneticAlgBest)
+            remember_assignment(solve_cache, formula, GeneticAlgBest, "genetic", time.time() - startTime)
             endTime = time.time()
             GeneticAlgTime = endTime - startTime
             print(f"Time taken for Genetic Algorithm on {formula.fileN}: {GeneticAlgTime:.3f} seconds")
-            TotalTimesGenetic.append(GeneticAlgTime)
+            report_budget(budget)
+            report_stats(stats)
 
             geneticBestCount = ClausesSatisfied(formula, GeneticAlgBest)
             print(f"Proportion of clauses satisfied by Genetic Algorithm on {formula.fileN}: {geneticBestCount/formula.numClauses:.2f}")
-            ProportionClausesGenetic.append(geneticBestCount/formula.numClauses)
-
-            print(f"Genetic Algorithm Best Assignment for {formula.fileN}: {SATClass.ClausesSatisfied(formula, GeneticAlgBest)}/{formula.numClauses}\n")
-            FormulasCompleted.append(formula.fileN)
-            ClausesSatisfiedLocalSearchList.append(SATClass.ClausesSatisfied(formula, LocalSearchBest))
-            ClausesSatisfiedGeneticAlgList.append(SATClass.ClausesSatisfied(formula, GeneticAlgBest))
-        update_running_avg(ProportionClausesLocal, AverageClausesLocal, i)
-        update_running_avg(TotalTimesLocal, AverageTimeLocal, i)
-        update_running_avg(ProportionClausesGenetic, AverageClausesGenetic, i)
-        update_running_avg(TotalTimesGenetic, AverageTimeGenetic, i)
-
-    n = len(TotalTimesLocal)
-    # build the rows
-    rows = []
-    for i in range(n):
-        # Local Search row for formula i
-        rows.append({
-            "Formula": i,                      # number starting at 0
-            "Algorithm": "Local Search",
-            "Clauses Prop": AverageClausesLocal[i],
-            "Time": AverageTimeLocal[i]
-        })
-        # Genetic row for formula i
-        rows.append({
-            "Formula": i,
-            "Algorithm": "Genetic",
-            "Clauses Prop": AverageClausesGenetic[i],
-            "Time": AverageTimeGenetic[i]
-        })
-
-        rows.append({
-            "Formula": i,
-            "Algorithm": "DPLL",
-            "Clauses Prop": None,
-            "Time": dpllTimes[i]
-         })
-
-    # create DataFrame and save to CSV
-    df = pd.DataFrame(rows, columns=["Formula", "Algorithm", "Clauses Prop", "Time"])
-    df["Clauses Prop"] = df["Clauses Prop"].round(4)
-    df["Time"] = df["Time"].round(4)
-    df.to_csv("results_by_formula.csv", index=False)
-
-    print("Saved results_by_formula.csv with", len(df), "rows.")
-    print(df)
-
-main()
\ No newline at end of file
+            print(f"Genetic Algorithm Best Assignment for {formula.fileN}: {geneticBestCount}/{formula.numClauses}\n")
+            sink.write({**row, "Clauses Prop": round(geneticBestCount / formula.numClauses, 4),
+                        "Time": round(GeneticAlgTime, 4), "Cached": False, **stats_row(stats)})
+    sink.close()
+    if solve_cache is not None:
+        print(solve_cache.report())
+        solve_cache.close()
+
+    print(f"Saved {args.output} with {sink.written} new rows.")
+    if args.summary:
+        print_summary(args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
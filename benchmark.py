@@ -0,0 +1,276 @@
+'''
+    Desc: Reproducible benchmark suite. Runs engines over corpora with perf_counter timing, fixed seeds, warmup runs
+          and repetitions, reports median/percentile times and success rates, saves the per formula times as a
+          versioned baseline (Runtime.csv layout plus a metadata file) and flags significant regressions against one
+'''
+import argparse
+import contextlib
+import csv
+import datetime
+import glob
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import SATClass
+from SATClass import File, POPULATION_SIZE, GENERATIONS, MUTATION_PROPORTION, CROSSOVER_AMOUNT
+from dpll import cdcl
+from dimacs import read_dimacs
+from parallel import job_seed
+from stats import SolverStats
+from generators import generate_planted_cnf, generate_unit_heavy_cnf, generate_bridged_cnf
+
+# Bumped whenever the baseline columns or metadata change meaning
+BASELINE_VERSION = 1
+BASELINE_COLUMNS = ["Formula", "Algorithm", "Clauses Prop", "Time", "Corpus", "Repetition", "Nodes", "File"]
+
+# Each engine takes a File and returns (solved, clauses prop, nodes), solved means a verdict for the complete
+# engines and every clause satisfied for the others, nodes is the search tree size (decisions) of the complete ones.
+# The names match the Algorithm column of Runtime.csv
+def run_complete(solver):
+    def run(formula):
+        stats = SolverStats()
+        isSat, assignment = solver(formula.clausesOriginal, {}, stats=stats)
+        return isSat is not None, None, stats.decisions
+    return run
+
+def run_incomplete(search):
+    def run(formula):
+        best = search(formula)
+        numSatisfied = SATClass.ClausesSatisfied(formula, best)
+        return numSatisfied == formula.numClauses, numSatisfied / formula.numClauses, None
+    return run
+
+ENGINES = {
+    "dpll": ("DPLL", run_complete(SATClass.dpll)),
+    "dpll-components": ("DPLL (components)", run_complete(
+        lambda clauses, assignment, stats: SATClass.dpll(clauses, assignment, stats=stats, components=True))),
+    "cdcl": ("CDCL", run_complete(cdcl)),
+    "greedy": ("Local Search", run_incomplete(SATClass.LocalSearch)),
+    "walksat": ("WalkSAT", run_incomplete(lambda formula: SATClass.StochasticLocalSearch(formula, "walksat"))),
+    "probsat": ("ProbSAT", run_incomplete(lambda formula: SATClass.StochasticLocalSearch(formula, "probsat"))),
+    "genetic": ("Genetic", run_incomplete(lambda formula: SATClass.GeneticAlgorithm(
+        formula, POPULATION_SIZE, GENERATIONS, MUTATION_PROPORTION, CROSSOVER_AMOUNT))),
+    "genetic-numpy": ("Genetic (numpy)", run_incomplete(lambda formula: SATClass.GeneticAlgorithmNumpy(
+        formula, POPULATION_SIZE, GENERATIONS, MUTATION_PROPORTION, CROSSOVER_AMOUNT))),
+}
+
+# Folder and file pattern of the corpora read from disk
+CORPUS_FOLDERS = {
+    "uf20": ("CNF Formulas", "uf20-*.cnf"),
+    "easy": ("CNF Formulas", "*.cnf"),
+    "hard": ("HARD CNF Formulas", "*.cnf"),
+}
+
+# Paths of a folder corpus in glob order, the order SATSolver.main reads (and numbers) them in
+def corpus_paths(corpus):
+    folder, pattern = CORPUS_FOLDERS[corpus]
+    return glob.glob(os.path.join(folder, "**", pattern), recursive=True)
+
+def folder_corpus(corpus):
+    def load(seed):
+        return [read_dimacs(path) for path in sorted(corpus_paths(corpus))]
+    return load
+
+# generate returns (clauses, planted assignment) like the test generators, or (clauses, number of variables)
+def generated_corpus(generate, count):
+    def load(seed):
+        formulas = []
+        for i in range(count):
+            clauses, planted = generate(job_seed(seed, i, generate.__name__, 0))
+            numVars = planted if isinstance(planted, int) else len(planted)
+            formulas.append(File.fromClauses(f"{generate.__name__}-{i}", numVars, clauses))
+        return formulas
+    return load
+
+def planted(seed):
+    return generate_planted_cnf(100, 420, seed=seed)
+
+def unit_heavy(seed):
+    return generate_unit_heavy_cnf(200, 120, 200, seed=seed)
+
+# Four 25 variable parts tied by two clauses, most of them fall apart after a few decisions
+def bridged(seed):
+    return generate_bridged_cnf(4, 25, 100, 2, seed=seed)
+
+# Formulas are sorted by path so the Formula column means the same file on every machine
+CORPORA = {
+    "uf20": folder_corpus("uf20"),
+    "easy": folder_corpus("easy"),
+    "hard": folder_corpus("hard"),
+    "planted": generated_corpus(planted, 20),
+    "unit-heavy": generated_corpus(unit_heavy, 20),
+    "bridged": generated_corpus(bridged, 20),
+}
+
+# Value at fraction q of sorted values, interpolated between the two closest ranks
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return None
+    position = (len(values) - 1) * q
+    low = math.floor(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+def median(values):
+    return percentile(values, 0.5)
+
+# Run every engine over every formula: warmup untimed runs first, then the timed repetitions, each with its own seed.
+# Returns rows in the baseline layout
+def run_suite(engines, corpora, repetitions=3, warmup=1, seed=0, limit=None):
+    rows = []
+    for corpus in corpora:
+        formulas = CORPORA[corpus](seed)[:limit]
+        for engine in engines:
+            algorithm, run = ENGINES[engine]
+            for index, formula in enumerate(formulas):
+                for repetition in range(-warmup, repetitions):
+                    random.seed(job_seed(seed, index, f"{corpus}:{engine}", repetition))
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        startTime = time.perf_counter()
+                        solved, prop, nodes = run(formula)
+                        elapsed = time.perf_counter() - startTime
+                    if repetition < 0:
+                        continue
+                    rows.append({"Formula": index, "Algorithm": algorithm,
+                                 "Clauses Prop": None if prop is None else round(prop, 4),
+                                 "Time": round(elapsed, 6), "Corpus": corpus, "Repetition": repetition,
+                                 "Nodes": nodes, "Solved": solved, "File": os.path.basename(formula.fileN)})
+            print(f"  {corpus:10} {engine:16} done")
+    return rows
+
+# File name of a row's formula. Runtime.csv style rows only have the Formula index SATSolver.main gave the file,
+# which counts in glob order (not sorted), so the name is looked up in that order
+def formula_name(row, corpus, paths):
+    if row.get("File"):
+        return os.path.basename(row["File"])
+    if corpus not in paths:
+        paths[corpus] = corpus_paths(corpus) if corpus in CORPUS_FOLDERS else []
+    index = int(row["Formula"])
+    return os.path.basename(paths[corpus][index]) if index < len(paths[corpus]) else f"#{index}"
+
+# Median time of each formula's repetitions, keyed by (corpus, algorithm, file name): two runs are paired by the
+# file, whatever order each one numbered the formulas in
+def formula_times(rows, default_corpus="hard"):
+    times = {}
+    paths = {}
+    for row in rows:
+        corpus = row.get("Corpus") or default_corpus
+        key = (corpus, row["Algorithm"], formula_name(row, corpus, paths))
+        times.setdefault(key, []).append(float(row["Time"]))
+    return {key: median(values) for key, values in times.items()}
+
+# Nodes is the total search tree size over the formulas (first repetition), blank for the incomplete engines
+def summarize(rows):
+    print(f"{'Corpus':10} {'Algorithm':18} {'Formulas':>8} {'Success':>8} {'Median':>9} {'p90':>9} {'p99':>9} "
+          f"{'Total':>9} {'Nodes':>10}")
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["Corpus"], row["Algorithm"]), []).append(row)
+    for (corpus, algorithm), group in groups.items():
+        perFormula = [t for key, t in formula_times(group).items()]
+        success = sum(row["Solved"] for row in group) / len(group)
+        nodes = [row["Nodes"] for row in group if row["Repetition"] == 0 and row["Nodes"] is not None]
+        print(f"{corpus:10} {algorithm:18} {len(perFormula):8} {success:8.1%} {median(perFormula):9.4f} "
+              f"{percentile(perFormula, 0.9):9.4f} {percentile(perFormula, 0.99):9.4f} {sum(perFormula):9.3f} "
+              f"{sum(nodes) if nodes else '':>10}")
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# baseline.csv in the Runtime.csv layout (plus Corpus and Repetition) and baseline.json with how it was made
+def save_baseline(rows, path, settings):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=BASELINE_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    metadata = {"version": BASELINE_VERSION, "git": git_revision(), "python": platform.python_version(),
+                "platform": platform.platform(), "machine": platform.machine(),
+                "created": datetime.datetime.now().isoformat(timespec="seconds"), "settings": settings}
+    with open(os.path.splitext(path)[0] + ".json", "w") as f:
+        json.dump(metadata, f, indent=2)
+    print(f"Saved baseline {path} ({len(rows)} rows, version {BASELINE_VERSION})")
+
+def load_baseline(path):
+    metadataPath = os.path.splitext(path)[0] + ".json"
+    if os.path.exists(metadataPath):
+        with open(metadataPath) as f:
+            version = json.load(f).get("version")
+        if version != BASELINE_VERSION:
+            raise ValueError(f"{path} is a version {version} baseline, this suite writes version {BASELINE_VERSION}")
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+# Paired comparison per (corpus, algorithm) on the formulas both runs have: the geometric mean of new/old time with a
+# bootstrap confidence interval, a regression is flagged when the whole interval is above 1 + threshold.
+# Pairs where both times are under minTime are left out, at that size the timer and the OS are most of the time
+def compare(rows, baseline, threshold=0.05, minTime=0.005, resamples=2000, seed=0):
+    new = formula_times(rows)
+    old = formula_times(baseline)
+    groups = {}
+    for key, t in new.items():
+        if key in old and old[key] > 0 and t > 0 and max(t, old[key]) >= minTime:
+            groups.setdefault(key[:2], []).append((math.log(t / old[key]), key[2]))
+    rng = random.Random(seed)
+    regressions = 0
+    print(f"{'Corpus':10} {'Algorithm':18} {'Pairs':>6} {'Ratio':>7} {'95% CI':>17}  Verdict")
+    for (corpus, algorithm), pairs in sorted(groups.items()):
+        logs = [r for r, _ in pairs]
+        means = sorted(sum(rng.choice(logs) for _ in logs) / len(logs) for _ in range(resamples))
+        low, high = math.exp(means[int(0.025 * resamples)]), math.exp(means[int(0.975 * resamples) - 1])
+        ratio = math.exp(sum(logs) / len(logs))
+        if low > 1 + threshold:
+            verdict = "REGRESSION"
+            regressions += 1
+        elif high < 1 - threshold:
+            verdict = "faster"
+        else:
+            verdict = "no significant change"
+        print(f"{corpus:10} {algorithm:18} {len(pairs):6} {ratio:7.3f} [{low:6.3f}, {high:6.3f}]  {verdict}")
+        if verdict == "REGRESSION":
+            worst = sorted(pairs, reverse=True)[:3]
+            print("    slowest formulas: " + ", ".join(f"{name} ({math.exp(r):.2f}x)" for r, name in worst))
+    if not groups:
+        print(f"No formulas in common with the baseline taking at least {minTime} s (same corpus and algorithm names needed)")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark engines over corpora and compare against a baseline")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=["dpll", "greedy", "genetic"])
+    parser.add_argument("--corpora", nargs="+", choices=sorted(CORPORA), default=["hard"])
+    parser.add_argument("--repetitions", type=int, default=3, help="timed runs of each (engine, formula) (default: 3)")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs before the timed ones (default: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="base seed, every run derives its own (default: 0)")
+    parser.add_argument("--limit", type=int, help="only the first LIMIT formulas of each corpus")
+    parser.add_argument("--save", metavar="CSV", help="write the results as a baseline (and its .json metadata)")
+    parser.add_argument("--compare", metavar="CSV",
+                        help="baseline to compare against, one of ours or a Runtime.csv style file (rows without Corpus count as hard)")
+    parser.add_argument("--threshold", type=float, default=0.05,
+                        help="slowdown that counts as a regression when it is significant (default: 0.05)")
+    parser.add_argument("--min-time", type=float, default=0.005,
+                        help="formulas faster than this (in seconds) in both runs are not compared (default: 0.005)")
+    args = parser.parse_args(argv)
+
+    settings = {"engines": args.engines, "corpora": args.corpora, "repetitions": args.repetitions,
+                "warmup": args.warmup, "seed": args.seed, "limit": args.limit}
+    print(f"Benchmarking {', '.join(args.engines)} on {', '.join(args.corpora)}")
+    rows = run_suite(args.engines, args.corpora, args.repetitions, args.warmup, args.seed, args.limit)
+    summarize(rows)
+    if args.save:
+        save_baseline(rows, args.save, settings)
+    if args.compare:
+        regressions = compare(rows, load_baseline(args.compare), args.threshold, args.min_time, seed=args.seed)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
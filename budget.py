@@ -0,0 +1,149 @@
+'''
+    Desc: Resource budgets shared by every engine (wall time, decisions, flips, generations, memory) and the
+          structured result of a budgeted solve: SAT / UNSAT / UNKNOWN, the best assignment found so far,
+          how many clauses it satisfies and what was used to get there
+'''
+import os
+import sys
+import time
+import SATClass
+from SATClass import Assignment, ClausesSatisfied, POPULATION_SIZE, GENERATIONS, MUTATION_PROPORTION, CROSSOVER_AMOUNT
+from dpll import cdcl
+from stats import SolverStats
+
+SAT = "SAT"
+UNSAT = "UNSAT"
+UNKNOWN = "UNKNOWN"
+
+try:
+    import resource
+except ImportError:  # Windows, no memory cap there
+    resource = None
+
+# Resident memory of this process in bytes, None where it cannot be read
+def current_memory():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        # Only the peak is available, in KB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+'''
+Budget Class:
+    Limits an engine checks while it runs, None means no limit
+    time: Wall clock seconds from start()
+    decisions: Branching decisions (dpll, cdcl)
+    flips: Variable flips (LocalSearch, StochasticLocalSearch)
+    generations: Generations (GeneticAlgorithm, GeneticAlgorithmNumpy)
+    memory: Resident memory of the process in bytes, read every 1024 checks
+    reason: Which limit ran out ("time", "decisions", ...), None while there is budget left
+'''
+class Budget:
+    def __init__(self, time=None, decisions=None, flips=None, generations=None, memory=None):
+        self.time = time
+        self.decisions = decisions
+        self.flips = flips
+        self.generations = generations
+        self.memory = memory
+        self.startTime = None
+        self.deadline = None
+        self.checks = 0
+        self.reason = None
+
+    # Start the clock, engines call it on entry so it only counts when the caller has not started it already
+    def start(self):
+        if self.startTime is not None:
+            return self
+        self.startTime = time.perf_counter()
+        if self.time is not None:
+            self.deadline = self.startTime + self.time
+        return self
+
+    def elapsed(self):
+        return time.perf_counter() - self.startTime if self.startTime is not None else 0.0
+
+    # True (and reason set) once any limit is reached, the engines pass their own counters in
+    def exceeded(self, decisions=0, flips=0, generations=0):
+        if self.reason is not None:
+            return True
+        if self.decisions is not None and decisions >= self.decisions:
+            self.reason = "decisions"
+        elif self.flips is not None and flips >= self.flips:
+            self.reason = "flips"
+        elif self.generations is not None and generations >= self.generations:
+            self.reason = "generations"
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.reason = "time"
+        elif self.memory is not None:
+            self.checks += 1
+            if self.checks & 1023 == 1:
+                used = current_memory()
+                if used is not None and used >= self.memory:
+                    self.reason = "memory"
+        return self.reason is not None
+
+'''
+SolveResult Class:
+    status: SAT, UNSAT or UNKNOWN (budget ran out, or an incomplete engine found no model)
+    assignment: Best assignment found ({var: bool}), the model when SAT, None when there is none
+    satisfied: Clauses the assignment satisfies (of numClauses)
+    engine: Engine that produced it
+    reason: "solved", or why it stopped ("time", "decisions", "flips", "generations", "memory", "finished")
+    stats: SolverStats with the resources used (elapsed, decisions, flips, generations...)
+'''
+class SolveResult:
+    def __init__(self, status, assignment, satisfied, numClauses, engine, reason, stats):
+        self.status = status
+        self.assignment = assignment
+        self.satisfied = satisfied
+        self.numClauses = numClauses
+        self.engine = engine
+        self.reason = reason
+        self.stats = stats
+
+    def __repr__(self):
+        satisfied = "no assignment" if self.satisfied is None else f"{self.satisfied}/{self.numClauses} clauses"
+        return f"SolveResult({self.status}, {satisfied}, engine={self.engine}, reason={self.reason}, {self.stats.elapsed:.3f}s)"
+
+ANYTIME_ENGINES = ("dpll", "cdcl", "greedy", "walksat", "probsat", "genetic", "genetic-numpy")
+
+# Run one engine on formula under budget and return a SolveResult. Complete engines answer SAT or UNSAT unless the
+# budget runs out first, the others are SAT once every clause is satisfied and UNKNOWN with their best assignment
+# otherwise. WalkSAT and ProbSAT keep restarting until the budget runs out when it limits flips or time, and the
+# genetic algorithms run for as many generations as the budget allows when it limits generations or time
+def anytime_solve(formula, engine="walksat", budget=None, heuristic=None, stats=None):
+    if engine not in ANYTIME_ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    budget = (budget or Budget()).start()
+    stats = stats or SolverStats()
+    unbounded = budget.time is not None
+    if engine in ("dpll", "cdcl"):
+        if engine == "dpll":
+            isSat, model = SATClass.dpll(formula.clausesOriginal, {}, heuristic, budget, stats)
+        else:
+            isSat, model = cdcl(formula.clausesOriginal, {}, stats, budget)
+        if isSat is None:
+            return SolveResult(UNKNOWN, None, None, formula.numClauses, engine, budget.reason, stats)
+        if not isSat:
+            return SolveResult(UNSAT, None, None, formula.numClauses, engine, "solved", stats)
+        # Unassigned variables do not matter to the model, they are given False
+        best = Assignment.fromDict(model, formula.numVars)
+    elif engine == "greedy":
+        best = Assignment.fromString(SATClass.LocalSearch(formula, stats=stats, budget=budget))
+    elif engine in ("walksat", "probsat"):
+        tries = sys.maxsize if unbounded or budget.flips is not None else 10
+        best = Assignment.fromString(SATClass.StochasticLocalSearch(formula, engine, max_tries=tries, stats=stats, budget=budget))
+    else:
+        generations = sys.maxsize if unbounded or budget.generations is not None else GENERATIONS
+        search = SATClass.GeneticAlgorithm if engine == "genetic" else SATClass.GeneticAlgorithmNumpy
+        best = Assignment.fromString(search(formula, POPULATION_SIZE, generations, MUTATION_PROPORTION, CROSSOVER_AMOUNT,
+                                            stats=stats, budget=budget))
+    satisfied = ClausesSatisfied(formula, best)
+    if satisfied == formula.numClauses:
+        return SolveResult(SAT, best.toDict(), satisfied, formula.numClauses, engine, "solved", stats)
+    return SolveResult(UNKNOWN, best.toDict(), satisfied, formula.numClauses, engine, budget.reason or "finished", stats)
@@ -0,0 +1,140 @@
+'''
+    Desc: On-disk cache of parsed formulas. Each formula is stored once as its offsets and literals arrays
+          behind a small header and loaded back through a read-only memory map, so a warm start does not
+          parse anything and processes loading the same formula share the pages
+'''
+import array
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from SATClass import File
+from dimacs import parse_dimacs
+
+# magic, byte order, numVars, numClauses, source size, source mtime (ns), content digest
+MAGIC = b"CNFC1"
+HEADER = struct.Struct("=5sc2xqqqq24s")
+DIGEST_SIZE = 20
+BYTE_ORDER = b"L" if sys.byteorder == "little" else b"B"
+
+# Hash of the source file contents, used when the size/mtime key no longer matches
+def content_digest(data):
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest()
+
+'''
+FormulaCache Class:
+    Directory of parsed formula dumps, one .cnfc file per source path
+    directory: Where the dumps live (created when the first one is written)
+    maxBytes: Bound on the total size of the dumps, the least recently used ones are removed past it
+    hits, misses, rehashed: Loads served from a dump, loads that had to parse, and hits that needed the content hash
+'''
+class FormulaCache:
+    def __init__(self, directory=".cnfcache", maxBytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        self.rehashed = 0
+
+    # Dump file for a source path, named by a hash of the absolute path
+    def entryPath(self, path):
+        name = hashlib.blake2b(os.path.abspath(path).encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.directory, name + ".cnfc")
+
+    # File for path, from its dump when it is still fresh, otherwise parsed and stored
+    def load(self, path):
+        stat = os.stat(path)
+        entry = self.entryPath(path)
+        header = self.readHeader(entry)
+        if header is not None:
+            numVars, numClauses, size, mtime, digest = header
+            if size == stat.st_size and mtime == stat.st_mtime_ns:
+                return self.mapEntry(entry, path, numVars, numClauses)
+            # The file was touched (checkout, copy...), the dump is still good if the contents are the same
+            with open(path, "rb") as f:
+                data = f.read()
+            if content_digest(data) == digest:
+                self.rehashed += 1
+                with open(entry, "r+b") as f:
+                    f.write(HEADER.pack(MAGIC, BYTE_ORDER, numVars, numClauses, stat.st_size, stat.st_mtime_ns, digest))
+                return self.mapEntry(entry, path, numVars, numClauses)
+        else:
+            with open(path, "rb") as f:
+                data = f.read()
+
+        self.misses += 1
+        formula = parse_dimacs(data, path)
+        self.store(entry, formula, stat, content_digest(data))
+        return formula
+
+    # (numVars, numClauses, size, mtime, digest) of a dump, None if it is missing or not one of ours
+    def readHeader(self, entry):
+        try:
+            with open(entry, "rb") as f:
+                raw = f.read(HEADER.size)
+        except OSError:
+            return None
+        if len(raw) != HEADER.size:
+            return None
+        magic, order, numVars, numClauses, size, mtime, digest = HEADER.unpack(raw)
+        if magic != MAGIC or order != BYTE_ORDER:
+            return None
+        return numVars, numClauses, size, mtime, digest[:DIGEST_SIZE]
+
+    def mapEntry(self, entry, path, numVars, numClauses):
+        with open(entry, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # The views keep the map open, it is closed once the File is gone
+        view = memoryview(mapped)
+        start = HEADER.size
+        end = start + 8 * (numClauses + 1)
+        offsets = view[start:end].cast("q")
+        literals = view[end:end + 4 * offsets[-1]].cast("i")
+        self.hits += 1
+        # Used as the LRU clock by evict
+        os.utime(entry)
+        return File(path, numClauses, numVars, literals, offsets)
+
+    # Write a dump next to its final name and swap it in, a reader never sees half of one
+    def store(self, entry, formula, stat, digest):
+        os.makedirs(self.directory, exist_ok=True)
+        temp = f"{entry}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, BYTE_ORDER, formula.numVars, formula.numClauses, stat.st_size, stat.st_mtime_ns, digest))
+            f.write(array.array("q", formula.offsets).tobytes())
+            f.write(array.array("i", formula.literals).tobytes())
+        try:
+            os.replace(temp, entry)
+        except OSError:
+            # The old dump is still mapped somewhere (Windows), keep using it until next time
+            os.remove(temp)
+            return
+        self.evict()
+
+    # Remove the least recently used dumps until the cache fits in maxBytes
+    def evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if item.name.endswith(".cnfc"):
+                    stat = item.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, item.path))
+                    total += stat.st_size
+        if total <= self.maxBytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.maxBytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass  # still mapped (Windows), try again on the next eviction
+
+    # Formulas one at a time like dimacs.iter_cnf_files, through the cache
+    def iterFiles(self, file_list):
+        for file_path in file_list:
+            yield self.load(file_path)
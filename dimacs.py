@@ -0,0 +1,64 @@
+'''
+    Desc: Fast DIMACS reader. Each file is read in one go and tokenized in one pass, clauses can span lines,
+          and the headerless .rcnf files (one clause per line, no trailing 0) are read too
+'''
+import array
+import re
+from SATClass import File
+
+COMMENT_LINE = re.compile(rb"^[ \t]*c.*$", re.MULTILINE)
+HEADER_LINE = re.compile(rb"^[ \t]*p[ \t]+cnf[ \t]+(\d+)[ \t]+(\d+).*$", re.MULTILINE)
+END_LINE = re.compile(rb"^[ \t]*%", re.MULTILINE)
+
+# Parse DIMACS text (bytes) into a File
+def parse_dimacs(data, fileN=""):
+    data = COMMENT_LINE.sub(b"", data)
+    # Some generators end the clauses with a "%" line followed by junk
+    end = END_LINE.search(data)
+    if end:
+        data = data[:end.start()]
+
+    header = HEADER_LINE.search(data)
+    num_vars = num_clauses = None
+    if header:
+        num_vars = int(header.group(1))
+        num_clauses = int(header.group(2))
+        data = data[:header.start()] + data[header.end():]
+
+    tokens = array.array("i", map(int, data.split()))
+    if header or 0 in tokens:
+        # Clauses end at each 0, wherever the line breaks are: drop the 0s and the k-th 0 (from 0) ends a clause at zeros[k] - k
+        zeros = [i for i, token in enumerate(tokens) if token == 0]
+        literals = array.array("i", filter(None, tokens))
+        offsets = array.array("q", [0])
+        offsets.extend(end - k for k, end in enumerate(zeros))
+        if tokens and tokens[-1] != 0:
+            offsets.append(len(literals))  # last clause is missing its 0
+    else:
+        # Headerless without any 0, every line is a clause (.rcnf)
+        literals = array.array("i")
+        offsets = array.array("q", [0])
+        for line in data.splitlines():
+            clause = line.split()
+            if clause:
+                literals.extend(map(int, clause))
+                offsets.append(len(literals))
+
+    # Same as before: stop after the clauses listed in the header
+    if num_clauses is not None and len(offsets) - 1 > num_clauses:
+        del offsets[num_clauses + 1:]
+        del literals[offsets[-1]:]
+    num_clauses = len(offsets) - 1
+    # No header, so count the variables
+    if num_vars is None:
+        num_vars = max(map(abs, literals), default=0)
+    return File(fileN, num_clauses, num_vars, literals, offsets)
+
+def read_dimacs(file_path):
+    with open(file_path, "rb") as f:
+        return parse_dimacs(f.read(), file_path)
+
+# Formulas one at a time, a file is only read when the caller gets to it
+def iter_cnf_files(file_list):
+    for file_path in file_list:
+        yield read_dimacs(file_path)
@@ -0,0 +1,450 @@
+'''
+    Desc: Conflict driven clause learning (CDCL) solver, a complete alternative to SATClass.dpll
+          that learns from every conflict instead of backtracking one decision at a time
+'''
+import heapq
+from SATClass import WatchedClauses
+
+# Luby sequence (1, 1, 2, 1, 1, 2, 4, 1, ...) used to space out restarts
+def luby(i):
+    size = 1
+    seq = 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i = i % size
+    return 1 << seq
+
+'''
+CDCLSolver Class:
+    WatchedClauses database extended with what clause learning needs
+    numVars: Highest variable number in the formula
+    numOriginal: Number of clauses that came from the formula, learned clauses are stored after them
+    level: Decision level each variable was assigned at
+    reason: Index of the clause that forced each variable (None for decisions)
+    activity: VSIDS score of each variable, bumped when it takes part in a conflict
+    phase: Last value each variable had, reused when it is picked again (phase saving)
+    lbd: Literal block distance of each learned clause (number of decision levels in it)
+    clauseActivity: Activity of each learned clause, used with lbd when the learned clauses are reduced
+    conflicts, decisions, propagations, restarts: Counters for the whole solve
+    maxDepth: Deepest decision level reached
+    stats: SolverStats ticked while solving (progress reports), None for none
+    budget: Budget checked before every decision, solve returns None (unknown) once it runs out
+    core: After solve returned False under assumptions, the assumptions that made it UNSAT (empty when the clauses alone are)
+'''
+class CDCLSolver(WatchedClauses):
+    def __init__(self, clauses, assignment=None, restartBase=100, varDecay=0.95, clauseDecay=0.999):
+        clauses = [list(clause) for clause in clauses]
+        numVars = 0
+        for clause in clauses:
+            for lit in clause:
+                if abs(lit) > numVars:
+                    numVars = abs(lit)
+        if assignment:
+            numVars = max(numVars, max(assignment))
+        self.numVars = numVars
+        self.level = [0] * (numVars + 1)
+        self.reason = [None] * (numVars + 1)
+        self.activity = [0.0] * (numVars + 1)
+        self.phase = [False] * (numVars + 1)
+        self.seen = [False] * (numVars + 1)
+        self.varInc = 1.0
+        self.varDecay = varDecay
+        self.clauseInc = 1.0
+        self.clauseDecay = clauseDecay
+        self.restartBase = restartBase
+        self.lbd = []
+        self.clauseActivity = []
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.restarts = 0
+        self.maxDepth = 0
+        self.stats = None
+        self.budget = None
+        self.core = []
+
+        WatchedClauses.__init__(self, clauses, assignment)
+        self.numOriginal = len(self.clauses)
+        self.maxLearnts = max(self.numOriginal / 3, 100)
+
+        # Every variable starts in the branching heap with activity 0
+        self.heap = [(0.0, v) for v in range(1, numVars + 1)]
+
+    def enqueue(self, lit, reason=None):
+        var = abs(lit)
+        self.assignment[var] = lit > 0
+        self.level[var] = len(self.trailLim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+        self.propagations += 1
+
+    # Same as WatchedClauses.undo, but saves the phase and puts the variable back in the branching heap
+    def undo(self, mark):
+        trail = self.trail
+        assignment = self.assignment
+        heap = self.heap
+        while len(trail) > mark:
+            lit = trail.pop()
+            var = abs(lit)
+            del assignment[var]
+            self.reason[var] = None
+            self.phase[var] = lit > 0
+            heapq.heappush(heap, (-self.activity[var], var))
+        if self.head > mark:
+            self.head = mark
+
+    def bumpVar(self, var):
+        self.activity[var] += self.varInc
+        if self.activity[var] > 1e100:
+            # Rescale everything and rebuild the heap, old entries no longer match
+            for v in range(1, self.numVars + 1):
+                self.activity[v] *= 1e-100
+            self.varInc *= 1e-100
+            self.heap = [(-self.activity[v], v) for v in range(1, self.numVars + 1) if v not in self.assignment]
+            heapq.heapify(self.heap)
+        elif var not in self.assignment:
+            heapq.heappush(self.heap, (-self.activity[var], var))
+
+    def bumpClause(self, index):
+        if index < self.numOriginal:
+            return
+        learnt = index - self.numOriginal
+        self.clauseActivity[learnt] += self.clauseInc
+        if self.clauseActivity[learnt] > 1e20:
+            for i in range(len(self.clauseActivity)):
+                self.clauseActivity[i] *= 1e-20
+            self.clauseInc *= 1e-20
+
+    # Most active unassigned variable, None when every variable is assigned
+    def pickBranch(self):
+        if len(self.heap) > 4 * self.numVars + 100:
+            # Too many stale entries piled up, rebuild from the unassigned variables
+            self.heap = [(-self.activity[v], v) for v in range(1, self.numVars + 1) if v not in self.assignment]
+            heapq.heapify(self.heap)
+        heap = self.heap
+        activity = self.activity
+        assignment = self.assignment
+        while heap:
+            negAct, var = heapq.heappop(heap)
+            if var in assignment or -negAct != activity[var]:
+                continue  # stale entry
+            return var
+        # Stale entries can hide a variable, double check before calling it a model
+        for var in range(1, self.numVars + 1):
+            if var not in assignment:
+                return var
+        return None
+
+    # 1-UIP conflict analysis, returns the learned clause (asserting literal first) and the level to backjump to
+    def analyze(self, conflict):
+        clauses = self.clauses
+        trail = self.trail
+        level = self.level
+        reason = self.reason
+        seen = self.seen
+        currentLevel = len(self.trailLim)
+
+        learnt = [None]
+        counter = 0
+        lit = None
+        index = len(trail) - 1
+        clause = clauses[conflict]
+        while True:
+            self.bumpClause(conflict)
+            # The forced literal of a reason clause sits at index 0 and is the one being resolved away
+            for q in (clause if lit is None else clause[1:]):
+                var = abs(q)
+                if not seen[var] and level[var] > 0:
+                    seen[var] = True
+                    self.bumpVar(var)
+                    if level[var] >= currentLevel:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            # Next literal of the current level on the trail that took part in the conflict
+            while not seen[abs(trail[index])]:
+                index -= 1
+            lit = trail[index]
+            index -= 1
+            var = abs(lit)
+            seen[var] = False
+            counter -= 1
+            if counter == 0:
+                break
+            conflict = reason[var]
+            clause = clauses[conflict]
+        learnt[0] = -lit
+
+        # Drop literals implied by the rest of the learned clause (local minimization)
+        kept = [learnt[0]]
+        for q in learnt[1:]:
+            r = reason[abs(q)]
+            if r is None or any(not seen[abs(x)] and level[abs(x)] > 0 for x in clauses[r][1:]):
+                kept.append(q)
+        for q in learnt[1:]:
+            seen[abs(q)] = False
+        learnt = kept
+
+        # Backjump to the highest level left in the clause, that literal becomes the second watch
+        backLevel = 0
+        if len(learnt) > 1:
+            best = 1
+            for i in range(2, len(learnt)):
+                if level[abs(learnt[i])] > level[abs(learnt[best])]:
+                    best = i
+            learnt[1], learnt[best] = learnt[best], learnt[1]
+            backLevel = level[abs(learnt[1])]
+        return learnt, backLevel
+
+    # Store a learned clause and assert its first literal (already backjumped)
+    def learn(self, learnt):
+        if len(learnt) == 1:
+            self.enqueue(learnt[0])
+            return
+        index = len(self.clauses)
+        self.clauses.append(learnt)
+        self.watches.setdefault(learnt[0], []).append(index)
+        self.watches.setdefault(learnt[1], []).append(index)
+        self.lbd.append(len(set(self.level[abs(lit)] for lit in learnt)))
+        self.clauseActivity.append(self.clauseInc)
+        self.enqueue(learnt[0], index)
+
+    # Throw away the worse half of the learned clauses (high lbd, low activity), keeping glue and reason clauses
+    def reduceLearnts(self):
+        numOriginal = self.numOriginal
+        locked = set()
+        for lit in self.trail:
+            r = self.reason[abs(lit)]
+            if r is not None and r >= numOriginal:
+                locked.add(r)
+        candidates = [i for i in range(len(self.lbd))
+                      if self.lbd[i] > 2 and len(self.clauses[numOriginal + i]) > 2 and numOriginal + i not in locked]
+        candidates.sort(key=lambda i: (-self.lbd[i], self.clauseActivity[i]))
+        removed = set(candidates[:len(candidates) // 2])
+        if not removed:
+            return
+
+        # Compact the learned clauses and renumber the reasons that point at them
+        newIndex = {}
+        clauses = self.clauses[:numOriginal]
+        lbd = []
+        clauseActivity = []
+        for i in range(len(self.lbd)):
+            if i in removed:
+                continue
+            newIndex[numOriginal + i] = len(clauses)
+            clauses.append(self.clauses[numOriginal + i])
+            lbd.append(self.lbd[i])
+            clauseActivity.append(self.clauseActivity[i])
+        self.clauses = clauses
+        self.lbd = lbd
+        self.clauseActivity = clauseActivity
+        for lit in self.trail:
+            var = abs(lit)
+            r = self.reason[var]
+            if r is not None and r >= numOriginal:
+                self.reason[var] = newIndex[r]
+
+        # Watched literals stay at index 0 and 1, so the watch lists can be rebuilt as is
+        watches = {}
+        for index, clause in enumerate(clauses):
+            watches.setdefault(clause[0], []).append(index)
+            watches.setdefault(clause[1], []).append(index)
+        self.watches = watches
+
+    # Assumptions that forced the assumption lit false, found by walking the reasons back to the decisions.
+    # Every decision under the assumption levels is an assumption, so those are the core
+    def analyzeFinal(self, lit):
+        core = [lit]
+        if self.level[abs(lit)] == 0:
+            return core  # false whatever else is assumed
+        trail = self.trail
+        seen = self.seen
+        seen[abs(lit)] = True
+        for i in range(len(trail) - 1, self.trailLim[0] - 1, -1):
+            var = abs(trail[i])
+            if not seen[var]:
+                continue
+            r = self.reason[var]
+            if r is None:
+                core.append(trail[i])
+            else:
+                for q in self.clauses[r][1:]:
+                    if self.level[abs(q)] > 0:
+                        seen[abs(q)] = True
+            seen[var] = False
+        seen[abs(lit)] = False
+        return core
+
+    # True (model in assignment), False or None (out of budget). Assumptions are literals made true as the first
+    # decisions, one level each, a False answer under them leaves the failed ones in core
+    def solve(self, assumptions=()):
+        self.core = []
+        if self.isConflict:
+            return False
+        restartLimit = luby(self.restarts) * self.restartBase
+        conflictsSinceRestart = 0
+        startDecisions = self.decisions
+
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflictsSinceRestart += 1
+                if not self.trailLim:
+                    self.isConflict = True
+                    return False  # conflict without any decision -> UNSAT
+                learnt, backLevel = self.analyze(conflict)
+                self.backtrack(backLevel)
+                self.learn(learnt)
+                self.varInc /= self.varDecay
+                self.clauseInc /= self.clauseDecay
+                continue
+
+            if conflictsSinceRestart >= restartLimit:
+                self.restarts += 1
+                restartLimit = luby(self.restarts) * self.restartBase
+                conflictsSinceRestart = 0
+                self.backtrack(0)
+                continue
+
+            if len(self.lbd) - len(self.trail) >= self.maxLearnts:
+                self.reduceLearnts()
+                self.maxLearnts *= 1.1
+
+            # Assumptions come first, one that is already true gets an empty level so levels and assumptions line up
+            while len(self.trailLim) < len(assumptions):
+                lit = assumptions[len(self.trailLim)]
+                val = self.assignment.get(abs(lit))
+                if val is None:
+                    break
+                if val != (lit > 0):
+                    self.core = self.analyzeFinal(lit)
+                    return False
+                self.trailLim.append(len(self.trail))
+            if len(self.trailLim) < len(assumptions):
+                self.decide(assumptions[len(self.trailLim)])
+                continue
+
+            var = self.pickBranch()
+            if var is None:
+                return True  # every variable assigned without conflict
+            if self.budget is not None and self.budget.exceeded(decisions=self.decisions - startDecisions):
+                return None  # out of budget, unknown
+            self.decisions += 1
+            self.decide(var if self.phase[var] else -var)
+            if len(self.trailLim) > self.maxDepth:
+                self.maxDepth = len(self.trailLim)
+            if self.stats is not None:
+                self.stats.tick(decisions=self.decisions, conflicts=self.conflicts, restarts=self.restarts)
+
+# CDCL with the same call and return shape as SATClass.dpll, stats and budget work like dpll's
+def cdcl(clauses, assignment, stats=None, budget=None):
+    if stats is not None:
+        stats.start("cdcl")
+    if budget is not None:
+        budget.start()
+    solver = CDCLSolver(clauses, assignment)
+    solver.stats = stats
+    solver.budget = budget
+    isSat = solver.solve()
+    if stats is not None:
+        stats.stop()
+        stats.decisions = solver.decisions
+        stats.propagations = solver.propagations - solver.decisions
+        stats.conflicts = solver.conflicts
+        # Every conflict past level 0 backjumps once
+        stats.backtracks = max(0, solver.conflicts - (1 if isSat is False else 0))
+        stats.maxDepth = solver.maxDepth
+        stats.restarts = solver.restarts
+    if isSat:
+        print("Found Solution!!!")
+        return True, dict(solver.assignment)
+    if isSat is None:
+        return None, None
+    return False, None
+
+'''
+IncrementalSolver Class:
+    CDCLSolver kept alive between queries on the same formula: learned clauses, variable activities, saved phases
+    and everything fixed at level 0 carry over, so each query only pays for what is new. Clauses can be added
+    between queries (never removed, guard them with a fresh variable and assume its negation to switch them on)
+    model: {var: bool} of the last SAT answer, None otherwise
+    core: Failed assumptions of the last UNSAT answer, a subset that is UNSAT with the clauses (empty if they are)
+    queries: Number of solve calls so far
+'''
+class IncrementalSolver(CDCLSolver):
+    # Set by CDCLSolver once the clauses it was built with are in, until then addClause is the plain database one
+    numOriginal = None
+
+    def __init__(self, clauses=(), restartBase=100, varDecay=0.95, clauseDecay=0.999):
+        CDCLSolver.__init__(self, clauses, None, restartBase, varDecay, clauseDecay)
+        self.model = None
+        self.queries = 0
+
+    # Make room for variables up to numVars, new ones start with no activity
+    def growTo(self, numVars):
+        if numVars <= self.numVars:
+            return
+        extra = numVars - self.numVars
+        self.level += [0] * extra
+        self.reason += [None] * extra
+        self.activity += [0.0] * extra
+        self.phase += [False] * extra
+        self.seen += [False] * extra
+        for var in range(self.numVars + 1, numVars + 1):
+            heapq.heappush(self.heap, (0.0, var))
+        self.numVars = numVars
+
+    # Add a clause between queries. It is simplified against level 0, a unit is assigned right away and the others
+    # are stored with the learned clauses with lbd 0, which reduceLearnts never throws away
+    def addClause(self, clause):
+        if self.numOriginal is None:
+            return CDCLSolver.addClause(self, clause)
+        self.backtrack(0)
+        if self.isConflict:
+            return
+        if self.propagate() is not None:
+            self.isConflict = True
+            return
+        self.growTo(max((abs(lit) for lit in clause), default=0))
+        lits = []
+        for lit in dict.fromkeys(clause):
+            val = self.assignment.get(abs(lit))
+            if val is None:
+                if -lit in lits:
+                    return  # tautology
+                lits.append(lit)
+            elif val == (lit > 0):
+                return  # already satisfied for good
+        if not lits:
+            self.isConflict = True
+        elif len(lits) == 1:
+            self.enqueue(lits[0])
+        else:
+            index = len(self.clauses)
+            self.clauses.append(lits)
+            self.watches.setdefault(lits[0], []).append(index)
+            self.watches.setdefault(lits[1], []).append(index)
+            self.lbd.append(0)
+            self.clauseActivity.append(0.0)
+
+    # True (model in model), False (failed assumptions in core) or None (budget ran out), the solver is back at
+    # level 0 afterwards so clauses can be added and the next query started
+    def solve(self, assumptions=(), budget=None):
+        assumptions = list(assumptions)
+        self.growTo(max((abs(lit) for lit in assumptions), default=0))
+        self.queries += 1
+        self.model = None
+        self.budget = budget
+        if budget is not None:
+            budget.start()
+        isSat = CDCLSolver.solve(self, assumptions)
+        if isSat:
+            self.model = {var: self.assignment.get(var, False) for var in range(1, self.numVars + 1)}
+        self.backtrack(0)
+        return isSat
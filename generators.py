@@ -0,0 +1,217 @@
+'''
+    Desc: Instance generators for formulas far bigger than the uf20 and hard sets (10^4 to 10^6 variables and more).
+          Clauses are generated one at a time and written straight to a DIMACS file in chunks, so memory stays at
+          one byte per variable (the planted assignment) whatever the size. An instance is fixed by its kind, size,
+          clause/variable ratio, clause width and seed, the same parameters always give the same file
+'''
+import argparse
+import os
+import random
+import sys
+
+KINDS = ("random", "planted", "unit-heavy")
+
+# Fraction of the variables forced by unit clauses in the unit-heavy instances
+UNIT_FRACTION = 0.1
+
+# Lines joined before each write
+CHUNK = 4096
+
+# k distinct variables with random signs. rng.random() is a lot cheaper than randint, and for n much bigger than k
+# a repeated variable is rare enough that drawing the clause again costs nothing. There have to be k variables to draw
+def random_clause(rng, numVars, k):
+    if k > numVars:
+        raise ValueError(f"Cannot draw {k} distinct variables out of {numVars}")
+    while True:
+        variables = {int(rng.random() * numVars) + 1 for i in range(k)}
+        if len(variables) == k:
+            break
+    signs = rng.getrandbits(k)
+    return [var if (signs >> i) & 1 else -var for i, var in enumerate(variables)]
+
+def instance_rng(kind, numVars, numClauses, k, seed):
+    # Seeded with every parameter, so instances of different sizes or ratios are not prefixes of each other
+    return random.Random(f"{kind}:{numVars}:{numClauses}:{k}:{seed}")
+
+# Uniform random k-SAT, unsatisfiable with high probability above the threshold ratio (about 4.26 for k = 3)
+def random_ksat(numVars, numClauses, k=3, seed=0):
+    rng = instance_rng("random", numVars, numClauses, k, seed)
+    for i in range(numClauses):
+        yield random_clause(rng, numVars, k)
+
+# Random planted assignment, one byte per variable (1 = True), index 0 unused
+def planted_assignment(rng, numVars):
+    return bytearray(b & 1 for b in rng.randbytes(numVars + 1))
+
+# Random k-SAT satisfied by a planted assignment: a clause the assignment falsifies gets one literal flipped.
+# planted: bytearray to fill in with the assignment (see planted_assignment), None to not keep it
+def planted_ksat(numVars, numClauses, k=3, seed=0, planted=None):
+    rng = instance_rng("planted", numVars, numClauses, k, seed)
+    values = planted_assignment(rng, numVars)
+    if planted is not None:
+        planted[:] = values
+    for i in range(numClauses):
+        clause = random_clause(rng, numVars, k)
+        if not any(values[abs(lit)] == (lit > 0) for lit in clause):
+            j = int(rng.random() * k)
+            clause[j] = -clause[j]
+        yield clause
+
+# Planted formula where UNIT_FRACTION of the variables are forced by unit clauses, the rest of the clauses have
+# 2 to 4 literals, so most of the work is unit propagation
+def unit_heavy(numVars, numClauses, seed=0, planted=None):
+    rng = instance_rng("unit-heavy", numVars, numClauses, 0, seed)
+    values = planted_assignment(rng, numVars)
+    if planted is not None:
+        planted[:] = values
+    units = min(int(numVars * UNIT_FRACTION), numClauses)
+    for var in rng.sample(range(1, numVars + 1), units):
+        yield [var if values[var] else -var]
+    for i in range(numClauses - units):
+        clause = random_clause(rng, numVars, min(2 + int(rng.random() * 3), numVars))
+        if not any(values[abs(lit)] == (lit > 0) for lit in clause):
+            clause[0] = -clause[0]
+        yield clause
+
+# Small in-memory generators used by the benchmark corpora and the tests, they return (clauses, planted) as lists.
+# They seed the global random module, as the benchmark baselines were made with them that way
+
+# k-SAT clauses satisfied by a random planted assignment, returns (clauses, {var: bool})
+def generate_planted_cnf(num_vars, num_clauses, k=3, seed=None):
+    if seed is not None:
+        random.seed(seed)
+    planted = {i: random.choice([False, True]) for i in range(1, num_vars+1)}
+    clauses = []
+    vars_range = list(range(1, num_vars+1))
+    for _ in range(num_clauses):
+        clause_vars = random.sample(vars_range, min(k, num_vars))
+        lits = []
+        for v in clause_vars:
+            # choose sign randomly; we'll fix later to ensure clause satisfied by planted
+            sign = random.choice([1, -1])
+            lits.append(sign * v)
+        # ensure at least one literal satisfied by planted
+        if not any(((lit > 0 and planted[abs(lit)]) or (lit < 0 and not planted[abs(lit)])) for lit in lits):
+            v = random.choice(clause_vars)
+            # set sign to satisfy planted[v]
+            lits = [lit for lit in lits if abs(lit) != v]  # remove any existing same var
+            lits.append(v if planted[v] else -v)
+        clauses.append(lits)
+    return clauses, planted
+
+# num_units consistent unit clauses forcing a planted assignment, plus extra_clauses of 2 to 4 literals it satisfies
+def generate_unit_heavy_cnf(num_vars, num_units, extra_clauses, seed=None):
+    if seed is not None:
+        random.seed(seed)
+    planted = {i: random.choice([False, True]) for i in range(1, num_vars+1)}
+    clauses = []
+    forced_vars = random.sample(list(planted.keys()), min(num_units, num_vars))
+    for v in forced_vars:
+        clauses.append([v if planted[v] else -v])  # unit clause
+    # extra clauses that are satisfied by planted assignment
+    for _ in range(extra_clauses):
+        k = random.randint(2, 4)
+        clause_vars = random.sample(list(planted.keys()), min(k, num_vars))
+        lits = []
+        for v in clause_vars:
+            sign = random.choice([1, -1])
+            lits.append(sign * v)
+        # guarantee satisfaction by planted
+        if not any(((lit > 0 and planted[abs(lit)]) or (lit < 0 and not planted[abs(lit)])) for lit in lits):
+            v = random.choice(clause_vars)
+            lits = [lit for lit in lits if abs(lit) != v]
+            lits.append(v if planted[v] else -v)
+        clauses.append(lits)
+    return clauses, planted
+
+# parts random 3-CNFs of n variables and m clauses each on separate variable ranges, shuffled together.
+# Returns (clauses, number of variables)
+def generate_disjoint_cnf(parts, n, m, seed=None):
+    rng = random.Random(seed)
+    clauses = []
+    for p in range(parts):
+        offset = p * n
+        clauses += [[offset + v if rng.random() < 0.5 else -(offset + v) for v in rng.sample(range(1, n + 1), 3)]
+                    for _ in range(m)]
+    rng.shuffle(clauses)
+    return clauses, parts * n
+
+# Disjoint parts tied together by a few clauses over variables of two parts, they fall apart once those are set
+def generate_bridged_cnf(parts, n, m, bridges, seed=None):
+    clauses, numVars = generate_disjoint_cnf(parts, n, m, seed)
+    rng = random.Random(seed)
+    for b in range(bridges):
+        a, c = rng.sample(range(parts), 2)
+        clauses.append([a * n + rng.randint(1, n), -(c * n + rng.randint(1, n)), c * n + rng.randint(1, n)])
+    return clauses, numVars
+
+# Clauses of one instance, numClauses is numVars * ratio rounded
+def instance_clauses(kind, numVars, ratio, k=3, seed=0, planted=None):
+    numClauses = round(numVars * ratio)
+    # Checked here as well, the generators below only run once their clauses are asked for
+    if kind in ("random", "planted") and not 1 <= k <= numVars:
+        raise ValueError(f"Clause width k={k} has to be between 1 and the number of variables ({numVars})")
+    if kind == "random":
+        return numClauses, random_ksat(numVars, numClauses, k, seed)
+    if kind == "planted":
+        return numClauses, planted_ksat(numVars, numClauses, k, seed, planted)
+    if kind == "unit-heavy":
+        return numClauses, unit_heavy(numVars, numClauses, seed, planted)
+    raise ValueError(f"Unknown instance kind: {kind}, expected one of {', '.join(KINDS)}")
+
+# Write clauses (any iterable, consumed once) as DIMACS, the header needs numClauses up front
+def write_dimacs(path, numVars, numClauses, clauses, comments=()):
+    written = 0
+    with open(path, "w") as f:
+        for comment in comments:
+            f.write(f"c {comment}\n")
+        f.write(f"p cnf {numVars} {numClauses}\n")
+        lines = []
+        for clause in clauses:
+            lines.append(" ".join(map(str, clause)) + " 0\n")
+            if len(lines) == CHUNK:
+                f.write("".join(lines))
+                written += len(lines)
+                lines = []
+        f.write("".join(lines))
+        written += len(lines)
+    if written != numClauses:
+        raise ValueError(f"{path}: {written} clauses written, the header says {numClauses}")
+    return path
+
+def instance_name(kind, numVars, ratio, k=3, seed=0):
+    return f"{kind}-n{numVars}-r{ratio:g}-k{k}-s{seed}.cnf"
+
+# Path of the instance in folder, generated unless it is already there (the name fixes its contents)
+def generate_instance(folder, kind, numVars, ratio, k=3, seed=0, overwrite=False):
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, instance_name(kind, numVars, ratio, k, seed))
+    if overwrite or not os.path.exists(path):
+        numClauses, clauses = instance_clauses(kind, numVars, ratio, k, seed)
+        # Written under a temporary name first, a killed run does not leave a truncated instance behind
+        write_dimacs(path + ".tmp", numVars, numClauses, clauses,
+                     [f"{kind} instance from generators.py: n={numVars} ratio={ratio:g} k={k} seed={seed}"])
+        os.replace(path + ".tmp", path)
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write random, planted or unit-heavy DIMACS instances of any size")
+    parser.add_argument("--kind", choices=KINDS, default="planted")
+    parser.add_argument("--vars", nargs="+", type=int, default=[10000], help="variable counts (default: 10000)")
+    parser.add_argument("--ratios", nargs="+", type=float, default=[4.2], help="clause/variable ratios (default: 4.2)")
+    parser.add_argument("--k", type=int, default=3, help="literals per clause of random and planted (default: 3)")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0], help="one instance per seed (default: 0)")
+    parser.add_argument("--folder", default="Generated CNF Formulas", help="where the files go (default: Generated CNF Formulas)")
+    parser.add_argument("--overwrite", action="store_true", help="write instances again even when the file exists")
+    args = parser.parse_args(argv)
+    if args.kind != "unit-heavy" and not 1 <= args.k <= min(args.vars):
+        parser.error(f"--k has to be between 1 and the smallest of --vars ({min(args.vars)})")
+    for numVars in args.vars:
+        for ratio in args.ratios:
+            for seed in args.seeds:
+                path = generate_instance(args.folder, args.kind, numVars, ratio, args.k, seed, args.overwrite)
+                print(f"{path}: {os.path.getsize(path) / 1e6:.1f} MB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+'''
+    Desc: Exact model counting (#SAT). A DPLL style counter: unit propagation, then the clauses left are split into
+          independent components whose counts multiply, each component is counted by branching on its most frequent
+          variable (binary clauses weigh more) and adding up both branches. Component counts are kept in an LRU cache
+          bounded in bytes and keyed by the component's sorted clauses, so a component reached again under another
+          assignment is not counted twice. Counts are python ints, exact at any size
+'''
+import array
+import sys
+from collections import OrderedDict
+from SATClass import splitComponents
+
+# Every decision level takes two frames (countClauses, countComponent), the default limit stops around 500 levels.
+# count raises the interpreter's limit to this while it runs and puts it back after
+RECURSION_LIMIT = 10000
+
+# Weight of a binary clause in the branching score (other clauses count 1), branching where clauses are about to
+# become units cuts the hard formulas' decisions in half compared with plain occurrence counts
+BINARY_WEIGHT = 4
+
+# Rough bytes of one OrderedDict entry besides its key and value (hash table slot and the linked list node)
+ENTRY_OVERHEAD = 100
+
+# Unit propagation from the literals in true (a set that gets the forced literals added), clauses that are satisfied
+# are dropped and false literals removed. Returns the clauses left (each with 2 or more literals), None on a conflict.
+# Only the clauses with the negation of a newly set literal are looked at, through an index built once per call
+def propagate(clauses, true):
+    watch = {}
+    units = []
+    for index, clause in enumerate(clauses):
+        if len(clause) < 2:
+            if not clause:
+                return None
+            units.append(clause[0])
+        for lit in clause:
+            watch.setdefault(-lit, []).append(index)
+    queue = list(true)
+    for lit in units:
+        if -lit in true:
+            return None
+        if lit not in true:
+            true.add(lit)
+            queue.append(lit)
+    while queue:
+        for index in watch.get(queue.pop(), ()):
+            free = None
+            for lit in clauses[index]:
+                if lit in true:
+                    break
+                if -lit not in true:
+                    if free is not None:
+                        break
+                    free = lit
+            else:
+                if free is None:
+                    return None
+                true.add(free)
+                queue.append(free)
+    remaining = []
+    for clause in clauses:
+        reduced = []
+        for lit in clause:
+            if lit in true:
+                break
+            if -lit not in true:
+                reduced.append(lit)
+        else:
+            remaining.append(reduced)
+    return remaining
+
+# Key of a component: its clauses sorted (literals sorted in each), packed with a 0 after every clause.
+# Same clauses in any order give the same key, as bytes it costs 4 bytes a literal in the cache
+def signature(clauses):
+    literals = array.array("i")
+    for clause in sorted(sorted(clause) for clause in clauses):
+        literals.extend(clause)
+        literals.append(0)
+    return literals.tobytes()
+
+'''
+ModelCounter Class:
+    cacheBytes: Bound on the memory of the component cache (keys, counts and entry overhead), least recently used go first
+    cache: signature -> model count of the component over its own variables
+    hits, misses: Component cache lookups answered, not answered
+    evictions: Entries dropped to stay under cacheBytes
+    cacheMemory: Current estimate of the cache's bytes, peakMemory the highest it got
+    decisions: Branches taken (each counts both values of a variable)
+    components: Times the clauses left split into more than one component
+'''
+class ModelCounter:
+    def __init__(self, cacheBytes=64 * 1024 * 1024):
+        self.cacheBytes = cacheBytes
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.cacheMemory = 0
+        self.peakMemory = 0
+        self.decisions = 0
+        self.components = 0
+
+    # Models of the clauses over variables 1..numVars, variables in no clause count twice each
+    def count(self, clauses, numVars):
+        variables = set(range(1, numVars + 1))
+        variables.update(abs(lit) for clause in clauses for lit in clause)
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, RECURSION_LIMIT))
+        try:
+            return self.countClauses([list(clause) for clause in clauses], variables, set())
+        finally:
+            sys.setrecursionlimit(limit)
+
+    # Models over variables of clauses once the literals in true are set and propagated
+    def countClauses(self, clauses, variables, true):
+        remaining = propagate(clauses, true)
+        if remaining is None:
+            return 0
+        parts = splitComponents(remaining) if remaining else []
+        if len(parts) > 1:
+            self.components += 1
+        used = {abs(lit) for clause in remaining for lit in clause}
+        # Variables neither set nor in a clause left are free, both of their values work
+        total = 1 << len(variables - used - {abs(lit) for lit in true})
+        for part in parts:
+            count = self.countComponent(part)
+            if count == 0:
+                return 0
+            total *= count
+        return total
+
+    # Models of one component over its own variables, from the cache when it was counted before
+    def countComponent(self, clauses):
+        key = signature(clauses)
+        count = self.cache.get(key)
+        if count is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return count
+        self.misses += 1
+
+        score = {}
+        for clause in clauses:
+            weight = BINARY_WEIGHT if len(clause) == 2 else 1
+            for lit in clause:
+                score[abs(lit)] = score.get(abs(lit), 0) + weight
+        var = max(score, key=score.get)
+        variables = set(score)
+        variables.discard(var)
+        self.decisions += 1
+        count = self.countClauses(clauses, variables, {var}) + self.countClauses(clauses, variables, {-var})
+        self.store(key, count)
+        return count
+
+    def store(self, key, count):
+        size = sys.getsizeof(key) + sys.getsizeof(count) + ENTRY_OVERHEAD
+        if size > self.cacheBytes:
+            return
+        self.cache[key] = count
+        self.cacheMemory += size
+        while self.cacheMemory > self.cacheBytes:
+            oldKey, oldCount = self.cache.popitem(last=False)
+            self.cacheMemory -= sys.getsizeof(oldKey) + sys.getsizeof(oldCount) + ENTRY_OVERHEAD
+            self.evictions += 1
+        self.peakMemory = max(self.peakMemory, self.cacheMemory)
+
+    @property
+    def hitRate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        return (f"component cache: {self.hits} hits, {self.misses} misses ({self.hitRate:.1%} hit rate), "
+                f"{len(self.cache)} entries, {self.cacheMemory / 1024:.1f} KB (peak {self.peakMemory / 1024:.1f} KB, "
+                f"bound {self.cacheBytes / 1024:.0f} KB), {self.evictions} evicted; {self.decisions} decisions, "
+                f"{self.components} splits")
+
+# Number of models of a File, with a fresh cache. Returns (count, counter) so the cache figures can be reported
+# stats: SolverStats to fill in (decisions, components), None to skip it
+def count_models(formula, cacheBytes=64 * 1024 * 1024, stats=None):
+    counter = ModelCounter(cacheBytes)
+    if stats is not None:
+        stats.start("count")
+    try:
+        count = counter.count(formula.clausesOriginal, formula.numVars)
+    finally:
+        if stats is not None:
+            stats.stop()
+            stats.decisions = counter.decisions
+            stats.components = counter.components
+    return count, counter
@@ -0,0 +1,499 @@
+'''
+    Desc: Parallel benchmark runner. Every (formula, algorithm, repetition) is its own job on a
+          concurrent.futures process pool, with its own wall clock timeout and a seed derived from the job,
+          and every result is appended as it comes in, in the same results_by_formula.csv layout as SATSolver.main.
+          Also a portfolio mode racing several engines on one formula, the first answer wins, and
+          cube-and-conquer DPLL splitting one formula's search space over the pool, and an island model
+          Genetic Algorithm with one population per process
+'''
+import _thread
+import concurrent.futures
+import hashlib
+import multiprocessing
+import os
+import queue
+import random
+import signal
+import threading
+import time
+import SATClass
+from SATClass import POPULATION_SIZE, GENERATIONS, MUTATION_PROPORTION, CROSSOVER_AMOUNT
+from budget import Budget
+from dpll import cdcl
+from cnfcache import FormulaCache
+from dimacs import read_dimacs
+from preprocess import Preprocessor
+from results import ResultSink, RESULT_COLUMNS
+from stats import SolverStats, Instrument, STATS_COLUMNS
+
+# Algorithm names as they appear in the CSV
+LOCAL = "Local Search"
+GENETIC = "Genetic"
+
+class JobTimeout(Exception):
+    pass
+
+# Seed of one job, the same job always gets the same seed whatever the worker count or order
+def job_seed(seed, formula_index, algorithm, repetition):
+    key = f"{seed}:{formula_index}:{algorithm}:{repetition}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+# One cache per worker process, the formulas are mapped from it so workers share the pages
+_cache = None
+
+def load_formula(path, cache_dir):
+    global _cache
+    if cache_dir is None:
+        return read_dimacs(path)
+    if _cache is None or _cache.directory != cache_dir:
+        _cache = FormulaCache(cache_dir)
+    return _cache.load(path)
+
+'''
+Deadline Class:
+    Raises JobTimeout in the worker once timeout seconds have passed, the solvers are pure Python so
+    the exception lands between two bytecodes and the worker goes on with its next job.
+    Uses a real time timer (SIGALRM) where there is one, otherwise a thread interrupting the main thread
+'''
+class Deadline:
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.timer = None
+        self.previous = None
+
+    def expired(self, *args):
+        raise JobTimeout()
+
+    def __enter__(self):
+        if not self.timeout:
+            return self
+        if hasattr(signal, "setitimer"):
+            self.previous = signal.signal(signal.SIGALRM, self.expired)
+            signal.setitimer(signal.ITIMER_REAL, self.timeout)
+        else:
+            self.timer = threading.Timer(self.timeout, _thread.interrupt_main)
+            self.timer.daemon = True
+            self.timer.start()
+        return self
+
+    def __exit__(self, excType, exc, tb):
+        if not self.timeout:
+            return False
+        if self.timer is None:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self.previous)
+            return False
+        self.timer.cancel()
+        if excType is KeyboardInterrupt:
+            raise JobTimeout() from None
+        return False
+
+# Run one algorithm on one formula, returns (Clauses Prop, Time, timed out, stats columns), executed in the workers.
+# The stats columns are the engine's SolverStats row when options["stats"] is set, empty otherwise. The engine runs
+# under a Budget made of options["limits"] (Budget's arguments) when there are any
+def run_job(path, algorithm, seed, timeout, options, cache_dir=None):
+    original = load_formula(path, cache_dir)
+    random.seed(seed)
+    stats = SolverStats() if options.get("stats") else None
+    budget = Budget(*options["limits"]) if options.get("limits") else None
+    startTime = time.perf_counter()
+    try:
+        with Deadline(timeout), Instrument(stats, memory=options.get("trace_memory")):
+            # Preprocessing is part of every job's time, the engine runs on the reduced formula
+            preprocessor = Preprocessor(original) if options.get("preprocess") else None
+            formula = preprocessor.run() if preprocessor else original
+            if preprocessor is not None and preprocessor.isUnsat and algorithm in (LOCAL, GENETIC):
+                best = None  # preprocessing proved it UNSAT, there is nothing for Local Search or GA to search
+            elif algorithm == LOCAL:
+                if options["local"] == "greedy":
+                    best = SATClass.LocalSearch(formula, stats=stats, budget=budget)
+                else:
+                    best = SATClass.StochasticLocalSearch(formula, options["local"], stats=stats, budget=budget)
+            elif algorithm == GENETIC:
+                if options["genetic"] == "numpy":
+                    best = SATClass.GeneticAlgorithmNumpy(formula, POPULATION_SIZE, GENERATIONS, MUTATION_PROPORTION, CROSSOVER_AMOUNT, seed,
+                                                          stats=stats, budget=budget)
+                else:
+                    best = SATClass.GeneticAlgorithm(formula, POPULATION_SIZE, GENERATIONS, MUTATION_PROPORTION, CROSSOVER_AMOUNT, stats,
+                                                     budget)
+            elif options["complete"] == "cdcl":
+                cdcl(formula.clausesOriginal, {}, stats, budget)
+                best = None
+            else:
+                SATClass.dpll(formula.clausesOriginal, {}, SATClass.HEURISTICS[options["heuristic"]], budget, stats)
+                best = None
+            if best is not None and preprocessor is not None:
+                best = preprocessor.extendString(best)
+    except JobTimeout:
+        return None, timeout, True, {}  # the engine never got to fill in its stats
+    elapsed = time.perf_counter() - startTime
+    statsRow = stats.row() if stats is not None else {}
+    if best is None:
+        return None, elapsed, False, statsRow
+    return SATClass.ClausesSatisfied(original, best) / original.numClauses, elapsed, False, statsRow
+
+# Run every job over file_list on `workers` processes, each row is appended to output (see results.ResultSink) as
+# soon as its job finishes, with resume the jobs already in output are not run again. Returns the new rows.
+# stats: add the engines' SolverStats columns (STATS_COLUMNS), trace_memory: with their tracemalloc peak memory.
+# limits: Budget arguments (time, decisions, flips, generations, memory) every job gets its own Budget of
+def run_parallel(file_list, workers=None, timeout=None, repetitions=1, seed=0, complete="dpll", local="greedy",
+                 genetic="python", heuristic="maxocc", cache_dir=None, output="results_by_formula.csv", preprocess=False,
+                 resume=False, stats=False, trace_memory=False, limits=None):
+    options = {"complete": complete, "local": local, "genetic": genetic, "heuristic": heuristic, "preprocess": preprocess,
+               "stats": stats or trace_memory, "trace_memory": trace_memory, "limits": limits}
+    columns = RESULT_COLUMNS + ["Timed Out"] + (STATS_COLUMNS if options["stats"] else [])
+    completeName = complete.upper()
+    rows = []
+    timeouts = skipped = 0
+
+    startTime = time.perf_counter()
+    with ResultSink(output, columns, resume=resume) as sink, \
+            concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = {}
+        for repetition in range(repetitions):
+            for i, path in enumerate(file_list):
+                # The complete solvers are deterministic, repeating them only repeats the timing
+                for algorithm in (LOCAL, GENETIC, completeName):
+                    jobSeed = job_seed(seed, i, algorithm, repetition)
+                    row = {"Formula": i, "Algorithm": algorithm, "File": path, "Repetition": repetition, "Seed": jobSeed}
+                    if sink.isDone(row):
+                        skipped += 1
+                        continue
+                    future = pool.submit(run_job, path, algorithm, jobSeed, timeout, options, cache_dir)
+                    jobs[future] = row
+        for future in concurrent.futures.as_completed(jobs):
+            row = jobs[future]
+            prop, elapsed, timedOut, statsRow = future.result()
+            # A timed out run counts as the full timeout
+            row.update({"Clauses Prop": None if prop is None else round(prop, 4), "Time": round(elapsed, 4),
+                        "Timed Out": timedOut, **statsRow})
+            sink.write(row)
+            rows.append(row)
+            timeouts += timedOut
+            if timedOut:
+                print(f"Timed out: {row['Algorithm']} on {row['File']} after {timeout} seconds")
+    wallTime = time.perf_counter() - startTime
+    print(f"Saved {output} with {len(rows)} new rows" + (f", {skipped} jobs were already there." if skipped else "."))
+
+    cpuTime = sum(row["Time"] for row in rows)
+    print(f"{len(jobs)} jobs on {workers or os.cpu_count()} workers: {wallTime:.2f} s wall, {cpuTime:.2f} s in jobs "
+          f"({cpuTime / wallTime if wallTime else 0:.2f}x), {timeouts} timed out")
+    return rows
+
+# Engines portfolio_solve can race, only the complete ones can prove UNSAT
+PORTFOLIO_ENGINES = ("dpll", "cdcl", "greedy", "walksat", "probsat", "genetic")
+COMPLETE_ENGINES = ("dpll", "cdcl")
+
+# One engine of the portfolio, puts (engine, isSat, assignment) on results once it has an answer.
+# limits: Budget arguments (time, decisions, flips, generations, memory) of the engine, an engine that runs out of it
+# puts (engine, None, None). The time and memory limits hold over all the restarts of an incomplete engine, its
+# counter limits over each restart
+def portfolio_worker(engine, formula, seed, heuristic, results, limits=None):
+    random.seed(seed)
+    budget = Budget(*limits) if limits else None
+    if engine == "cdcl":
+        results.put((engine,) + cdcl(formula.clausesOriginal, {}, None, budget))
+        return
+    if engine == "dpll":
+        results.put((engine,) + SATClass.dpll(formula.clausesOriginal, {}, SATClass.HEURISTICS[heuristic], budget))
+        return
+    # Incomplete engines start over until a run satisfies every clause, the parent stops them once someone wins
+    while True:
+        if engine == "greedy":
+            best = SATClass.LocalSearch(formula, budget=budget)
+        elif engine == "genetic":
+            best = SATClass.GeneticAlgorithm(formula, POPULATION_SIZE, GENERATIONS, MUTATION_PROPORTION, CROSSOVER_AMOUNT,
+                                             budget=budget)
+        else:
+            best = SATClass.StochasticLocalSearch(formula, engine, budget=budget)
+        if SATClass.ClausesSatisfied(formula, best) == formula.numClauses:
+            results.put((engine, True, SATClass.Assignment.fromString(best).toDict()))
+            return
+        if budget is not None and budget.reason is not None:
+            results.put((engine, None, None))
+            return
+
+# Race engines on formula in their own processes, the first satisfying assignment (checked here again) or the
+# first UNSAT from a complete engine wins and the others are stopped.
+# Returns (isSat, assignment, winning engine, seconds), isSat and the engine are None when nobody answered in time.
+# limits: Budget arguments (time, decisions, flips, generations, memory) every engine gets its own Budget of
+def portfolio_solve(formula, engines=("cdcl", "walksat", "genetic"), timeout=None, seed=0, heuristic="maxocc", limits=None):
+    if timeout is None and not (limits and limits[0] is not None) and not any(engine in COMPLETE_ENGINES for engine in engines):
+        # The incomplete engines restart until they find a model, on an UNSAT formula nobody would ever answer
+        raise ValueError("a portfolio without dpll or cdcl needs a timeout or a time limit")
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    processes = []
+    for engine in engines:
+        if engine not in PORTFOLIO_ENGINES:
+            raise ValueError(f"unknown engine {engine!r}, expected one of {', '.join(PORTFOLIO_ENGINES)}")
+        process = context.Process(target=portfolio_worker, daemon=True,
+                                  args=(engine, formula, job_seed(seed, 0, engine, 0), heuristic, results, limits))
+        processes.append(process)
+
+    startTime = time.perf_counter()
+    isSat = assignment = winner = None
+    try:
+        for process in processes:
+            process.start()
+        while True:
+            wait = 0.1
+            if timeout is not None:
+                remaining = timeout - (time.perf_counter() - startTime)
+                if remaining <= 0:
+                    break
+                wait = min(wait, remaining)
+            try:
+                engine, sat, values = results.get(timeout=wait)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes) and results.empty():
+                    break  # every engine stopped without an answer (crashed)
+                continue
+            if sat:
+                if SATClass.ClausesSatisfied(formula, SATClass.Assignment.fromDict(values, formula.numVars)) == formula.numClauses:
+                    isSat, assignment, winner = True, values, engine
+                    break
+                print(f"Portfolio: {engine} returned an assignment that does not satisfy {formula.fileN}, ignored")
+            elif sat is False and engine in COMPLETE_ENGINES:
+                isSat, winner = False, engine
+                break
+            # None: the engine ran out of its budget, the others go on
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        results.close()
+    return isSat, assignment, winner, time.perf_counter() - startTime
+
+# Clauses of the formula being cubed, set once per worker process by the pool initializer
+_cubeClauses = None
+
+def set_cube_clauses(clauses):
+    global _cubeClauses
+    _cubeClauses = clauses
+
+# Split cube on the most constraining variable left after propagating it.
+# Returns ("sat", assignment), ("unsat", None) or ("split", [cube with var True, cube with var False])
+def split_cube(clauses, cube):
+    remaining, assignment, isConflict = SATClass.unitPropagation(clauses, cube)
+    if isConflict:
+        return "unsat", None
+    if not remaining:
+        return "sat", assignment
+    var = SATClass.pickMostConstraining(remaining, assignment)
+    return "split", [{**cube, var: True}, {**cube, var: False}]
+
+# Solve one cube with dpll for at most decisions decisions, a cube that runs out is split in two and handed back.
+# deadline: time.time() the whole search has to stop by (None for no limit), memory: the budget's memory limit.
+# components: let the cube's dpll split its clauses into independent components (see SATClass.dpll).
+# Returns (status, result, counters), counters are the (decisions, conflicts, backtracks, propagations, components,
+# maxDepth) of the dpll run. A cube stopped by the deadline or memory comes back as ("unknown", reason) instead of
+# being split
+def solve_cube(cube, heuristic, decisions, deadline=None, memory=None, components=False):
+    timeLeft = None if deadline is None else max(deadline - time.time(), 0.0)
+    budget = Budget(time=timeLeft, decisions=decisions, memory=memory)
+    stats = SolverStats()
+    isSat, assignment = SATClass.dpll(_cubeClauses, cube, heuristic, budget, stats, components)
+    counters = (stats.decisions, stats.conflicts, stats.backtracks, stats.propagations, stats.components,
+                stats.maxDepth)
+    if isSat:
+        return "sat", assignment, counters
+    if isSat is False:
+        return "unsat", None, counters
+    if budget.reason != "decisions":
+        return "unknown", budget.reason, counters
+    status, result = split_cube(_cubeClauses, cube)
+    if status == "sat":
+        print("Found Solution!!!")
+    return status, result, counters
+
+# Cube-and-conquer with the same call and return shape as SATClass.dpll: the search space is split into cubes
+# (partial assignments over the top pickMostConstraining variables) solved on a process pool. Cubes that take
+# more than cubeDecisions decisions are split again so the workers stay busy, the first model stops the search and
+# UNSAT is only reported once every cube is refuted.
+# heuristic: branching heuristic of every cube's dpll (class or name in SATClass.HEURISTICS)
+# budget: Budget of the whole search, decisions add up over the cubes and the time limit is shared, (None, None)
+# once it runs out. stats: SolverStats that gets the cubes' counters added up. components: passed to every cube's dpll
+def cube_and_conquer(clauses, assignment, heuristic=None, budget=None, stats=None, components=False, workers=None,
+                     cubes=None, cubeDecisions=2000):
+    clauses = [list(clause) for clause in clauses]
+    workers = workers or os.cpu_count()
+    cubes = cubes or 4 * workers
+    if stats is not None:
+        stats.start("cube")
+    if budget is not None:
+        budget.start()
+    deadline = memory = None
+    if budget is not None:
+        memory = budget.memory
+        if budget.time is not None:
+            deadline = time.time() + budget.time - budget.elapsed()
+    totals = [0, 0, 0, 0, 0, 0]
+
+    # Decisions a new cube gets: cubeDecisions, or what is left of the budget's when that is less
+    def cubeLimit():
+        if budget is None or budget.decisions is None:
+            return cubeDecisions
+        return max(min(cubeDecisions, budget.decisions - totals[0]), 1)
+
+    try:
+        # Split breadth first in this process until there are enough cubes to go around
+        pending = [dict(assignment)]
+        while pending and len(pending) < cubes:
+            if budget is not None and budget.exceeded():
+                return None, None
+            status, result = split_cube(clauses, pending.pop(0))
+            if status == "sat":
+                print("Found Solution!!!")
+                return True, result
+            if status == "split":
+                pending.extend(result)
+        if not pending:
+            return False, None
+
+        counts = {"cubes": len(pending), "resplit": 0, "refuted": 0}
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=set_cube_clauses,
+                                                    initargs=(clauses,)) as pool:
+            running = {pool.submit(solve_cube, cube, heuristic, cubeLimit(), deadline, memory, components)
+                       for cube in pending}
+            try:
+                while running:
+                    timeout = None if deadline is None else max(deadline - time.time(), 0.0)
+                    done, running = concurrent.futures.wait(running, timeout=timeout,
+                                                            return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        status, result, counters = future.result()
+                        for i in range(5):
+                            totals[i] += counters[i]
+                        totals[5] = max(totals[5], counters[5])
+                        if status == "sat":
+                            return True, result  # the worker already printed it
+                        if status == "unknown":
+                            if budget.reason is None:
+                                budget.reason = result
+                            return None, None
+                        if status == "unsat":
+                            counts["refuted"] += 1
+                        else:
+                            counts["resplit"] += 1
+                            counts["cubes"] += len(result)
+                            if budget is not None and budget.exceeded(decisions=totals[0]):
+                                return None, None
+                            running |= {pool.submit(solve_cube, cube, heuristic, cubeLimit(), deadline, memory, components)
+                                        for cube in result}
+                    if budget is not None and budget.exceeded(decisions=totals[0]):
+                        return None, None
+            finally:
+                # Cubes that have not started are dropped, running ones stop at their budget
+                for future in running:
+                    future.cancel()
+                print(f"Cube and conquer: {counts['cubes']} cubes, {counts['resplit']} split again, "
+                      f"{counts['refuted']} refuted")
+        return False, None
+    finally:
+        if stats is not None:
+            stats.stop()
+            (stats.decisions, stats.conflicts, stats.backtracks, stats.propagations, stats.components,
+             stats.maxDepth) = totals
+
+# Islands each island sends its best individuals to
+def island_targets(index, islands, topology):
+    if topology == "ring":
+        return [(index + 1) % islands] if islands > 1 else []
+    return [other for other in range(islands) if other != index]
+
+# One island: SATClass.GeneticAlgorithm on its own population, every interval generations its best migrants
+# go to the target inboxes and whatever arrived in its own inbox replaces its worst individuals.
+# limits: (deadline as a time.time(), generations, memory) of the island's own Budget, None for no budget.
+# Puts (best assignment, clauses satisfied, generations run, budget reason) on results when done or stopped
+def island_worker(index, formula, population_size, generations, mutation_proportion, crossover_amount,
+                  interval, migrants, targets, inboxes, stop, results, seed, limits=None):
+    random.seed(seed)
+    # Migrants still in a pipe when the run ends are not needed, do not wait on them at exit
+    for inbox in inboxes:
+        inbox.cancel_join_thread()
+    budget = None
+    if limits is not None:
+        deadline, maxGenerations, memory = limits
+        budget = Budget(time=None if deadline is None else max(deadline - time.time(), 0.0),
+                        generations=maxGenerations, memory=memory).start()
+    population_group, clauses_satisfied_group = SATClass.GeneticPopulation(formula, population_size, budget)
+
+    gen = 0
+    while gen < generations and not stop.is_set() and max(clauses_satisfied_group) < formula.numClauses:
+        if budget is not None and budget.exceeded(generations=gen):
+            break
+        SATClass.GeneticGeneration(formula, population_group, clauses_satisfied_group, mutation_proportion, crossover_amount,
+                                   budget)
+        gen += 1
+        if gen % interval:
+            continue
+        ranked = sorted(range(len(population_group)), key=clauses_satisfied_group.__getitem__)
+        for target in targets:
+            inboxes[target].put([(population_group[i], clauses_satisfied_group[i]) for i in ranked[-migrants:]])
+        # Migration is asynchronous, an island never waits for a slower neighbour
+        arrived = []
+        while True:
+            try:
+                arrived.extend(inboxes[index].get_nowait())
+            except queue.Empty:
+                break
+        for slot, (assignment, numsatisfied) in zip(ranked, arrived):
+            population_group[slot] = assignment
+            clauses_satisfied_group[slot] = numsatisfied
+
+    best = clauses_satisfied_group.index(max(clauses_satisfied_group))
+    if clauses_satisfied_group[best] == formula.numClauses:
+        stop.set()  # every clause satisfied, the other islands can stop
+    results.put((population_group[best].toString(), clauses_satisfied_group[best], gen,
+                 None if budget is None else budget.reason))
+
+# Island model Genetic Algorithm, returns the best assignment string over all islands like GeneticAlgorithm.
+# topology: "ring" (each island feeds the next one) or "full" (each island feeds all the others)
+# budget: Budget every island runs under, the time limit is shared and the generation limit counts on each island.
+# Its reason is set when an island stopped on it
+def island_genetic_algorithm(formula, population_size, generations, mutation_proportion, crossover_amount,
+                             islands=None, interval=10, migrants=2, topology="ring", seed=0, budget=None):
+    if topology not in ("ring", "full"):
+        raise ValueError(f"Unknown island topology: {topology}")
+    if interval < 1:
+        raise ValueError(f"Migration interval has to be at least 1 generation, got {interval}")
+    limits = None
+    if budget is not None:
+        budget.start()
+        deadline = None if budget.time is None else time.time() + budget.time - budget.elapsed()
+        limits = (deadline, budget.generations, budget.memory)
+    islands = islands or os.cpu_count()
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for i in range(islands)]
+    results = context.Queue()
+    stop = context.Event()
+    processes = [context.Process(target=island_worker, daemon=True,
+                                 args=(index, formula, population_size, generations, mutation_proportion, crossover_amount,
+                                       interval, migrants, island_targets(index, islands, topology), inboxes, stop,
+                                       results, job_seed(seed, 0, "island", index), limits))
+                 for index in range(islands)]
+    try:
+        for process in processes:
+            process.start()
+        finished = []
+        while len(finished) < len(processes):
+            try:
+                finished.append(results.get(timeout=0.1))
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes) and results.empty():
+                    raise RuntimeError("an island stopped without sending its result")
+    finally:
+        for process in processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+    best, numsatisfied, gens, reason = max(finished, key=lambda item: item[1])
+    if budget is not None and budget.reason is None and numsatisfied < formula.numClauses:
+        budget.reason = next((item[3] for item in finished if item[3] is not None), None)
+    print(f"Islands: {islands} x {population_size}, best {numsatisfied}/{formula.numClauses}, "
+          f"{sum(item[2] for item in finished)} generations in total")
+    return best
@@ -0,0 +1,296 @@
+'''
+    Desc: CNF preprocessing run once per formula before search: tautology and duplicate removal, unit propagation,
+          pure literal elimination, subsumption and self-subsuming resolution, bounded variable elimination and
+          failed literal probing. Variables keep their numbers, so every engine can run on the reduced formula
+          and Preprocessor.extend turns its model back into a model of the original formula
+'''
+from SATClass import File, WatchedClauses, Assignment
+
+'''
+Preprocessor Class:
+    formula: The original File
+    numVars: Number of variables in the original formula
+    clauses: Live clauses as sets of literals, None where a clause was removed
+    occurs: occurs[lit] is the set of live clause indices lit is in
+    fixed: Values forced by units and failed literals ({var: bool})
+    eliminated: Variables removed by pure literal elimination or variable elimination
+    stack: (witness literal, clause) pairs removed with a variable, replayed backwards by extend
+    isUnsat: True once the empty clause was derived
+    stats: Counters for each step, plus the size before and after
+'''
+class Preprocessor:
+    def __init__(self, formula, maxOccurrences=16, maxResolventSize=16, probeLimit=2000, rounds=3):
+        self.formula = formula
+        self.numVars = formula.numVars
+        self.maxOccurrences = maxOccurrences
+        self.maxResolventSize = maxResolventSize
+        self.probeLimit = probeLimit
+        self.rounds = rounds
+        self.clauses = []
+        self.occurs = {}
+        self.fixed = {}
+        self.eliminated = set()
+        self.stack = []
+        self.isUnsat = False
+        self.units = []
+        self.seen = set()
+        self.stats = {"tautologies": 0, "duplicates": 0, "units": 0, "pure": 0, "subsumed": 0,
+                      "strengthened": 0, "eliminated": 0, "failed": 0}
+        self.stats["before"] = self.size(formula.clausesOriginal)
+
+        for clause in formula.clausesOriginal:
+            lits = set(clause)
+            if any(-lit in lits for lit in lits):
+                self.stats["tautologies"] += 1
+                continue
+            self.addClause(lits)
+        self.propagateUnits()
+
+    # (variables, clauses, literals) of a list of clauses
+    @staticmethod
+    def size(clauses):
+        variables = set()
+        numClauses = numLiterals = 0
+        for clause in clauses:
+            numClauses += 1
+            numLiterals += len(clause)
+            variables.update(abs(lit) for lit in clause)
+        return {"variables": len(variables), "clauses": numClauses, "literals": numLiterals}
+
+    # Store a clause (no tautologies), duplicates are dropped and units are queued
+    def addClause(self, lits):
+        key = frozenset(lits)
+        if key in self.seen:
+            self.stats["duplicates"] += 1
+            return
+        if not lits:
+            self.isUnsat = True
+            return
+        self.seen.add(key)
+        index = len(self.clauses)
+        self.clauses.append(set(lits))
+        for lit in lits:
+            self.occurs.setdefault(lit, set()).add(index)
+        if len(lits) == 1:
+            self.units.append(next(iter(lits)))
+
+    def removeClause(self, index):
+        clause = self.clauses[index]
+        self.clauses[index] = None
+        self.seen.discard(frozenset(clause))
+        for lit in clause:
+            self.occurs[lit].discard(index)
+
+    # Drop lit from a clause, the shorter clause may become a unit or the empty clause
+    def strengthen(self, index, lit):
+        clause = self.clauses[index]
+        self.seen.discard(frozenset(clause))
+        clause.discard(lit)
+        self.occurs[lit].discard(index)
+        key = frozenset(clause)
+        if key in self.seen:
+            # The shorter clause is already there
+            self.stats["duplicates"] += 1
+            self.clauses[index] = None
+            for other in clause:
+                self.occurs[other].discard(index)
+            return
+        self.seen.add(key)
+        if not clause:
+            self.isUnsat = True
+        elif len(clause) == 1:
+            self.units.append(next(iter(clause)))
+
+    # Make every queued unit true, removing the clauses it satisfies and the opposite literal everywhere
+    def propagateUnits(self):
+        while self.units and not self.isUnsat:
+            lit = self.units.pop()
+            var = abs(lit)
+            if var in self.fixed:
+                if self.fixed[var] != (lit > 0):
+                    self.isUnsat = True
+                continue
+            self.fixed[var] = lit > 0
+            self.stats["units"] += 1
+            for index in list(self.occurs.get(lit, ())):
+                self.removeClause(index)
+            for index in list(self.occurs.get(-lit, ())):
+                self.strengthen(index, -lit)
+
+    def liveClauses(self):
+        return [clause for clause in self.clauses if clause is not None]
+
+    # Remove a literal's clauses together with the variable, extend makes the witness true when a clause needs it
+    def eliminate(self, indices, witness):
+        for index in indices:
+            self.stack.append((witness, tuple(self.clauses[index])))
+            self.removeClause(index)
+
+    # Literals that only show up with one sign can be made true, which removes every clause they are in
+    def pureLiterals(self):
+        changed = False
+        for var in range(1, self.numVars + 1):
+            if var in self.fixed or var in self.eliminated:
+                continue
+            pos = self.occurs.get(var)
+            neg = self.occurs.get(-var)
+            if pos and not neg:
+                self.eliminate(list(pos), var)
+            elif neg and not pos:
+                self.eliminate(list(neg), -var)
+            else:
+                continue
+            self.eliminated.add(var)
+            self.stats["pure"] += 1
+            changed = True
+        return changed
+
+    # Backward subsumption (drop clauses containing a shorter one) and self-subsuming resolution
+    # (C = A + l and D = A + B - l, D loses -l), each clause is checked against the occurrences of its rarest literal
+    def subsumption(self):
+        changed = False
+        order = sorted((index for index, clause in enumerate(self.clauses) if clause is not None),
+                       key=lambda index: len(self.clauses[index]))
+        for index in order:
+            clause = self.clauses[index]
+            if clause is None or self.isUnsat:
+                continue
+            rarest = min(clause, key=lambda lit: len(self.occurs[lit]))
+            for other in list(self.occurs[rarest]):
+                candidate = self.clauses[other]
+                if other != index and candidate is not None and len(candidate) >= len(clause) and clause <= candidate:
+                    self.removeClause(other)
+                    self.stats["subsumed"] += 1
+                    changed = True
+            for lit in list(clause):
+                for other in list(self.occurs.get(-lit, ())):
+                    candidate = self.clauses[other]
+                    if candidate is None or len(candidate) < len(clause) or self.clauses[index] is None:
+                        continue
+                    if all(x == lit or x in candidate for x in clause):
+                        self.strengthen(other, -lit)
+                        self.stats["strengthened"] += 1
+                        changed = True
+            self.propagateUnits()
+        return changed
+
+    # Bounded variable elimination: replace the clauses of a variable by all their non tautological resolvents
+    # when that does not add clauses and no resolvent is longer than maxResolventSize
+    def variableElimination(self):
+        changed = False
+        candidates = [var for var in range(1, self.numVars + 1) if var not in self.fixed and var not in self.eliminated]
+        candidates.sort(key=lambda var: len(self.occurs.get(var, ())) + len(self.occurs.get(-var, ())))
+        for var in candidates:
+            if self.isUnsat:
+                break
+            if var in self.fixed:
+                continue
+            pos = list(self.occurs.get(var, ()))
+            neg = list(self.occurs.get(-var, ()))
+            if not pos or not neg or len(pos) + len(neg) > self.maxOccurrences:
+                continue  # pure or too many occurrences (pure ones are left for pureLiterals)
+            resolvents = []
+            for p in pos:
+                for n in neg:
+                    resolvent = (self.clauses[p] | self.clauses[n]) - {var, -var}
+                    if any(-lit in resolvent for lit in resolvent):
+                        continue
+                    if len(resolvent) > self.maxResolventSize:
+                        resolvents = None
+                        break
+                    resolvents.append(resolvent)
+                    if len(resolvents) > len(pos) + len(neg):
+                        resolvents = None
+                        break
+                if resolvents is None:
+                    break
+            if resolvents is None:
+                continue
+            self.eliminate(pos, var)
+            self.eliminate(neg, -var)
+            self.eliminated.add(var)
+            self.stats["eliminated"] += 1
+            for resolvent in resolvents:
+                self.addClause(resolvent)
+            self.propagateUnits()
+            changed = True
+        return changed
+
+    # Failed literal probing: a literal whose propagation ends in a conflict must be false
+    def probe(self):
+        engine = WatchedClauses(self.liveClauses())
+        if engine.isConflict or engine.propagate() is not None:
+            self.isUnsat = True
+            return False
+        counts = {}
+        for clause in self.liveClauses():
+            for lit in clause:
+                counts[abs(lit)] = counts.get(abs(lit), 0) + 1
+        changed = False
+        for var in sorted(counts, key=counts.get, reverse=True)[:self.probeLimit]:
+            for lit in (var, -var):
+                if abs(lit) in engine.assignment:
+                    break
+                engine.decide(lit)
+                conflict = engine.propagate()
+                engine.backtrack(0)
+                if conflict is None:
+                    continue
+                self.stats["failed"] += 1
+                self.units.append(-lit)
+                engine.enqueue(-lit)
+                if engine.propagate() is not None:
+                    self.isUnsat = True
+                    return False
+                changed = True
+                break
+        self.propagateUnits()
+        return changed
+
+    # Run every step until nothing changes (at most rounds times), returns the reduced File
+    def run(self, subsume=True, eliminate=True, probe=True):
+        for i in range(self.rounds):
+            changed = self.pureLiterals()
+            if subsume and not self.isUnsat:
+                changed |= self.subsumption()
+            if eliminate and not self.isUnsat:
+                changed |= self.variableElimination()
+            if probe and not self.isUnsat:
+                changed |= self.probe()
+            if self.isUnsat or not changed:
+                break
+        return self.reduced()
+
+    # The reduced formula as a File with the original variable numbers, one empty clause when it is UNSAT
+    def reduced(self):
+        if self.isUnsat:
+            clauses = [[]]
+        else:
+            clauses = [sorted(clause, key=abs) for clause in self.liveClauses()]
+        self.stats["after"] = self.size(clauses)
+        return File.fromClauses(self.formula.fileN, self.numVars, clauses)
+
+    # Model of the original formula from a model ({var: bool}) of the reduced one
+    def extend(self, model):
+        values = [False] * (self.numVars + 1)
+        for var, val in model.items():
+            values[var] = bool(val)
+        for var, val in self.fixed.items():
+            values[var] = val
+        for witness, clause in reversed(self.stack):
+            if not any(values[abs(lit)] == (lit > 0) for lit in clause):
+                values[abs(witness)] = witness > 0
+        return {var: values[var] for var in range(1, self.numVars + 1)}
+
+    # Same as extend for the "0101..." strings LocalSearch and GeneticAlgorithm return
+    def extendString(self, text):
+        return Assignment.fromDict(self.extend(Assignment.fromString(text).toDict()), self.numVars).toString()
+
+    def report(self):
+        before = self.stats["before"]
+        after = self.stats["after"]
+        steps = ", ".join(f"{name} {self.stats[name]}" for name in
+                          ("tautologies", "duplicates", "units", "pure", "subsumed", "strengthened", "eliminated", "failed"))
+        return (f"Preprocessed {self.formula.fileN}: {before['variables']} -> {after['variables']} variables, "
+                f"{before['clauses']} -> {after['clauses']} clauses, {before['literals']} -> {after['literals']} literals "
+                f"({steps}){' UNSAT' if self.isUnsat else ''}")
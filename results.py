@@ -0,0 +1,122 @@
+'''
+    Desc: Results written one row per finished job instead of all at the end, to a CSV or JSONL file (picked by
+          extension) that is flushed after every row and fsynced every few rows, so a killed run keeps what it
+          finished. A resumed run reads the file back and skips the (formula, algorithm, seed) jobs already in it.
+          pandas is only imported to print a summary
+'''
+import csv
+import json
+import os
+import time
+
+# Columns of every results row, the first four are the Runtime.csv layout.
+# Cached is True on rows answered from the solve cache, their time is a lookup and not a solve
+RESULT_COLUMNS = ["Formula", "Algorithm", "Clauses Prop", "Time", "File", "Repetition", "Seed", "Cached"]
+
+def is_jsonl(path):
+    return path.endswith((".jsonl", ".json"))
+
+# Identifies a job across runs, values are compared as strings since the CSV reads everything back as text
+def job_key(row):
+    return (str(row["File"]), str(row["Algorithm"]), str(row["Seed"]))
+
+# Rows of a results file, a partial last line (the run was killed while writing it) is left out
+def read_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="") as f:
+        text = f.read()
+    if not text.endswith("\n"):
+        text = text[:text.rfind("\n") + 1]
+    if is_jsonl(path):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return list(csv.DictReader(text.splitlines()))
+
+'''
+ResultSink Class:
+    path: CSV or JSONL (.jsonl/.json) file the rows are appended to
+    fields: CSV columns, a resumed CSV keeps the columns it was started with
+    done: job_key of every row already in the file when resuming, empty otherwise
+    syncEvery, syncInterval: fsync after this many rows or this many seconds, whichever comes first
+    written: Rows written by this sink
+'''
+class ResultSink:
+    def __init__(self, path, fields=RESULT_COLUMNS, resume=False, syncEvery=10, syncInterval=5.0):
+        self.path = path
+        self.fields = list(fields)
+        self.syncEvery = syncEvery
+        self.syncInterval = syncInterval
+        self.done = set()
+        self.written = 0
+        self.pending = 0
+        self.lastSync = time.monotonic()
+
+        exists = resume and os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            rows = read_results(path)
+            self.done = {job_key(row) for row in rows}
+            # Cut off a partial last row before appending after it
+            with open(path, "rb+") as f:
+                data = f.read()
+                f.truncate(data.rfind(b"\n") + 1)
+            if not is_jsonl(path):
+                with open(path, newline="") as f:
+                    header = next(csv.reader(f), None)
+                if header:
+                    self.fields = header
+                else:
+                    exists = False
+        self.file = open(path, "a" if exists else "w", newline="")
+        self.writer = None
+        if not is_jsonl(path):
+            self.writer = csv.DictWriter(self.file, fieldnames=self.fields, extrasaction="ignore")
+            if not exists:
+                self.writer.writeheader()
+                self.file.flush()
+
+    def isDone(self, row):
+        return job_key(row) in self.done
+
+    def write(self, row):
+        if self.writer is not None:
+            self.writer.writerow(row)
+        else:
+            self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+        self.done.add(job_key(row))
+        self.written += 1
+        self.pending += 1
+        if self.pending >= self.syncEvery or time.monotonic() - self.lastSync >= self.syncInterval:
+            self.sync()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+        self.lastSync = time.monotonic()
+
+    def close(self):
+        if not self.file.closed:
+            self.sync()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, exc, tb):
+        self.close()
+        return False
+
+# Mean proportion and time of every (formula, algorithm) over its repetitions, printed with pandas.
+# Rows answered from the solve cache are left out
+def print_summary(path):
+    import pandas as pd
+    df = pd.DataFrame([row for row in read_results(path) if str(row.get("Cached")).lower() != "true"])
+    if df.empty:
+        print(f"No results in {path}")
+        return None
+    for column in ("Clauses Prop", "Time"):
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    summary = df.groupby(["Formula", "Algorithm"], sort=True)[["Clauses Prop", "Time"]].mean().round(4).reset_index()
+    print(summary)
+    return summary
@@ -0,0 +1,170 @@
+'''
+    Desc: Scaling benchmark. Sweeps instance size and clause/variable ratio over generated instances (generators.py)
+          for each engine and records load time, solve time, peak memory and success rate, to find where each engine
+          stops scaling. Every run is a fresh process, so its peak memory is its own and an engine stuck building its
+          data structures past the time limit can be killed. Rows go to a CSV as they finish and --resume skips them
+'''
+import argparse
+import contextlib
+import io
+import multiprocessing
+import queue
+import random
+import sys
+import time
+try:
+    import resource
+except ImportError:  # no rlimits or rusage on Windows, memory is then only what budget.current_memory reads
+    resource = None
+from budget import Budget, anytime_solve, current_memory, ANYTIME_ENGINES, SAT, UNSAT
+from dimacs import read_dimacs
+from generators import generate_instance, KINDS
+from parallel import job_seed
+from results import ResultSink, read_results, job_key
+
+SCALING_COLUMNS = ["Kind", "Variables", "Ratio", "Clauses", "Algorithm", "Seed", "Status", "Reason", "Satisfied",
+                   "Load Time", "Time", "Peak Memory (MB)", "File"]
+
+# Seconds a run gets past its time limit (loading the file, building the engine's structures) before it is killed
+GRACE = 30
+
+# Peak resident memory of this process in bytes
+def peak_memory():
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return current_memory()
+
+# One run in its own process: load the instance, solve it under the budget and put the row fields on results.
+# The memory limit is also set as an address space limit, so an engine that runs out while building its data
+# structures (before it checks its budget) stops with a MemoryError instead of taking the machine down
+def scaling_worker(path, engine, seed, timeLimit, memoryLimit, results):
+    if memoryLimit is not None and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memoryLimit, memoryLimit))
+    random.seed(seed)
+    row = {}
+    try:
+        startTime = time.perf_counter()
+        formula = read_dimacs(path)
+        row["Load Time"] = round(time.perf_counter() - startTime, 4)
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = anytime_solve(formula, engine, Budget(time=timeLimit, memory=memoryLimit))
+        row.update({"Status": result.status, "Reason": result.reason, "Time": round(result.stats.elapsed, 4),
+                    "Satisfied": None if result.satisfied is None else round(result.satisfied / formula.numClauses, 6)})
+    except MemoryError:
+        row.update({"Status": "MEMORY", "Reason": "memory"})
+    row["Peak Memory (MB)"] = round(peak_memory() / 2 ** 20, 1)
+    results.put(row)
+
+# Run engine on the instance at path in a fresh process, killed GRACE seconds past the time limit
+def run_scaling_job(path, engine, seed, timeLimit, memoryLimit=None):
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    process = context.Process(target=scaling_worker, daemon=True,
+                              args=(path, engine, seed, timeLimit, memoryLimit, results))
+    startTime = time.perf_counter()
+    process.start()
+    try:
+        row = results.get(timeout=timeLimit + GRACE)
+    except queue.Empty:
+        row = {"Status": "KILLED" if process.is_alive() else "CRASHED",
+               "Reason": "time" if process.is_alive() else f"exit code {process.exitcode}",
+               "Time": round(time.perf_counter() - startTime, 4)}
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        results.close()
+    return row
+
+# Every (size, ratio, instance, engine) run, smallest sizes first. Once an engine solves none of the instances of a
+# size at some ratio it is not run on the bigger sizes at that ratio, past that point it has stopped scaling
+def run_scaling(engines, kind, sizes, ratios, instances=2, timeLimit=60.0, memoryLimit=None, seed=0,
+                folder="Generated CNF Formulas", output="scaling.csv", resume=False, stopOnFailure=True):
+    rows = []
+    # Status of the runs a resumed CSV already has, they count towards the success of their size
+    previous = {job_key(row): row["Status"] for row in read_results(output)} if resume else {}
+    with ResultSink(output, SCALING_COLUMNS, resume=resume) as sink:
+        for ratio in ratios:
+            stopped = set()
+            for numVars in sorted(sizes):
+                paths = [generate_instance(folder, kind, numVars, ratio, seed=seed + i) for i in range(instances)]
+                for engine in engines:
+                    if engine in stopped:
+                        continue
+                    solved = 0
+                    for i, path in enumerate(paths):
+                        row = {"Kind": kind, "Variables": numVars, "Ratio": ratio, "Clauses": round(numVars * ratio),
+                               "Algorithm": engine, "File": path,
+                               "Seed": job_seed(seed, i, f"{engine}:{numVars}:{ratio}", 0)}
+                        if sink.isDone(row):
+                            solved += previous.get(job_key(row)) in (SAT, UNSAT)
+                            continue
+                        row.update(run_scaling_job(path, engine, row["Seed"], timeLimit, memoryLimit))
+                        sink.write(row)
+                        rows.append(row)
+                        solved += row["Status"] in (SAT, UNSAT)
+                        print(f"  n={numVars:<8} ratio={ratio:<5g} {engine:14} {row['Status']:8} "
+                              f"{row.get('Time') or 0:9.3f}s {row.get('Peak Memory (MB)') or 0:9.1f} MB")
+                    if stopOnFailure and not solved:
+                        stopped.add(engine)
+    return rows
+
+def median(values):
+    values = sorted(values)
+    if not values:
+        return None
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+# Success rate, median solve time and largest peak memory of every (kind, ratio, engine, size), then the largest size
+# each engine still solved at least half of for each kind and ratio
+def summarize_scaling(rows):
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["Kind"], float(row["Ratio"]), row["Algorithm"], int(row["Variables"])), []).append(row)
+    print(f"{'Kind':10} {'Ratio':>6} {'Algorithm':14} {'Variables':>10} {'Runs':>5} {'Success':>8} {'Median (s)':>11} "
+          f"{'Peak MB':>9}")
+    scales = {}
+    for (kind, ratio, engine, numVars), group in sorted(groups.items()):
+        success = sum(row["Status"] in (SAT, UNSAT) for row in group) / len(group)
+        times = [float(row["Time"]) for row in group if row.get("Time") not in (None, "")]
+        memory = [float(row["Peak Memory (MB)"]) for row in group if row.get("Peak Memory (MB)") not in (None, "")]
+        middle = median(times)
+        print(f"{kind:10} {ratio:6g} {engine:14} {numVars:10} {len(group):5} {success:8.1%} "
+              f"{'' if middle is None else f'{middle:.3f}':>11} {max(memory) if memory else '':>9}")
+        if success >= 0.5:
+            scales[(kind, ratio, engine)] = max(scales.get((kind, ratio, engine), 0), numVars)
+    for (kind, ratio, engine), numVars in sorted(scales.items()):
+        print(f"{engine} solves half or more of the {kind} instances at ratio {ratio:g} up to {numVars} variables")
+    return scales
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep instance size and ratio for each engine: time, memory, success rate")
+    parser.add_argument("--engines", nargs="+", choices=ANYTIME_ENGINES, default=["cdcl", "walksat", "probsat"])
+    parser.add_argument("--kind", choices=KINDS, default="planted", help="instance kind (default: planted)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000],
+                        help="variable counts (default: 1000 10000 100000)")
+    parser.add_argument("--ratios", nargs="+", type=float, default=[3.0, 4.2],
+                        help="clause/variable ratios (default: 3.0 4.2)")
+    parser.add_argument("--instances", type=int, default=2, help="instances of each size and ratio (default: 2)")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="budget of each run in seconds (default: 60)")
+    parser.add_argument("--memory-limit", type=int, metavar="MB", help="memory budget of each run")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first instance, and base of the run seeds")
+    parser.add_argument("--folder", default="Generated CNF Formulas",
+                        help="where the instances are written, existing ones are reused (default: Generated CNF Formulas)")
+    parser.add_argument("--output", default="scaling.csv", help="CSV every run is appended to (default: scaling.csv)")
+    parser.add_argument("--resume", action="store_true", help="keep the rows in --output and skip the runs they cover")
+    parser.add_argument("--keep-going", action="store_true",
+                        help="also run an engine on the sizes after one where it solved nothing")
+    args = parser.parse_args(argv)
+
+    print(f"Scaling {', '.join(args.engines)} on {args.kind} instances, sizes {args.sizes}, ratios {args.ratios}")
+    run_scaling(args.engines, args.kind, args.sizes, args.ratios, args.instances, args.time_limit,
+                None if args.memory_limit is None else args.memory_limit * 2 ** 20, args.seed, args.folder,
+                args.output, args.resume, not args.keep_going)
+    summarize_scaling(read_results(args.output))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+'''
+    Desc: Persistent cache of solve results (verdict, model, engine, solve time) in SQLite, so a formula that was
+          solved before is answered from disk. Every entry is stored under two keys: a digest of the formula exactly
+          as read (microseconds to compute) and a canonical fingerprint of its clause set that ignores clause order,
+          literal order, duplicates and, optionally, variable renaming. Models are checked against the formula on
+          every hit and the least recently used entries are dropped past maxEntries
+'''
+import hashlib
+import sqlite3
+import time
+
+SAT = "SAT"
+UNSAT = "UNSAT"
+
+# Digest of the formula as read, same clauses in the same order give the same key
+def exact_fingerprint(formula):
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(b"%d %d " % (formula.numVars, formula.numClauses))
+    digest.update(memoryview(formula.literals).cast("B"))
+    digest.update(memoryview(formula.offsets).cast("B"))
+    return "x:" + digest.hexdigest()
+
+# Rank of each value among the distinct values, equal values get equal ranks
+def rank(values):
+    ranks = {value: r for r, value in enumerate(sorted(set(values)))}
+    return [ranks[value] for value in values]
+
+# Variable order that does not depend on the variable names: colour refinement on the clause/variable graph, every
+# variable is coloured by the colours of the clauses it is in (with its sign there) and every clause by the colours
+# of its variables, until the number of colours stops growing. Variables that still share a colour keep their
+# relative order, then a renamed copy may get a different order, which only costs a cache miss.
+# Returns newVar with newVar[var] the canonical number of var (newVar[0] unused)
+def canonical_order(numVars, clauses, rounds=8):
+    occurrences = [[] for var in range(numVars + 1)]
+    for index, clause in enumerate(clauses):
+        for lit in clause:
+            occurrences[abs(lit)].append((index, lit > 0))
+    colour = rank([(sum(s for _, s in occ), len(occ)) for occ in occurrences])
+    distinct = len(set(colour))
+    for i in range(rounds):
+        clauseColour = rank([tuple(sorted((colour[abs(lit)], lit > 0) for lit in clause)) for clause in clauses])
+        colour = rank([(colour[var], tuple(sorted((clauseColour[index], sign) for index, sign in occurrences[var])))
+                       for var in range(numVars + 1)])
+        count = len(set(colour))
+        if count == distinct or count == numVars + 1:
+            break
+        distinct = count
+    order = sorted(range(1, numVars + 1), key=lambda var: (colour[var], var))
+    newVar = [0] * (numVars + 1)
+    for position, var in enumerate(order):
+        newVar[var] = position + 1
+    return newVar
+
+# Fingerprint of the clause set after renaming with newVar (None keeps the names), order and duplicates do not matter
+def clause_set_fingerprint(numVars, clauses, newVar=None):
+    canonical = set()
+    for clause in clauses:
+        if newVar is not None:
+            clause = [newVar[lit] if lit > 0 else -newVar[-lit] for lit in clause]
+        canonical.add(tuple(sorted(set(clause))))
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(b"%d " % numVars)
+    for clause in sorted(canonical):
+        digest.update(b" ".join(b"%d" % lit for lit in clause) + b" 0 ")
+    return ("r:" if newVar is not None else "c:") + digest.hexdigest()
+
+# True when the model ({var: bool}) satisfies every clause, i.e. no clause is disjoint from its true literals
+def satisfies(clauses, model):
+    true = {var if val else -var for var, val in model.items()}
+    return not any(map(true.isdisjoint, clauses))
+
+def model_string(model, numVars, newVar=None):
+    bits = ["0"] * numVars
+    for var, val in model.items():
+        if val and 0 < var <= numVars:
+            bits[(newVar[var] if newVar else var) - 1] = "1"
+    return "".join(bits)
+
+'''
+SolveCache Class:
+    path: SQLite file, created on first use
+    maxEntries: Entries kept (each formula takes one per key), the least recently used go first
+    renaming: Also match formulas that only differ in variable names (costs a few refinement passes per lookup)
+    hits, misses, rejected: Lookups answered, not answered, and entries whose model did not check out (they are deleted)
+'''
+class SolveCache:
+    def __init__(self, path=".solvecache.sqlite", maxEntries=10000, renaming=True):
+        self.path = path
+        self.maxEntries = maxEntries
+        self.renaming = renaming
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.db = sqlite3.connect(path)
+        # WAL without a sync on every commit keeps a hit (one select and one update) in the tens of microseconds
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, verdict TEXT, model TEXT, "
+                        "engine TEXT, seconds REAL, numVars INTEGER, numClauses INTEGER, lastUsed REAL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_lastUsed ON results (lastUsed)")
+        self.db.commit()
+
+    # Keys of formula, exact first, each with the renaming that maps its variables to the key's numbering
+    def keys(self, formula, exact=None):
+        yield exact or exact_fingerprint(formula), None
+        clauses = [list(clause) for clause in formula.clausesOriginal]
+        if self.renaming:
+            newVar = canonical_order(formula.numVars, clauses)
+            yield clause_set_fingerprint(formula.numVars, clauses, newVar), newVar
+        else:
+            yield clause_set_fingerprint(formula.numVars, clauses), None
+
+    # (isSat, model, engine, seconds) of a cached result for formula, None on a miss.
+    # Models are checked against formula first, UNSAT answers are trusted since the key covers the whole clause set
+    def lookup(self, formula):
+        exact = exact_fingerprint(formula)
+        for key, newVar in self.keys(formula, exact):
+            row = self.db.execute("SELECT verdict, model, engine, seconds FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                continue
+            verdict, bits, engine, seconds = row
+            model = None
+            if verdict == SAT:
+                if len(bits) == formula.numVars:
+                    model = {var: bits[(newVar[var] if newVar else var) - 1] == "1" for var in range(1, formula.numVars + 1)}
+                if model is None or not satisfies(formula.clausesOriginal, model):
+                    self.rejected += 1
+                    self.db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self.db.commit()
+                    continue
+            self.db.execute("UPDATE results SET lastUsed = ? WHERE key = ?", (time.time(), key))
+            if key != exact:
+                # Found through the clause set, the exact key answers next time
+                self.put(exact, verdict, model_string(model, formula.numVars) if model else None, engine, seconds, formula)
+            self.db.commit()
+            self.hits += 1
+            return verdict == SAT, model, engine, seconds
+        self.misses += 1
+        return None
+
+    # Remember a definite answer, isSat True needs a model ({var: bool}) that satisfies formula
+    def store(self, formula, isSat, model, engine, seconds):
+        if isSat and not satisfies(formula.clausesOriginal, model):
+            raise ValueError("refusing to cache a model that does not satisfy the formula")
+        for key, newVar in self.keys(formula):
+            self.put(key, SAT if isSat else UNSAT, model_string(model, formula.numVars, newVar) if isSat else None,
+                     engine, seconds, formula)
+        self.evict()
+        self.db.commit()
+
+    def put(self, key, verdict, bits, engine, seconds, formula):
+        self.db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (key, verdict, bits, engine, seconds, formula.numVars, formula.numClauses, time.time()))
+
+    # Drop the least recently used entries past maxEntries
+    def evict(self):
+        count = self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        if count > self.maxEntries:
+            self.db.execute("DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY lastUsed LIMIT ?)",
+                            (count - self.maxEntries,))
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+    def report(self):
+        return f"Solve cache {self.path}: {self.hits} hits, {self.misses} misses, {self.rejected} rejected, {len(self)} entries"
@@ -0,0 +1,145 @@
+'''
+    Desc: Statistics every engine fills in when it is handed a SolverStats (decisions, propagations, conflicts,
+          flips, fitness evaluations...), optional progress callbacks, and an opt-in cProfile/tracemalloc wrapper.
+          Engines count in local variables and only touch the object at the end, so passing none costs nothing
+'''
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+
+# Extra columns of the results CSV, in order
+STATS_COLUMNS = ["Decisions", "Propagations", "Conflicts", "Backtracks", "Max Depth", "Restarts", "Components", "Nodes/s",
+                 "Flips", "Flips/s", "Evaluations", "Generations", "Best Fitness", "Peak Memory (KB)"]
+
+'''
+SolverStats Class:
+    engine: Name of the engine that filled it in
+    elapsed: Seconds between start and stop (or up to the last progress report while running)
+    decisions, propagations, conflicts, backtracks, maxDepth, restarts: Complete solvers (dpll, cdcl)
+    components: Nodes where dpll split the remaining clauses into independent components
+    flips, tries: Local search
+    evaluations, generations, bestFitness: Genetic algorithms, bestFitness has the best clause count of each generation
+    peakMemory, profile: Filled in by Instrument (bytes, and the top of the cProfile report)
+    progress: Called with the stats about every interval seconds while the engine runs, None for no reports
+'''
+class SolverStats:
+    def __init__(self, engine="", progress=None, interval=1.0):
+        self.engine = engine
+        self.elapsed = 0.0
+        self.decisions = 0
+        self.propagations = 0
+        self.conflicts = 0
+        self.backtracks = 0
+        self.maxDepth = 0
+        self.restarts = 0
+        self.components = 0
+        self.flips = 0
+        self.tries = 0
+        self.evaluations = 0
+        self.generations = 0
+        self.bestFitness = []
+        self.peakMemory = None
+        self.profile = None
+        self.progress = progress
+        self.interval = interval
+        self.startTime = None
+        self.nextReport = None
+        self.ticks = 0
+
+    def start(self, engine=None):
+        if engine is not None:
+            self.engine = engine
+        self.startTime = time.perf_counter()
+        self.nextReport = self.startTime + self.interval
+
+    def stop(self):
+        if self.startTime is not None:
+            self.elapsed = time.perf_counter() - self.startTime
+
+    # Called by the engines once per decision / flip / generation, the clock is only read every 64 ticks.
+    # Counters the engine keeps in locals are passed in so the report is current
+    def tick(self, **counters):
+        if self.progress is None:
+            return
+        self.ticks += 1
+        if self.ticks & 63:
+            return
+        now = time.perf_counter()
+        if now < self.nextReport:
+            return
+        for name, value in counters.items():
+            setattr(self, name, value)
+        self.elapsed = now - self.startTime
+        self.nextReport = now + self.interval
+        self.progress(self)
+
+    def rate(self, count):
+        return count / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def nodesPerSecond(self):
+        return self.rate(self.decisions)
+
+    @property
+    def flipsPerSecond(self):
+        return self.rate(self.flips)
+
+    # The STATS_COLUMNS of one results CSV row
+    def row(self):
+        return {
+            "Decisions": self.decisions,
+            "Propagations": self.propagations,
+            "Conflicts": self.conflicts,
+            "Backtracks": self.backtracks,
+            "Max Depth": self.maxDepth,
+            "Restarts": self.restarts,
+            "Components": self.components,
+            "Nodes/s": round(self.nodesPerSecond, 1),
+            "Flips": self.flips,
+            "Flips/s": round(self.flipsPerSecond, 1),
+            "Evaluations": self.evaluations,
+            "Generations": self.generations,
+            "Best Fitness": self.bestFitness[-1] if self.bestFitness else None,
+            "Peak Memory (KB)": None if self.peakMemory is None else round(self.peakMemory / 1024, 1),
+        }
+
+    def __str__(self):
+        parts = [f"{name.lower()} {value}" for name, value in self.row().items() if value]
+        return f"{self.engine} {self.elapsed:.3f}s: " + ", ".join(parts)
+
+'''
+Instrument Class:
+    Context manager around a solve that profiles it with cProfile and/or tracks its peak memory with tracemalloc
+    and stores the results on stats (profile text with the top entries by cumulative time, peakMemory in bytes),
+    does nothing when stats is None
+'''
+class Instrument:
+    def __init__(self, stats, profile=False, memory=False, top=15):
+        self.stats = stats
+        # Nothing to store the results on, nothing to measure
+        self.profile = profile and stats is not None
+        self.memory = memory and stats is not None
+        self.top = top
+        self.profiler = None
+
+    def __enter__(self):
+        if self.memory:
+            tracemalloc.start()
+        if self.profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self.stats
+
+    def __exit__(self, excType, exc, tb):
+        if self.profiler is not None:
+            self.profiler.disable()
+            text = io.StringIO()
+            pstats.Stats(self.profiler, stream=text).sort_stats("cumulative").print_stats(self.top)
+            self.stats.profile = text.getvalue()
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.stats.peakMemory = peak
+        return False
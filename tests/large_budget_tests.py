@@ -0,0 +1,120 @@
+import os
+import random
+import tempfile
+import time
+import sys
+sys.path.append(".")
+sys.path.append("tests")
+from SATClass import File
+from budget import Budget, anytime_solve, SAT, UNKNOWN
+from parallel import run_job, portfolio_solve, LOCAL, GENETIC
+from generators import generate_planted_cnf
+from large_cdcl_tests import verify_model
+
+ENGINES = ["dpll", "cdcl", "greedy", "walksat", "probsat", "genetic"]
+
+def run_time_budget_tests(n, m, limit=0.5, slack=0.25, seed=0):
+    """
+    A planted formula too big for the complete engines in the time limit: every engine has to come back within
+    limit + slack seconds, a SAT answer has to be a model and an UNKNOWN one has to say why it stopped.
+    """
+    print(f"Running time budget tests (n={n}, m={m}, limit={limit}s).")
+    clauses, planted = generate_planted_cnf(n, m, seed=seed)
+    formula = File.fromClauses("planted", n, clauses)
+    for engine in ENGINES:
+        random.seed(seed)
+        t0 = time.perf_counter()
+        result = anytime_solve(formula, engine, Budget(time=limit))
+        elapsed = time.perf_counter() - t0
+        if elapsed > limit + slack:
+            print(f"[FAIL-TIME] {engine} -> took {elapsed:.3f}s with a {limit}s budget")
+        elif result.status == SAT and not verify_model(clauses, result.assignment)[0]:
+            print(f"[FAIL-ASSIGN] {engine} -> SAT but the assignment is not a model")
+        elif result.status == UNKNOWN and result.reason is None:
+            print(f"[FAIL-REASON] {engine} -> UNKNOWN without a reason")
+        else:
+            print(f"[OK] {result} wall={elapsed:.3f}s")
+    print("Time budget tests done.\n")
+
+def run_counter_budget_tests(n, m, seed=1):
+    """Decision, flip and generation budgets are never overrun."""
+    print("Running decision / flip / generation budget tests.")
+    clauses, planted = generate_planted_cnf(n, m, seed=seed)
+    formula = File.fromClauses("planted", n, clauses)
+    checks = [("dpll", Budget(decisions=25), "decisions", 25), ("cdcl", Budget(decisions=25), "decisions", 25),
+              ("walksat", Budget(flips=300), "flips", 300), ("probsat", Budget(flips=300), "flips", 300),
+              ("genetic", Budget(generations=4), "generations", 4)]
+    for engine, budget, counter, limit in checks:
+        random.seed(seed)
+        result = anytime_solve(formula, engine, budget)
+        used = getattr(result.stats, counter)
+        if used > limit:
+            print(f"[FAIL-BUDGET] {engine} -> {used} {counter} with a budget of {limit}")
+        elif result.status == UNKNOWN and result.reason != counter:
+            print(f"[FAIL-REASON] {engine} -> stopped for {result.reason}, expected {counter}")
+        else:
+            print(f"[OK] {engine} -> {used}/{limit} {counter}, {result.status}")
+    print("Counter budget tests done.\n")
+
+def run_process_budget_tests(n, m, limit=0.5, slack=1.0, seed=2):
+    """
+    The limits reach the engines that run in other processes as well: every --workers job (run_job) comes back
+    within limit + slack seconds, and a portfolio of incomplete engines on a formula they cannot satisfy stops on its
+    time limit, a dpll one on its decision limit.
+    """
+    print(f"Running worker and portfolio budget tests (n={n}, m={m}, limit={limit}s).")
+    clauses, planted = generate_planted_cnf(n, m, seed=seed)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "planted.cnf")
+        with open(path, "w") as f:
+            f.write(f"p cnf {n} {m}\n" + "".join(" ".join(map(str, clause)) + " 0\n" for clause in clauses))
+        for algorithm, complete in ((LOCAL, "dpll"), (GENETIC, "dpll"), ("DPLL", "dpll"), ("CDCL", "cdcl")):
+            options = {"complete": complete, "local": "walksat", "genetic": "python", "heuristic": "maxocc",
+                       "preprocess": False, "stats": True, "limits": (limit, None, None, None, None)}
+            t0 = time.perf_counter()
+            run_job(path, algorithm, seed, None, options)
+            elapsed = time.perf_counter() - t0
+            if elapsed > limit + slack:
+                print(f"[FAIL-TIME] run_job {algorithm} -> took {elapsed:.3f}s with a {limit}s budget")
+            else:
+                print(f"[OK] run_job {algorithm} -> {elapsed:.3f}s")
+
+    rng = random.Random(seed)
+    unsat = File.fromClauses("unsat", 40, [[v if rng.random() < 0.5 else -v for v in rng.sample(range(1, 41), 3)]
+                                           for _ in range(200)])
+    for engines, limits, reason in ((("walksat", "genetic"), (limit, None, None, None, None), "time"),
+                                    (("dpll",), (None, 3, None, None, None), "decisions")):
+        isSat, assignment, winner, elapsed = portfolio_solve(unsat, engines, None, seed, limits=limits)
+        if isSat is not None or elapsed > limit + slack:
+            print(f"[FAIL] portfolio {engines} -> {isSat} by {winner} in {elapsed:.3f}s, expected out of {reason}")
+        else:
+            print(f"[OK] portfolio {engines} -> UNKNOWN, out of {reason} in {elapsed:.3f}s")
+    print("Worker and portfolio budget tests done.\n")
+
+def run_unlimited_tests(sizes, trials=3, seed_base=100):
+    """Without a budget the complete engines still answer, and agree with each other."""
+    print("Running unlimited budget agreement tests.")
+    for n in sizes:
+        for t in range(trials):
+            random.seed(seed_base + n + t)
+            clauses = [[v if random.random() < 0.5 else -v for v in random.sample(range(1, n + 1), 3)]
+                       for _ in range(int(n * 4.26))]
+            formula = File.fromClauses("random", n, clauses)
+            results = [anytime_solve(formula, engine) for engine in ("dpll", "cdcl")]
+            statuses = [result.status for result in results]
+            if UNKNOWN in statuses or statuses[0] != statuses[1]:
+                print(f"[DISAGREE] n={n} trial={t} -> dpll={statuses[0]} cdcl={statuses[1]}")
+            elif statuses[0] == SAT and not all(verify_model(clauses, result.assignment)[0] for result in results):
+                print(f"[FAIL-ASSIGN] n={n} trial={t} -> a model does not satisfy the formula")
+            else:
+                print(f"[OK] n={n} trial={t} -> {statuses[0]}")
+    print("Unlimited budget tests done.\n")
+
+if __name__ == "__main__":
+    try:
+        run_time_budget_tests(3000, 12600)
+        run_counter_budget_tests(500, 2100)
+        run_process_budget_tests(3000, 12600)
+        run_unlimited_tests([30, 60], trials=3)
+    except KeyboardInterrupt:
+        print("Interrupted by user.")
@@ -0,0 +1,90 @@
+import random
+import time
+import sys
+sys.path.append(".")
+sys.path.append("tests")
+from SATClass import dpll
+from dpll import cdcl
+from generators import generate_planted_cnf, generate_unit_heavy_cnf
+from large_dpll_tests import verify_with_planted
+
+def verify_model(clauses, assign):
+    """
+    Check that a full CDCL model satisfies every clause.
+    Returns (ok, failed_clause).
+    """
+    for clause in clauses:
+        if not any((lit > 0 and assign.get(abs(lit))) or (lit < 0 and assign.get(abs(lit)) is False) for lit in clause):
+            return False, clause
+    return True, None
+
+def run_planted_tests(sizes, clauses_per_var_ratio=4.2, k=3, trials=3, seed_base=0):
+    print("Running planted-solution CDCL tests (known satisfiable).")
+    for n in sizes:
+        m = max(1, int(n * clauses_per_var_ratio))
+        for t in range(trials):
+            clauses, planted = generate_planted_cnf(n, m, k=k, seed=seed_base + n + t)
+            t0 = time.time()
+            sat, assign = cdcl([list(c) for c in clauses], {})
+            t1 = time.time()
+            if not sat:
+                print(f"[FAIL] n={n} m={m} trial={t} -> cdcl returned UNSAT (expected SAT). time={t1-t0:.3f}s")
+                continue
+            ok, fail_clause = verify_model(clauses, assign)
+            if not ok:
+                print(f"[FAIL-ASSIGN] n={n} m={m} trial={t} -> cdcl model does not satisfy {fail_clause}")
+            else:
+                print(f"[OK] n={n} m={m} trial={t} -> SAT verified. time={t1-t0:.3f}s")
+    print("Planted CDCL tests done.\n")
+
+def run_unit_heavy_tests(sizes, num_units_fraction=0.5, extra_clauses=200, trials=2, seed_base=1000):
+    print("Running unit-heavy CDCL tests (many forced assignments).")
+    for n in sizes:
+        num_units = int(n * num_units_fraction)
+        for t in range(trials):
+            clauses, planted = generate_unit_heavy_cnf(n, num_units, extra_clauses, seed=seed_base + n + t)
+            sat, assign = cdcl([list(c) for c in clauses], {})
+            if not sat:
+                print(f"[FAIL-UNIT] n={n} units={num_units} trial={t} -> cdcl returned UNSAT (expected SAT).")
+                continue
+            ok, fail_idx, fail_clause = verify_with_planted(clauses, assign, planted)
+            if not ok:
+                print(f"[FAIL-ASSIGN-UNIT] n={n} units={num_units} trial={t} -> invalid for clause {fail_idx}: {fail_clause}")
+            else:
+                print(f"[OK-UNIT] n={n} units={num_units} trial={t} SAT verified.")
+    print("Unit-heavy CDCL tests done.\n")
+
+def run_agreement_tests(sizes, density_factors, trials=3, seed_base=2000):
+    """
+    Random 3-CNFs around the threshold: cdcl and dpll have to agree on SAT/UNSAT.
+    """
+    print("Running CDCL vs DPLL agreement tests.")
+    for n in sizes:
+        for dens in density_factors:
+            m = max(1, int(n * dens))
+            for t in range(trials):
+                random.seed(seed_base + n + t)
+                clauses = []
+                for _ in range(m):
+                    vs = random.sample(range(1, n+1), min(3, n))
+                    clauses.append([v if random.choice([True, False]) else -v for v in vs])
+                t0 = time.time()
+                sat_cdcl, assign = cdcl([list(c) for c in clauses], {})
+                t1 = time.time()
+                sat_dpll, _ = dpll([list(c) for c in clauses], {})
+                t2 = time.time()
+                if sat_cdcl != sat_dpll:
+                    print(f"[DISAGREE] n={n} m={m} trial={t} -> cdcl={sat_cdcl} dpll={sat_dpll}")
+                elif sat_cdcl and not verify_model(clauses, assign)[0]:
+                    print(f"[FAIL-ASSIGN] n={n} m={m} trial={t} -> cdcl model does not satisfy the formula")
+                else:
+                    print(f"[OK] n={n} m={m} dens={dens:.2f} trial={t} -> {'SAT' if sat_cdcl else 'UNSAT'} cdcl={t1-t0:.3f}s dpll={t2-t1:.3f}s")
+    print("Agreement tests done.\n")
+
+if __name__ == "__main__":
+    try:
+        run_planted_tests([20, 50, 100, 200], trials=3)
+        run_unit_heavy_tests([50, 100, 200], num_units_fraction=0.6)
+        run_agreement_tests([50, 100], density_factors=[3.0, 4.26, 5.0], trials=3)
+    except KeyboardInterrupt:
+        print("Interrupted by user.")
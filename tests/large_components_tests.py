@@ -0,0 +1,70 @@
+import time
+import sys
+sys.path.append(".")
+sys.path.append("tests")
+from SATClass import dpll, splitComponents
+from generators import generate_disjoint_cnf, generate_bridged_cnf
+from stats import SolverStats
+from large_cdcl_tests import verify_model
+
+def run_split_tests(seed=0):
+    """splitComponents keeps every clause exactly once and never puts a shared variable in two groups."""
+    print("Running component split tests.")
+    clauses, numVars = generate_disjoint_cnf(5, 20, 60, seed)
+    groups = splitComponents(clauses)
+    seen = [set(abs(lit) for clause in group for lit in clause) for group in groups]
+    if sorted(map(tuple, clauses)) != sorted(tuple(clause) for group in groups for clause in group):
+        print("[FAIL] clauses lost or duplicated by the split")
+    elif any(seen[i] & seen[j] for i in range(len(seen)) for j in range(i)):
+        print("[FAIL] two components share a variable")
+    else:
+        print(f"[OK] {len(clauses)} clauses -> {len(groups)} components of sizes {[len(group) for group in groups]}")
+    print("Split tests done.\n")
+
+def run_agreement_tests(configs, trials=5, seed_base=0):
+    """dpll with and without components agrees on the verdict, models satisfy the formula, and the node counts are kept."""
+    print("Running component agreement tests against plain dpll.")
+    for name, generate in configs:
+        nodesPlain = nodesSplit = 0
+        ok = True
+        for t in range(trials):
+            clauses, numVars = generate(seed_base + t)
+            plain, split = SolverStats(), SolverStats()
+            expected, _ = dpll(clauses, {}, stats=plain)
+            result, model = dpll(clauses, {}, stats=split, components=True)
+            nodesPlain += plain.decisions
+            nodesSplit += split.decisions
+            if result != expected:
+                print(f"[DISAGREE] {name} trial={t} -> components={result} plain={expected}")
+                ok = False
+            elif result and not verify_model(clauses, model)[0]:
+                print(f"[FAIL-ASSIGN] {name} trial={t} -> combined model does not satisfy the formula")
+                ok = False
+        if ok:
+            print(f"[OK] {name} -> {trials} formulas agree, nodes {nodesPlain} plain vs {nodesSplit} with components")
+    print("Agreement tests done.\n")
+
+def run_timing(parts, n, m, seed=0):
+    """Disjoint parts with an UNSAT one: plain dpll retries it under every assignment of the others."""
+    print(f"Timing {parts} disjoint parts of {n} variables / {m} clauses.")
+    clauses, numVars = generate_disjoint_cnf(parts, n, m, seed)
+    for components in (False, True):
+        stats = SolverStats()
+        t0 = time.perf_counter()
+        isSat, model = dpll(clauses, {}, stats=stats, components=components)
+        print(f"[OK] components={components} -> {'SAT' if isSat else 'UNSAT'} in {time.perf_counter() - t0:.3f}s, "
+              f"{stats.decisions} nodes, {stats.components} splits")
+    print("Timing done.\n")
+
+if __name__ == "__main__":
+    try:
+        run_split_tests()
+        run_agreement_tests([
+            ("disjoint 4x20", lambda seed: generate_disjoint_cnf(4, 20, 85, seed)),
+            ("disjoint 3x30", lambda seed: generate_disjoint_cnf(3, 30, 128, seed)),
+            ("bridged 4x20", lambda seed: generate_bridged_cnf(4, 20, 80, 4, seed)),
+            ("random 50", lambda seed: generate_disjoint_cnf(1, 50, 213, seed)),
+        ])
+        run_timing(4, 30, 128)
+    except KeyboardInterrupt:
+        print("Interrupted by user.")
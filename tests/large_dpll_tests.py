@@ -3,60 +3,7 @@ import time
 import sys
 sys.path.append(".")
 from SATClass import dpll
-
-def generate_planted_cnf(num_vars, num_clauses, k=3, seed=None):
-    """
-    Generate k-SAT clauses guaranteed to be satisfied by a random planted assignment.
-    Returns (clauses, planted_assignment_dict).
-    """
-    if seed is not None:
-        random.seed(seed)
-    planted = {i: random.choice([False, True]) for i in range(1, num_vars+1)}
-    clauses = []
-    vars_range = list(range(1, num_vars+1))
-    for _ in range(num_clauses):
-        clause_vars = random.sample(vars_range, min(k, num_vars))
-        lits = []
-        for v in clause_vars:
-            # choose sign randomly; we'll fix later to ensure clause satisfied by planted
-            sign = random.choice([1, -1])
-            lits.append(sign * v)
-        # ensure at least one literal satisfied by planted
-        if not any(((lit > 0 and planted[abs(lit)]) or (lit < 0 and not planted[abs(lit)])) for lit in lits):
-            v = random.choice(clause_vars)
-            # set sign to satisfy planted[v]
-            lits = [lit for lit in lits if abs(lit) != v]  # remove any existing same var
-            lits.append(v if planted[v] else -v)
-        clauses.append(lits)
-    return clauses, planted
-
-def generate_unit_heavy_cnf(num_vars, num_units, extra_clauses, seed=None):
-    """
-    Create a formula that forces many variables via unit clauses (consistent),
-    then add some additional clauses satisfied by the forced assignment.
-    """
-    if seed is not None:
-        random.seed(seed)
-    planted = {i: random.choice([False, True]) for i in range(1, num_vars+1)}
-    clauses = []
-    forced_vars = random.sample(list(planted.keys()), min(num_units, num_vars))
-    for v in forced_vars:
-        clauses.append([v if planted[v] else -v])  # unit clause
-    # extra clauses that are satisfied by planted assignment
-    for _ in range(extra_clauses):
-        k = random.randint(2, 4)
-        clause_vars = random.sample(list(planted.keys()), min(k, num_vars))
-        lits = []
-        for v in clause_vars:
-            sign = random.choice([1, -1])
-            lits.append(sign * v)
-        # guarantee satisfaction by planted
-        if not any(((lit > 0 and planted[abs(lit)]) or (lit < 0 and not planted[abs(lit)])) for lit in lits):
-            v = random.choice(clause_vars)
-            lits = [lit for lit in lits if abs(lit) != v]
-            lits.append(v if planted[v] else -v)
-        clauses.append(lits)
-    return clauses, planted
+from generators import generate_planted_cnf, generate_unit_heavy_cnf
 
 def verify_with_planted(clauses, dpll_assignment, planted):
     """
@@ -171,7 +118,7 @@ def run_random_density_tests(sizes, density_factors, trials=3, seed_base=2000):
     print("Random density tests done.\n")
 
 if __name__ == "__main__":
-    # sizes and parameters  tune up to your machine limits.
+    # sizes and parameters - tune up to your machine limits.
     planted_sizes = [20, 50, 100, 200]   # variable counts
     unit_sizes = [50, 100, 200]
     random_sizes = [50, 100]
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import tempfile
+import time
+import sys
+sys.path.append(".")
+sys.path.append("tests")
+from dimacs import read_dimacs
+from generators import generate_instance, instance_clauses, KINDS
+from scaling import run_scaling, summarize_scaling, peak_memory
+from results import read_results
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+def run_generator_tests(sizes, ratio=4.2):
+    """Every kind reads back with the header's counts, the same seed writes the same file, another seed another one,
+    and the planted kinds are satisfied by their planted assignment."""
+    print("Running generator tests.")
+    with tempfile.TemporaryDirectory() as folder:
+        for kind in KINDS:
+            for n in sizes:
+                path = generate_instance(folder, kind, n, ratio, seed=1)
+                formula = read_dimacs(path)
+                first = file_digest(path)
+                again = file_digest(generate_instance(folder, kind, n, ratio, seed=1, overwrite=True))
+                other = file_digest(generate_instance(folder, kind, n, ratio, seed=2))
+                planted = bytearray()
+                numClauses, clauses = instance_clauses(kind, n, ratio, seed=1, planted=planted)
+                broken = sum(not any(planted[abs(lit)] == (lit > 0) for lit in clause) for clause in clauses) if planted else 0
+                if formula.numVars != n or formula.numClauses != round(n * ratio):
+                    print(f"[FAIL] {kind} n={n} -> read back {formula.numVars} vars / {formula.numClauses} clauses")
+                elif first != again or first == other:
+                    print(f"[FAIL-SEED] {kind} n={n} -> same seed differs or another seed matches")
+                elif broken:
+                    print(f"[FAIL-PLANTED] {kind} n={n} -> {broken} clauses falsified by the planted assignment")
+                else:
+                    print(f"[OK] {kind} n={n} -> {formula.numClauses} clauses, {os.path.getsize(path) / 1e6:.1f} MB")
+    print("Generator tests done.\n")
+
+def run_width_test():
+    """A clause width wider than the number of variables is refused instead of drawing clauses forever."""
+    print("Running clause width test.")
+    for kind, numVars, k in (("random", 2, 3), ("planted", 5, 6), ("random", 10, 0)):
+        try:
+            instance_clauses(kind, numVars, 4.2, k)
+            print(f"[FAIL] {kind} n={numVars} k={k} -> accepted")
+        except ValueError as e:
+            print(f"[OK] {kind} n={numVars} k={k} -> {e}")
+    print("Clause width test done.\n")
+
+def run_streaming_test(n=1000000, ratio=4.2):
+    """A million variable instance is written without holding its clauses: peak memory barely moves."""
+    print(f"Running streaming test (n={n}).")
+    with tempfile.TemporaryDirectory() as folder:
+        before = peak_memory()
+        t0 = time.perf_counter()
+        path = generate_instance(folder, "planted", n, ratio)
+        grown = (peak_memory() - before) / 2 ** 20
+        if grown > 50:
+            print(f"[FAIL] peak memory grew by {grown:.1f} MB while writing")
+        else:
+            print(f"[OK] {os.path.getsize(path) / 1e6:.0f} MB written in {time.perf_counter() - t0:.1f}s, "
+                  f"peak memory grew by {grown:.1f} MB")
+    print("Streaming test done.\n")
+
+def run_scaling_smoke_test():
+    """A small sweep writes one row per run, a resumed sweep runs nothing again."""
+    print("Running scaling sweep test.")
+    with tempfile.TemporaryDirectory() as folder:
+        output = os.path.join(folder, "scaling.csv")
+        rows = run_scaling(["cdcl", "walksat"], "planted", [200, 2000], [3.0], instances=2, timeLimit=10,
+                           folder=folder, output=output)
+        again = run_scaling(["cdcl", "walksat"], "planted", [200, 2000], [3.0], instances=2, timeLimit=10,
+                            folder=folder, output=output, resume=True)
+        if len(rows) != 8 or again or len(read_results(output)) != 8:
+            print(f"[FAIL] {len(rows)} runs, {len(again)} run again on resume")
+        else:
+            summarize_scaling(read_results(output))
+            print("[OK] 8 runs recorded, none repeated on resume")
+    print("Scaling sweep test done.\n")
+
+if __name__ == "__main__":
+    try:
+        run_generator_tests([100, 10000])
+        run_width_test()
+        run_streaming_test()
+        run_scaling_smoke_test()
+    except KeyboardInterrupt:
+        print("Interrupted by user.")
@@ -0,0 +1,92 @@
+import random
+import time
+import sys
+sys.path.append(".")
+sys.path.append("tests")
+from dpll import cdcl, IncrementalSolver
+from generators import generate_planted_cnf
+from large_cdcl_tests import verify_model
+
+def random_3cnf(n, m, rng):
+    return [[v if rng.random() < 0.5 else -v for v in rng.sample(range(1, n + 1), 3)] for _ in range(m)]
+
+def run_assumption_tests(sizes, density=4.0, queries=30, seed_base=0):
+    """
+    Many queries with random assumptions on one solver, each answer is checked against a fresh cdcl run on the
+    clauses plus the assumptions as units. A model has to satisfy both, a core has to be UNSAT on its own.
+    """
+    print("Running incremental assumption tests against fresh cdcl runs.")
+    for n in sizes:
+        rng = random.Random(seed_base + n)
+        clauses = random_3cnf(n, int(n * density), rng)
+        solver = IncrementalSolver(clauses)
+        failures = 0
+        sat = 0
+        for q in range(queries):
+            assumptions = [v if rng.random() < 0.5 else -v for v in rng.sample(range(1, n + 1), rng.randint(1, n // 4))]
+            result = solver.solve(assumptions)
+            expected, _ = cdcl(clauses + [[lit] for lit in assumptions], {})
+            if result != expected:
+                print(f"[DISAGREE] n={n} query={q} -> incremental={result} fresh={expected}")
+                failures += 1
+            elif result and not verify_model(clauses + [[lit] for lit in assumptions], solver.model)[0]:
+                print(f"[FAIL-ASSIGN] n={n} query={q} -> model breaks a clause or an assumption")
+                failures += 1
+            elif not result and (not set(solver.core) <= set(assumptions)
+                                 or cdcl(clauses + [[lit] for lit in solver.core], {})[0]):
+                print(f"[FAIL-CORE] n={n} query={q} -> core {solver.core} is not an UNSAT subset of the assumptions")
+                failures += 1
+            sat += bool(result)
+        if not failures:
+            print(f"[OK] n={n} -> {queries} queries agree ({sat} SAT), {len(solver.lbd)} learned clauses kept")
+    print("Assumption tests done.\n")
+
+def run_add_clause_tests(sizes, batches=8, seed_base=100):
+    """Clauses are added in batches until the formula turns UNSAT, after every batch the answer has to match a fresh run."""
+    print("Running incremental clause addition tests.")
+    for n in sizes:
+        rng = random.Random(seed_base + n)
+        clauses = random_3cnf(n, int(n * 3), rng)
+        solver = IncrementalSolver(clauses)
+        ok = True
+        for b in range(batches):
+            batch = random_3cnf(n + 5, n // 2, rng)  # a few new variables as well
+            for clause in batch:
+                solver.addClause(clause)
+            clauses += batch
+            result = solver.solve()
+            expected, _ = cdcl(clauses, {})
+            if result != expected or (result and not verify_model(clauses, solver.model)[0]):
+                print(f"[FAIL] n={n} batch={b} -> incremental={result} fresh={expected}")
+                ok = False
+                break
+        if ok:
+            print(f"[OK] n={n} -> {batches} batches, ended {'SAT' if result else 'UNSAT'} with {len(clauses)} clauses")
+    print("Clause addition tests done.\n")
+
+def run_repeated_query_timing(n, m, queries=50, seed=7):
+    """Repeated queries on one planted formula: one solver kept alive against a fresh solve for every query."""
+    print(f"Timing {queries} queries on a planted formula (n={n}, m={m}).")
+    clauses, planted = generate_planted_cnf(n, m, seed=seed)
+    rng = random.Random(seed)
+    queriesList = [[v if planted[v] else -v for v in rng.sample(range(1, n + 1), 5)] for _ in range(queries)]
+
+    t0 = time.perf_counter()
+    solver = IncrementalSolver(clauses)
+    incremental = [solver.solve(assumptions) for assumptions in queriesList]
+    t1 = time.perf_counter()
+    fresh = [cdcl(clauses + [[lit] for lit in assumptions], {})[0] for assumptions in queriesList]
+    t2 = time.perf_counter()
+    if incremental != fresh:
+        print("[DISAGREE] incremental and fresh answers differ")
+    else:
+        print(f"[OK] incremental {t1-t0:.3f}s ({solver.decisions} decisions in total), fresh {t2-t1:.3f}s")
+    print("Timing done.\n")
+
+if __name__ == "__main__":
+    try:
+        run_assumption_tests([20, 50, 100], queries=30)
+        run_add_clause_tests([30, 60, 100])
+        run_repeated_query_timing(200, 840, queries=20)
+    except KeyboardInterrupt:
+        print("Interrupted by user.")
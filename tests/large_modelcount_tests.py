@@ -0,0 +1,97 @@
+import glob
+import os
+import random
+import time
+import sys
+sys.path.append(".")
+sys.path.append("tests")
+from dimacs import read_dimacs
+from dpll import IncrementalSolver
+from modelcount import ModelCounter, count_models
+from generators import generate_disjoint_cnf
+
+def brute_force_count(clauses, n):
+    return sum(all(any(((bits >> (abs(lit) - 1)) & 1) == (lit > 0) for lit in clause) for clause in clauses)
+               for bits in range(1 << n))
+
+def blocking_count(clauses, numVars, limit=100000):
+    """Models found one at a time, each blocked by a clause before asking again (what counting took before)."""
+    solver = IncrementalSolver(clauses)
+    solver.growTo(numVars)
+    count = 0
+    while count < limit and solver.solve():
+        count += 1
+        solver.addClause([-var if solver.model.get(var, False) else var for var in range(1, numVars + 1)])
+    return count
+
+def run_brute_force_tests(trials=300, seed=0):
+    """Small random formulas (units, duplicate literals and tautologies included) against counting every assignment,
+    once with plenty of cache and once with a cache that keeps evicting."""
+    print("Running model count tests against brute force.")
+    rng = random.Random(seed)
+    failures = 0
+    for t in range(trials):
+        n = rng.randint(1, 12)
+        clauses = [[v if rng.random() < 0.5 else -v for v in (rng.randint(1, n) for _ in range(rng.randint(1, 3)))]
+                   for _ in range(rng.randint(0, int(n * 4.5)))]
+        expected = brute_force_count(clauses, n)
+        for cacheBytes in (1 << 30, 300):
+            count = ModelCounter(cacheBytes).count(clauses, n)
+            if count != expected:
+                print(f"[FAIL] trial={t} n={n} cache={cacheBytes} -> counted {count}, brute force {expected}")
+                failures += 1
+    if not failures:
+        print(f"[OK] {trials} formulas counted exactly, with and without room in the cache")
+    print("Brute force tests done.\n")
+
+def run_uf20_tests(folder="CNF Formulas", limit=10):
+    """uf20 counts against enumerating the models with blocking clauses."""
+    print("Running uf20 model count tests against blocking clause enumeration.")
+    for path in sorted(glob.glob(os.path.join(folder, "**", "uf20-*.cnf"), recursive=True))[:limit]:
+        formula = read_dimacs(path)
+        t0 = time.perf_counter()
+        count, counter = count_models(formula)
+        countTime = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        expected = blocking_count(formula.clausesOriginal, formula.numVars)
+        blockingTime = time.perf_counter() - t0
+        if count != expected:
+            print(f"[FAIL] {formula.fileN} -> counted {count}, enumerated {expected}")
+        else:
+            print(f"[OK] {os.path.basename(path)} -> {count} models in {countTime:.3f}s "
+                  f"(enumeration {blockingTime:.3f}s), {counter.hitRate:.1%} cache hits")
+    print("uf20 tests done.\n")
+
+def run_big_count_test(parts=12, n=20, m=60, seed=1):
+    """Disjoint parts multiply: the count goes far past 64 bits and has to equal the product of the parts' counts."""
+    print(f"Running arbitrary precision test ({parts} disjoint parts of {n} variables).")
+    clauses, numVars = generate_disjoint_cnf(parts, n, m, seed)
+    count = ModelCounter().count(clauses, numVars + 30)  # 30 variables in no clause double the count each
+    expected = 1 << 30
+    for p in range(parts):
+        part = [[lit - p * n if lit > 0 else lit + p * n for lit in clause] for clause in clauses
+                if p * n < abs(clause[0]) <= (p + 1) * n]
+        expected *= ModelCounter().count(part, n)
+    if count != expected:
+        print(f"[FAIL] counted {count}, product of the parts {expected}")
+    else:
+        print(f"[OK] {count} models ({count.bit_length()} bits)")
+    print("Arbitrary precision test done.\n")
+
+def run_hard_timing(folder="HARD CNF Formulas", limit=5, cacheBytes=64 * 1024 * 1024):
+    """Counting time, cache hit rate and cache memory on the 100 variable hard formulas."""
+    print("Timing model counts on hard formulas.")
+    for path in sorted(glob.glob(os.path.join(folder, "**", "*.cnf"), recursive=True))[:limit]:
+        t0 = time.perf_counter()
+        count, counter = count_models(read_dimacs(path), cacheBytes)
+        print(f"[OK] {os.path.basename(path)} -> {count} models in {time.perf_counter() - t0:.2f}s, {counter.report()}")
+    print("Timing done.\n")
+
+if __name__ == "__main__":
+    try:
+        run_brute_force_tests()
+        run_uf20_tests()
+        run_big_count_test()
+        run_hard_timing()
+    except KeyboardInterrupt:
+        print("Interrupted by user.")
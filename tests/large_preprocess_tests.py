@@ -0,0 +1,142 @@
+import os
+import random
+import tempfile
+import time
+import sys
+sys.path.append(".")
+sys.path.append("tests")
+from SATClass import File, dpll, LocalSearch, StochasticLocalSearch
+from preprocess import Preprocessor
+from parallel import run_job, LOCAL, GENETIC
+from results import read_results
+import SATSolver
+from generators import generate_planted_cnf, generate_unit_heavy_cnf
+from large_cdcl_tests import verify_model
+
+def solve_preprocessed(clauses, num_vars):
+    """
+    Preprocess, run dpll on the reduced formula and extend its model.
+    Returns (sat, model of the original formula or None, preprocessor).
+    """
+    preprocessor = Preprocessor(File.fromClauses("test", num_vars, clauses))
+    reduced = preprocessor.run()
+    sat, assign = dpll(reduced.clausesOriginal, {})
+    if sat:
+        assign = preprocessor.extend(assign)
+    return sat, assign, preprocessor
+
+def run_planted_tests(sizes, clauses_per_var_ratio=4.2, trials=3, seed_base=0):
+    print("Running planted-solution preprocessing tests (known satisfiable).")
+    for n in sizes:
+        m = max(1, int(n * clauses_per_var_ratio))
+        for t in range(trials):
+            clauses, planted = generate_planted_cnf(n, m, seed=seed_base + n + t)
+            t0 = time.time()
+            sat, assign, preprocessor = solve_preprocessed(clauses, n)
+            t1 = time.time()
+            if not sat:
+                print(f"[FAIL] n={n} m={m} trial={t} -> UNSAT after preprocessing (expected SAT).")
+                continue
+            ok, fail_clause = verify_model(clauses, assign)
+            if not ok:
+                print(f"[FAIL-ASSIGN] n={n} m={m} trial={t} -> extended model does not satisfy {fail_clause}")
+            else:
+                after = preprocessor.stats["after"]
+                print(f"[OK] n={n} m={m} trial={t} -> SAT verified, {after['clauses']} clauses left. time={t1-t0:.3f}s")
+    print("Planted preprocessing tests done.\n")
+
+def run_unit_heavy_tests(sizes, num_units_fraction=0.5, extra_clauses=200, trials=2, seed_base=1000):
+    print("Running unit-heavy preprocessing tests (units, pure literals and elimination do most of the work).")
+    for n in sizes:
+        num_units = int(n * num_units_fraction)
+        for t in range(trials):
+            clauses, planted = generate_unit_heavy_cnf(n, num_units, extra_clauses, seed=seed_base + n + t)
+            sat, assign, preprocessor = solve_preprocessed(clauses, n)
+            if not sat or not verify_model(clauses, assign)[0]:
+                print(f"[FAIL-UNIT] n={n} units={num_units} trial={t} -> no valid model after preprocessing.")
+            else:
+                print(f"[OK-UNIT] n={n} units={num_units} trial={t} -> {preprocessor.report()}")
+    print("Unit-heavy preprocessing tests done.\n")
+
+def run_agreement_tests(sizes, density_factors, trials=3, seed_base=2000):
+    """
+    Random 3-CNFs around the threshold (with duplicate and tautological clauses mixed in):
+    dpll has to give the same answer with and without preprocessing.
+    """
+    print("Running preprocessed vs plain DPLL agreement tests.")
+    for n in sizes:
+        for dens in density_factors:
+            m = max(1, int(n * dens))
+            for t in range(trials):
+                random.seed(seed_base + n + t)
+                clauses = []
+                for _ in range(m):
+                    vs = random.sample(range(1, n+1), min(3, n))
+                    clauses.append([v if random.choice([True, False]) else -v for v in vs])
+                clauses += [list(c) for c in random.sample(clauses, m // 20)]
+                clauses += [[v, -v, random.randint(1, n)] for v in random.sample(range(1, n+1), min(5, n))]
+                sat_pre, assign, _ = solve_preprocessed(clauses, n)
+                sat_dpll, _ = dpll([list(c) for c in clauses], {})
+                if sat_pre != sat_dpll:
+                    print(f"[DISAGREE] n={n} m={m} trial={t} -> preprocessed={sat_pre} dpll={sat_dpll}")
+                elif sat_pre and not verify_model(clauses, assign)[0]:
+                    print(f"[FAIL-ASSIGN] n={n} m={m} trial={t} -> extended model does not satisfy the formula")
+                else:
+                    print(f"[OK] n={n} m={m} dens={dens:.2f} trial={t} -> {'SAT' if sat_pre else 'UNSAT'}")
+    print("Agreement tests done.\n")
+
+def run_proved_unsat_tests():
+    """
+    A formula preprocessing proves UNSAT reduces to one empty clause: the local searches must not crash on it, and
+    SATSolver.main and run_job skip Local Search and GA on it and still record their rows.
+    """
+    print("Running tests on a formula preprocessing proves UNSAT.")
+    clauses = [[1, 2], [1, -2], [-1, 2], [-1, -2], [3, 1]]
+    preprocessor = Preprocessor(File.fromClauses("unsat", 3, clauses))
+    reduced = preprocessor.run()
+    if not preprocessor.isUnsat:
+        print("[FAIL] preprocessing did not prove the formula UNSAT")
+        return
+    for name, search in (("greedy", LocalSearch), ("walksat", lambda f: StochasticLocalSearch(f, "walksat")),
+                         ("probsat", lambda f: StochasticLocalSearch(f, "probsat"))):
+        best = search(reduced)
+        print(f"[OK] {name} on the reduced formula -> {preprocessor.extendString(best)}")
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.makedirs(os.path.join(folder, "CNF Formulas"))
+        os.makedirs(os.path.join(folder, "HARD CNF Formulas"))
+        path = os.path.join(folder, "HARD CNF Formulas", "unsat.cnf")
+        with open(path, "w") as f:
+            f.write("p cnf 3 5\n" + "".join(" ".join(map(str, clause)) + " 0\n" for clause in clauses))
+        for local in ("walksat", "probsat"):
+            options = {"complete": "dpll", "local": local, "genetic": "python", "heuristic": "maxocc", "preprocess": True}
+            for algorithm in (LOCAL, GENETIC):
+                result = run_job(path, algorithm, 0, None, options)
+                prop, timedOut = result[0], result[2]
+                if prop is not None or timedOut:
+                    print(f"[FAIL] run_job {algorithm} ({local}) -> {prop}, timed out {timedOut}")
+                else:
+                    print(f"[OK] run_job {algorithm} ({local}) skipped")
+            try:
+                os.chdir(folder)
+                SATSolver.main(["--preprocess", "--local", local, "--no-cache", "--output", "unsat.csv"])
+                rows = read_results("unsat.csv")
+            finally:
+                os.chdir(cwd)
+            skipped = [row for row in rows if row["Algorithm"] in ("Local Search", "Genetic")]
+            if len(skipped) != 2 or any(row["Clauses Prop"] not in (None, "") for row in skipped):
+                print(f"[FAIL] SATSolver.main --local {local} -> rows {rows}")
+            else:
+                print(f"[OK] SATSolver.main --local {local} -> Local Search and GA rows recorded without running")
+            os.remove(os.path.join(folder, "unsat.csv"))
+    print("Proved UNSAT tests done.\n")
+
+if __name__ == "__main__":
+    try:
+        run_planted_tests([20, 50, 100], trials=3)
+        run_unit_heavy_tests([50, 100, 200], num_units_fraction=0.6)
+        run_agreement_tests([30, 60], density_factors=[3.0, 4.26, 5.0], trials=3)
+        run_proved_unsat_tests()
+    except KeyboardInterrupt:
+        print("Interrupted by user.")
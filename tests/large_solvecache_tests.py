@@ -0,0 +1,98 @@
+import os
+import random
+import tempfile
+import time
+import sys
+sys.path.append(".")
+sys.path.append("tests")
+from SATClass import File, dpll
+from solvecache import SolveCache, satisfies
+from generators import generate_planted_cnf
+
+def random_3cnf(n, m, rng):
+    return [[v if rng.random() < 0.5 else -v for v in rng.sample(range(1, n + 1), 3)] for _ in range(m)]
+
+def renamed_copy(clauses, n, rng):
+    """Same formula with the variables renamed, the clauses shuffled and the literals of each clause shuffled."""
+    names = list(range(1, n + 1))
+    rng.shuffle(names)
+    copy = [[names[abs(lit) - 1] if lit > 0 else -names[abs(lit) - 1] for lit in clause] for clause in clauses]
+    rng.shuffle(copy)
+    return [rng.sample(clause, len(clause)) for clause in copy]
+
+def run_renaming_tests(sizes, density=4.26, trials=4, seed_base=0):
+    """
+    Solve each formula once, then look up renamed and shuffled copies: every copy has to be a hit with the same
+    verdict, and a SAT hit has to come back as a model of the copy.
+    """
+    print("Running solve cache renaming tests.")
+    with tempfile.TemporaryDirectory() as folder:
+        cache = SolveCache(os.path.join(folder, "cache.sqlite"))
+        for n in sizes:
+            for t in range(trials):
+                rng = random.Random(seed_base + n + t)
+                clauses = random_3cnf(n, int(n * density), rng)
+                formula = File.fromClauses("original", n, clauses)
+                sat, model = dpll(formula.clausesOriginal, {})
+                cache.store(formula, sat, model, "dpll", 0.0)
+                copy = renamed_copy(clauses, n, rng)
+                hit = cache.lookup(File.fromClauses("copy", n, copy))
+                if hit is None:
+                    print(f"[MISS] n={n} trial={t} -> renamed copy not found")
+                elif hit[0] != sat:
+                    print(f"[FAIL] n={n} trial={t} -> cached {hit[0]}, solved {sat}")
+                elif sat and not satisfies(copy, hit[1]):
+                    print(f"[FAIL-ASSIGN] n={n} trial={t} -> cached model does not satisfy the copy")
+                else:
+                    print(f"[OK] n={n} trial={t} -> {'SAT' if sat else 'UNSAT'} found for the renamed copy")
+        print(cache.report())
+        cache.close()
+    print("Renaming tests done.\n")
+
+def run_hit_timing(n, m, lookups=200, seed=3):
+    """A repeated formula has to come back far faster than solving it again."""
+    print(f"Timing repeated lookups (n={n}, m={m}).")
+    with tempfile.TemporaryDirectory() as folder:
+        cache = SolveCache(os.path.join(folder, "cache.sqlite"))
+        clauses, planted = generate_planted_cnf(n, m, seed=seed)
+        formula = File.fromClauses("planted", n, clauses)
+        t0 = time.perf_counter()
+        sat, model = dpll(formula.clausesOriginal, {})
+        solveTime = time.perf_counter() - t0
+        cache.store(formula, sat, model, "dpll", solveTime)
+        t0 = time.perf_counter()
+        for i in range(lookups):
+            cache.lookup(formula)
+        hitTime = (time.perf_counter() - t0) / lookups
+        print(f"[OK] solve {solveTime * 1e3:.1f} ms, cached hit {hitTime * 1e6:.0f} us (model checked every time)")
+        cache.close()
+    print("Timing done.\n")
+
+def run_eviction_tests(entries=10, formulas=30, seed=5):
+    """The cache never holds more than maxEntries and the entries used last survive."""
+    print("Running solve cache eviction tests.")
+    with tempfile.TemporaryDirectory() as folder:
+        cache = SolveCache(os.path.join(folder, "cache.sqlite"), maxEntries=entries)
+        rng = random.Random(seed)
+        stored = []
+        for i in range(formulas):
+            formula = File.fromClauses(f"f{i}", 20, random_3cnf(20, 60, rng))
+            cache.store(formula, *dpll(formula.clausesOriginal, {}), "dpll", 0.0)
+            stored.append(formula)
+            time.sleep(0.001)
+        if len(cache) > entries:
+            print(f"[FAIL] {len(cache)} entries with maxEntries={entries}")
+        elif cache.lookup(stored[-1]) is None or cache.lookup(stored[0]) is not None:
+            print("[FAIL] eviction did not drop the least recently used formulas")
+        else:
+            print(f"[OK] {len(cache)} entries after storing {formulas} formulas")
+        cache.close()
+    print("Eviction tests done.\n")
+
+if __name__ == "__main__":
+    try:
+        run_renaming_tests([30, 60, 100])
+        run_hit_timing(100, 420)
+        run_eviction_tests()
+    except KeyboardInterrupt:
+        print("Interrupted by user.")